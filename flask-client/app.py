@@ -7,12 +7,19 @@ from controllers.model_status_controller import model_status_bp
 from controllers.sftp_controller import sftp_bp
 from controllers.detection_model_settings_controller import detection_model_settings_bp
 from controllers.health_controller import health_bp
+from controllers.video_segment_controller import video_segment_bp
+from infrastructure import config
 from infrastructure.logging.logging_provider import get_logger
 from infrastructure.monitoring import HealthMonitoringService, ServerConfig
 from iris_communication.csv_writer_thread import get_csv_writer
 from iris_communication.sftp_uploader_thread import get_sftp_uploader
 from computer_vision.classifier_processor_thread import get_classifier_processor
 from computer_vision.model_detector_thread import get_model_detector
+from storage_data.frame_storage_writer import get_frame_storage_writer
+from storage_data.retention_manager import get_retention_manager
+from storage_data.session_archiver import get_session_archiver
+from computer_vision.model_compile_thread import get_model_compiler
+from sqlite.database import close_all_databases
 import signal
 import atexit
 
@@ -37,6 +44,26 @@ classifier_processor = get_classifier_processor()
 classifier_processor.start()
 logger.info("Classifier processor thread started")
 
+# Initialize and start model compile thread
+model_compiler = get_model_compiler()
+model_compiler.start()
+logger.info("Model compile thread started")
+
+# Initialize and start frame storage writer thread
+frame_storage_writer = get_frame_storage_writer()
+frame_storage_writer.start()
+logger.info("Frame storage writer thread started")
+
+# Initialize and start storage retention manager thread
+retention_manager = get_retention_manager()
+retention_manager.start()
+logger.info("Storage retention manager thread started")
+
+# Initialize and start session archiver thread
+session_archiver = get_session_archiver()
+session_archiver.start()
+logger.info("Session archiver thread started")
+
 # Initialize and start SFTP uploader thread
 sftp_uploader = get_sftp_uploader()
 sftp_uploader.start()
@@ -45,33 +72,33 @@ logger.info("SFTP uploader thread started")
 # Initialize health monitoring service
 health_service = HealthMonitoringService()
 
-# Register servers for health monitoring
+# Register servers for health monitoring (hosts, ports and intervals from config)
 # Use longer intervals and shorter timeouts to reduce server load
 health_service.register_server(ServerConfig(
     name="webcam-server",
-    url="http://localhost",
-    port=5001,
-    health_endpoint="/devices",
-    check_interval=10.0,  # Check every 10 seconds instead of 5
-    timeout=1.5  # Shorter timeout for faster failure detection
+    url=config.WEBCAM_SERVER_URL,
+    port=config.WEBCAM_SERVER_PORT,
+    health_endpoint=config.WEBCAM_SERVER_HEALTH_ENDPOINT,
+    check_interval=config.HEALTH_CHECK_INTERVAL,
+    timeout=config.HEALTH_CHECK_TIMEOUT
 ))
 
 health_service.register_server(ServerConfig(
     name="legacy-camera-server",
-    url="http://localhost",
-    port=5002,
-    health_endpoint="/devices",
-    check_interval=10.0,
-    timeout=1.5
+    url=config.LEGACY_CAMERA_SERVER_URL,
+    port=config.LEGACY_CAMERA_SERVER_PORT,
+    health_endpoint=config.LEGACY_CAMERA_SERVER_HEALTH_ENDPOINT,
+    check_interval=config.HEALTH_CHECK_INTERVAL,
+    timeout=config.HEALTH_CHECK_TIMEOUT
 ))
 
 health_service.register_server(ServerConfig(
     name="simulator-server",
-    url="http://localhost",
-    port=5003,
-    health_endpoint="/devices",
-    check_interval=10.0,
-    timeout=1.5
+    url=config.SIMULATOR_SERVER_URL,
+    port=config.SIMULATOR_SERVER_PORT,
+    health_endpoint=config.SIMULATOR_SERVER_HEALTH_ENDPOINT,
+    check_interval=config.HEALTH_CHECK_INTERVAL,
+    timeout=config.HEALTH_CHECK_TIMEOUT
 ))
 
 # Start health monitoring
@@ -87,6 +114,7 @@ app.register_blueprint(model_status_bp)
 app.register_blueprint(sftp_bp)
 app.register_blueprint(health_bp)
 app.register_blueprint(detection_model_settings_bp)
+app.register_blueprint(video_segment_bp)
 
 @app.route('/')
 def index():
@@ -114,6 +142,27 @@ def cleanup_threads():
     thread_manager = get_thread_manager()
     thread_manager.stop_all_threads(timeout=10.0)
     
+    # Stop storage retention manager thread
+    retention_manager = get_retention_manager()
+    if retention_manager.is_running():
+        logger.info("Stopping storage retention manager thread...")
+        retention_manager.stop(timeout=10.0)
+        logger.info("Storage retention manager thread stopped")
+    
+    # Stop session archiver thread (before the SFTP uploader it queues bundles to)
+    session_archiver = get_session_archiver()
+    if session_archiver.is_running():
+        logger.info("Stopping session archiver thread...")
+        session_archiver.stop(timeout=10.0)
+        logger.info("Session archiver thread stopped")
+    
+    # Stop frame storage writer thread (writes pending frames and flushes frame records)
+    frame_storage_writer = get_frame_storage_writer()
+    if frame_storage_writer.is_running():
+        logger.info("Stopping frame storage writer thread...")
+        frame_storage_writer.stop(timeout=10.0)
+        logger.info("Frame storage writer thread stopped")
+    
     # Stop model detector thread (finishes pending detections)
     model_detector = get_model_detector()
     if model_detector.is_running():
@@ -128,6 +177,13 @@ def cleanup_threads():
         classifier_processor.stop(timeout=10.0)
         logger.info("Classifier processor thread stopped")
     
+    # Stop model compile thread (pending compiles are dropped)
+    model_compiler = get_model_compiler()
+    if model_compiler.is_running():
+        logger.info("Stopping model compile thread...")
+        model_compiler.stop(timeout=10.0)
+        logger.info("Model compile thread stopped")
+    
     # Stop CSV writer thread (finishes pending CSV generations)
     csv_writer = get_csv_writer()
     if csv_writer.is_running():
@@ -149,6 +205,10 @@ def cleanup_threads():
     socket_manager.shutdown()
     logger.info("All socket connections closed")
     
+    # Close the SQLite connections (checkpoints the WAL files)
+    close_all_databases()
+    logger.info("All database connections closed")
+    
     # Stop health monitoring
     health_service.stop_all()
     
@@ -179,6 +239,18 @@ signal.signal(signal.SIGINT, signal_handler)
 # Register cleanup on exit
 def cleanup_on_exit():
     try:
+        # Stop storage retention manager
+        retention_manager = get_retention_manager()
+        if retention_manager.is_running():
+            retention_manager.stop(timeout=5.0)
+        # Stop session archiver
+        session_archiver = get_session_archiver()
+        if session_archiver.is_running():
+            session_archiver.stop(timeout=5.0)
+        # Stop frame storage writer
+        frame_storage_writer = get_frame_storage_writer()
+        if frame_storage_writer.is_running():
+            frame_storage_writer.stop(timeout=5.0)
         # Stop model detector
         model_detector = get_model_detector()
         if model_detector.is_running():
@@ -187,6 +259,10 @@ def cleanup_on_exit():
         classifier_processor = get_classifier_processor()
         if classifier_processor.is_running():
             classifier_processor.stop(timeout=5.0)
+        # Stop model compile thread
+        model_compiler = get_model_compiler()
+        if model_compiler.is_running():
+            model_compiler.stop(timeout=5.0)
         # Stop CSV writer
         csv_writer = get_csv_writer()
         if csv_writer.is_running():
@@ -195,6 +271,8 @@ def cleanup_on_exit():
         sftp_uploader = get_sftp_uploader()
         if sftp_uploader.is_running():
             sftp_uploader.stop(timeout=5.0)
+        # Close database connections
+        close_all_databases()
         # Stop health service and logger
         health_service.stop_all()
         logger.stop()
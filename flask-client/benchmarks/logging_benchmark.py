@@ -0,0 +1,103 @@
+"""
+Logging Benchmark - Measures the CPU cost of the per-frame log calls.
+
+Replays the log calls made for one processed frame (frame queuing, classifier raw
+scores and final result, IRIS CSV append) in two ways:
+- eager: f-strings built before every call, raw scores logged as warnings (the former call sites)
+- lazy: %-style arguments formatted only if the level is enabled, raw scores behind isEnabledFor()
+
+Both run at the configured levels (INFO by default, as in production) and report
+microseconds of CPU time per frame. Log records are written to a temporary directory.
+
+Usage (from the flask-client directory):
+    python benchmarks/logging_benchmark.py
+    python benchmarks/logging_benchmark.py --frames 20000 --levels INFO WARNING DEBUG
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+CLASS_NAMES = ['clean', 'dirty', 'damaged', 'empty']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark eager vs lazy per-frame log calls.')
+    parser.add_argument('--frames', type=int, default=10000, help='Frames per scenario (default: 10000)')
+    parser.add_argument('--levels', nargs='+', default=['INFO'], help='Log levels to run at (default: INFO)')
+    return parser.parse_args()
+
+
+def eager_frame(logger, frame_number, scores, shape):
+    logger.debug(f"[Processing] Queuing frame {frame_number} for model processing (model_id=yolo:1.0)")
+    logger.warning(f"[Classifier] Raw prediction: class_index=1, model_output_shape={shape}, raw_scores={scores.tolist()}")
+    logger.warning(f"[Classifier] Available class_names: {CLASS_NAMES} (length={len(CLASS_NAMES)})")
+    logger.info(f"[Classifier] Final result: class_index=1, status='{CLASS_NAMES[1]}'")
+    logger.info(f"[IRIS] Appending to existing CSV: /data/iris/model/frame_{frame_number}.csv")
+
+
+def lazy_frame(logger, frame_number, scores, shape):
+    logger.debug("[Processing] Queuing frame %d for model processing (model_id=%s)", frame_number, 'yolo:1.0')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Classifier] Raw prediction: class_index=%d, model_output_shape=%s, raw_scores=%s",
+                     1, shape, scores.tolist())
+        logger.debug("[Classifier] Available class_names: %s (length=%d)", CLASS_NAMES, len(CLASS_NAMES))
+    logger.info("[Classifier] Final result: class_index=%d, status='%s'", 1, CLASS_NAMES[1])
+    logger.debug("[IRIS] Appending to existing CSV: %s", f"/data/iris/model/frame_{frame_number}.csv")
+
+
+def run_frames(frame_call, logger, frames: int) -> float:
+    """Call frame_call for each frame; return the CPU seconds spent by this process."""
+    scores = np.random.rand(1, len(CLASS_NAMES)).astype(np.float32)[0]
+    shape = (1, len(CLASS_NAMES))
+    start_time = time.process_time()
+    for frame_number in range(frames):
+        frame_call(logger, frame_number, scores, shape)
+    return time.process_time() - start_time
+
+
+def main():
+    args = parse_args()
+
+    from infrastructure.logging import logging_provider
+    logger = logging_provider.get_logger()
+
+    # Write records to a temporary file instead of the application log
+    work_dir = tempfile.mkdtemp(prefix='logging_benchmark_')
+    handler = logging.FileHandler(os.path.join(work_dir, 'bench.log'), encoding='utf-8')
+    handler.setFormatter(logging_provider.CustomFormatter())
+    logging_provider._file_handler.close()
+    logging_provider._queue_listener.handlers = (handler,)
+
+    print(f"frames={args.frames}")
+    try:
+        for level in args.levels:
+            logging_provider._logger.setLevel(level.upper())
+            results = {}
+            for name, frame_call in (('eager', eager_frame), ('lazy', lazy_frame)):
+                elapsed = run_frames(frame_call, logger, args.frames)
+                results[name] = elapsed
+                print(f"{level.upper():<8} {name:<6}  {elapsed:8.3f}s cpu  "
+                      f"{elapsed / args.frames * 1e6:8.1f} us/frame", flush=True)
+            saved = results['eager'] - results['lazy']
+            print(f"{level.upper():<8} lazy saves {saved / args.frames * 1e6:.1f} us/frame "
+                  f"({saved / results['eager'] * 100 if results['eager'] > 0 else 0.0:.0f}% of log CPU)")
+    finally:
+        logging_provider._cleanup_logging()
+        handler.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+SFTP Stand-in Server - In-process paramiko SFTP server for offline upload experiments.
+
+Serves a local directory over SFTP on 127.0.0.1 so SftpProcessor and
+SftpUploaderThread can be exercised without a real remote server. Latency and
+failures can be injected to mimic a slow or flaky link.
+
+Usage:
+    with SftpStandInServer(latency=0.01, failure_rate=0.05) as server:
+        pool = SftpConnectionPool(port=server.port)
+        server_info = SftpServerInfos(id=1, server_name=server.host,
+                                      username=server.username, password=server.password)
+        ...
+
+Injected behaviour:
+- latency: seconds slept on every metadata request (open, stat, list, rename, remove, mkdir)
+- failure_rate: probability that opening a file for writing fails with SFTP_FAILURE
+- disconnect_rate: probability that the connection is dropped when a written file is closed
+"""
+
+import logging
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from typing import Optional
+import paramiko
+from paramiko.sftp import SFTP_OK, SFTP_FAILURE, SFTP_NO_SUCH_FILE, SFTP_PERMISSION_DENIED
+
+# Server-side transports log every client disconnect as an error; keep benchmark output readable
+_SERVER_LOG_CHANNEL = 'sftp_stand_in'
+logging.getLogger(_SERVER_LOG_CHANNEL).setLevel(logging.CRITICAL)
+
+
+class _StandInAuth(paramiko.ServerInterface):
+    """Password authentication against a single username/password pair."""
+
+    def __init__(self, server: 'SftpStandInServer', transport: paramiko.Transport):
+        self._server = server
+        self.transport = transport
+
+    def check_auth_password(self, username, password):
+        if username == self._server.username and password == self._server.password:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+
+class _StandInHandle(paramiko.SFTPHandle):
+    """File handle that can drop the connection when a written file is closed."""
+
+    def __init__(self, server: 'SftpStandInServer', transport: paramiko.Transport, flags: int = 0):
+        super().__init__(flags)
+        self._server = server
+        self._transport = transport
+        self._writing = bool(flags & (os.O_WRONLY | os.O_RDWR))
+
+    def close(self):
+        super().close()
+        if self._writing and self._server._roll(self._server.disconnect_rate):
+            self._server._count('disconnects_injected')
+            self._transport.close()
+
+
+class _StandInSftpInterface(paramiko.SFTPServerInterface):
+    """Maps SFTP paths onto the server's root directory."""
+
+    def __init__(self, auth: _StandInAuth, stand_in: 'SftpStandInServer', *args, **kwargs):
+        super().__init__(auth, *args, **kwargs)
+        self._stand_in = stand_in
+        self._transport = auth.transport
+
+    def _local_path(self, path: str) -> str:
+        relative = os.path.normpath('/' + path).lstrip('/')
+        return os.path.join(self._stand_in.root, relative)
+
+    def _delay(self):
+        if self._stand_in.latency > 0:
+            time.sleep(self._stand_in.latency)
+
+    def session_started(self):
+        self._stand_in._count('sessions')
+
+    def stat(self, path):
+        self._delay()
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._local_path(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def list_folder(self, path):
+        self._delay()
+        local_path = self._local_path(path)
+        try:
+            entries = []
+            for name in os.listdir(local_path):
+                attributes = paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(local_path, name)))
+                attributes.filename = name
+                entries.append(attributes)
+            return entries
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def open(self, path, flags, attr):
+        self._delay()
+        writing = bool(flags & (os.O_WRONLY | os.O_RDWR))
+        if writing and self._stand_in._roll(self._stand_in.failure_rate):
+            self._stand_in._count('failures_injected')
+            return SFTP_FAILURE
+
+        local_path = self._local_path(path)
+        try:
+            fd = os.open(local_path, flags | getattr(os, 'O_BINARY', 0), 0o644)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+        if flags & os.O_WRONLY:
+            mode = 'ab' if flags & os.O_APPEND else 'wb'
+        elif flags & os.O_RDWR:
+            mode = 'a+b' if flags & os.O_APPEND else 'r+b'
+        else:
+            mode = 'rb'
+
+        handle = _StandInHandle(self._stand_in, self._transport, flags)
+        file_obj = os.fdopen(fd, mode)
+        handle.filename = local_path
+        handle.readfile = file_obj
+        handle.writefile = file_obj if writing else None
+        if writing:
+            self._stand_in._count('files_opened_for_write')
+        return handle
+
+    def remove(self, path):
+        self._delay()
+        try:
+            os.remove(self._local_path(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        self._delay()
+        new_local = self._local_path(newpath)
+        if os.path.exists(new_local):
+            return SFTP_FAILURE
+        try:
+            os.rename(self._local_path(oldpath), new_local)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def posix_rename(self, oldpath, newpath):
+        self._delay()
+        try:
+            os.replace(self._local_path(oldpath), self._local_path(newpath))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def mkdir(self, path, attr):
+        self._delay()
+        try:
+            os.mkdir(self._local_path(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def rmdir(self, path):
+        self._delay()
+        try:
+            os.rmdir(self._local_path(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def chattr(self, path, attr):
+        return SFTP_OK
+
+    def canonicalize(self, path):
+        return os.path.normpath('/' + path)
+
+    def readlink(self, path):
+        return SFTP_NO_SUCH_FILE
+
+    def symlink(self, target_path, path):
+        return SFTP_PERMISSION_DENIED
+
+
+class SftpStandInServer:
+    """
+    In-process SFTP server on 127.0.0.1 backed by a (temporary) local directory.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        username: str = 'bench',
+        password: str = 'bench',
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        disconnect_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the stand-in server (call start() or use it as a context manager).
+
+        Args:
+            root: Directory served as '/' (default: a new temporary directory)
+            username: Accepted username
+            password: Accepted password
+            latency: Seconds slept on every metadata request
+            failure_rate: Probability (0-1) that opening a file for writing fails
+            disconnect_rate: Probability (0-1) that the connection drops when a written file is closed
+            seed: Seed for the failure injection RNG (for reproducible runs)
+        """
+        self._temp_dir = None
+        if root is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix='sftp_stand_in_')
+            root = self._temp_dir.name
+        self.root = root
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.disconnect_rate = disconnect_rate
+        self.host = '127.0.0.1'
+        self.port = None
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._socket = None
+        self._accept_thread = None
+        self._transports = []
+        self._stop_event = threading.Event()
+        self.stats = {
+            'connections': 0,
+            'sessions': 0,
+            'files_opened_for_write': 0,
+            'failures_injected': 0,
+            'disconnects_injected': 0
+        }
+
+    def _roll(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < probability
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def start(self) -> 'SftpStandInServer':
+        """Start listening on an ephemeral localhost port."""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, 0))
+        self._socket.listen(32)
+        self._socket.settimeout(0.5)
+        self.port = self._socket.getsockname()[1]
+
+        self._stop_event.clear()
+        self._accept_thread = threading.Thread(target=self._accept_loop, name='sftp_stand_in', daemon=True)
+        self._accept_thread.start()
+        return self
+
+    def _accept_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                client, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            transport = paramiko.Transport(client)
+            transport.set_log_channel(_SERVER_LOG_CHANNEL)
+            transport.add_server_key(self._host_key)
+            transport.set_subsystem_handler('sftp', paramiko.SFTPServer, _StandInSftpInterface, self)
+            try:
+                transport.start_server(server=_StandInAuth(self, transport))
+            except (paramiko.SSHException, EOFError, OSError):
+                transport.close()
+                continue
+
+            with self._lock:
+                self.stats['connections'] += 1
+                self._transports = [t for t in self._transports if t.is_active()]
+                self._transports.append(transport)
+
+    def stop(self):
+        """Stop accepting connections, close open sessions and remove the temporary root."""
+        self._stop_event.set()
+        if self._socket is not None:
+            self._socket.close()
+        if self._accept_thread is not None:
+            self._accept_thread.join(timeout=2.0)
+        with self._lock:
+            transports, self._transports = self._transports, []
+        for transport in transports:
+            transport.close()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+    def __enter__(self) -> 'SftpStandInServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,156 @@
+"""
+SFTP Upload Benchmark - Measures SftpUploaderThread throughput against a local stand-in server.
+
+For every combination of file size, upload concurrency and injected failure rate,
+the benchmark queues a batch of files on a fresh SftpUploaderThread and waits
+until all of them have reached the stand-in server (including spooled retries).
+It reports files per second and MB/s for each combination.
+
+Runs entirely offline. SQLite databases, generated files and the served directory
+are created in a temporary working directory and removed afterwards.
+
+Usage (from the flask-client directory):
+    python benchmarks/sftp_upload_benchmark.py
+    python benchmarks/sftp_upload_benchmark.py --sizes 64 1024 8192 --concurrency 1 4 8 \\
+        --failure-rates 0 0.1 --files 100 --latency 0.005
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark SFTP upload throughput against a local stand-in server.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 256, 4096],
+                        help='File sizes in KB (default: 16 256 4096)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4],
+                        help='Upload channel counts (default: 1 4)')
+    parser.add_argument('--failure-rates', type=float, nargs='+', default=[0.0, 0.1],
+                        help='Probabilities that opening a remote file fails (default: 0 0.1)')
+    parser.add_argument('--files', type=int, default=50, help='Files per scenario (default: 50)')
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='Injected latency per SFTP metadata request in seconds (default: 0.002)')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Max seconds per scenario (default: 300)')
+    return parser.parse_args()
+
+
+def generate_files(directory: str, count: int, size_kb: int) -> list:
+    """Create count files of size_kb kilobytes with incompressible content."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"bench_{size_kb}kb_{i:05d}.csv")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size_kb * 1024))
+        paths.append(path)
+    return paths
+
+
+def run_scenario(server, server_info, files, size_kb, concurrency, failure_rate, scenario_id, timeout):
+    """Upload files through a fresh uploader and return the measured throughput."""
+    from infrastructure import config
+    from iris_communication.sftp_connection_pool import SftpConnectionPool
+    from iris_communication.sftp_processor import SftpProcessor
+    from iris_communication.sftp_uploader_thread import SftpUploaderThread
+    from sqlite.upload_spool_sqlite_provider import upload_spool_provider
+
+    server.failure_rate = failure_rate
+    upload_spool_provider.delete_all_items()
+
+    pool = SftpConnectionPool(
+        port=server.port,
+        max_connections_per_server=max(concurrency, config.SFTP_POOL_MAX_CONNECTIONS_PER_SERVER)
+    )
+    processor = SftpProcessor(connection_pool=pool)
+    uploader = SftpUploaderThread(thread_id=f"bench_{scenario_id}", concurrency=concurrency, processor=processor)
+    # Unique remote folder per scenario so skip-if-identical never short-circuits an upload
+    project_settings = SimpleNamespace(
+        iris_main_folder=f"bench/scenario_{scenario_id}",
+        iris_model_subfolder='model',
+        iris_classifier_subfolder='classifier'
+    )
+
+    uploader.start()
+    start_time = time.time()
+    for path in files:
+        uploader.queue_upload(server_info, path, project_settings, 'model')
+
+    while time.time() - start_time < timeout:
+        if uploader.get_stats()['total_uploaded'] >= len(files):
+            break
+        time.sleep(0.01)
+    elapsed = time.time() - start_time
+
+    stats = uploader.get_stats()
+    uploader.stop()
+
+    uploaded = stats['total_uploaded']
+    return {
+        'size_kb': size_kb,
+        'concurrency': concurrency,
+        'failure_rate': failure_rate,
+        'uploaded': uploaded,
+        'files': len(files),
+        'elapsed': elapsed,
+        'files_per_second': uploaded / elapsed if elapsed > 0 else 0.0,
+        'mb_per_second': uploaded * size_kb / 1024 / elapsed if elapsed > 0 else 0.0,
+        'retries': stats['total_retried'],
+        'connections': pool.get_stats()['connections_created']
+    }
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='sftp_benchmark_') as work_dir:
+        # Providers create their SQLite files in the working directory on import
+        os.chdir(work_dir)
+
+        from infrastructure import config
+        # Retry quickly so failure scenarios measure the spool rather than the backoff delay
+        config.SFTP_RETRY_BASE_DELAY = 0.05
+        config.SFTP_RETRY_MAX_DELAY = 0.5
+        config.SFTP_SPOOL_POLL_INTERVAL = 0.05
+
+        from sftp_stand_in_server import SftpStandInServer
+        from sqlite.sftp_sqlite_provider import sftp_provider
+
+        results = []
+        with SftpStandInServer(root=os.path.join(work_dir, 'remote'), latency=args.latency, seed=42) as server:
+            os.makedirs(server.root, exist_ok=True)
+            server_id = sftp_provider.insert_server(server.host, server.username, server.password)
+            server_info = sftp_provider.get_server_by_id(server_id)
+
+            scenario_id = 0
+            for size_kb in args.sizes:
+                files = generate_files(os.path.join(work_dir, 'files', str(size_kb)), args.files, size_kb)
+                for concurrency in args.concurrency:
+                    for failure_rate in args.failure_rates:
+                        scenario_id += 1
+                        result = run_scenario(server, server_info, files, size_kb, concurrency,
+                                              failure_rate, scenario_id, args.timeout)
+                        results.append(result)
+                        print(f"size={size_kb:>6}KB  concurrency={concurrency:>2}  failures={failure_rate:>4.0%}  "
+                              f"uploaded={result['uploaded']}/{result['files']}  "
+                              f"{result['files_per_second']:8.1f} files/s  {result['mb_per_second']:8.2f} MB/s  "
+                              f"retries={result['retries']}  connections={result['connections']}", flush=True)
+
+        os.chdir(BENCHMARK_DIR)
+
+    incomplete = [r for r in results if r['uploaded'] < r['files']]
+    if incomplete:
+        print(f"\n{len(incomplete)} scenario(s) did not finish within {args.timeout}s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
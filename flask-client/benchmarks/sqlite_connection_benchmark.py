@@ -0,0 +1,153 @@
+"""
+SQLite Connection Benchmark - Measures the per-call cost of the sqlite providers' reads and writes.
+
+Compares two ways of running the same statements against project_settings.db:
+- per_call_connect: a new sqlite3 connection per call, default journal, commit per write (the former behaviour)
+- database: the shared sqlite.database layer (long-lived WAL connection per thread, cached statements)
+
+and, for reads, the provider method itself with and without the settings cache:
+- provider_uncached: ProjectSettingsSQLiteProvider.get_current_settings bypassing the cache
+- provider_cached: get_current_settings as called by the hot paths
+
+Each scenario runs against a fresh database in a temporary working directory
+and reports microseconds per call.
+
+Usage (from the flask-client directory):
+    python benchmarks/sqlite_connection_benchmark.py
+    python benchmarks/sqlite_connection_benchmark.py --iterations 20000 --threads 4
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+READ_SQL = '''
+    SELECT id, vm_number, title, description, iris_main_folder, iris_classifier_subfolder, iris_model_subfolder,
+           csv_interval_seconds, image_processing_interval, created_at, updated_at, model_output_mode,
+           summary_interval_seconds
+    FROM project_settings
+    ORDER BY id DESC
+    LIMIT 1
+'''
+WRITE_SQL = 'UPDATE project_settings SET csv_interval_seconds = ?, updated_at = CURRENT_TIMESTAMP WHERE id = 1'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark per-call SQLite connection overhead.')
+    parser.add_argument('--iterations', type=int, default=5000, help='Calls per scenario and thread (default: 5000)')
+    parser.add_argument('--threads', type=int, default=1, help='Threads calling concurrently (default: 1)')
+    return parser.parse_args()
+
+
+def create_provider(db_path: str):
+    """Create project_settings.db with its default row through the provider."""
+    from sqlite.project_settings_sqlite_provider import ProjectSettingsSQLiteProvider
+    return ProjectSettingsSQLiteProvider(db_path)
+
+
+def create_plain_database(db_path: str):
+    """Create the same table with a plain connection, leaving the default rollback journal."""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE project_settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, vm_number TEXT NOT NULL, title TEXT NOT NULL, description TEXT,
+            iris_main_folder TEXT, iris_classifier_subfolder TEXT, iris_model_subfolder TEXT,
+            csv_interval_seconds INTEGER DEFAULT 60, image_processing_interval REAL DEFAULT 1.0,
+            model_output_mode TEXT DEFAULT 'particles', summary_interval_seconds INTEGER DEFAULT 60,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("INSERT INTO project_settings (vm_number, title) VALUES ('VM001', 'Belt Vision Project')")
+    conn.commit()
+    conn.close()
+
+
+def per_call_read(db_path: str):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(READ_SQL).fetchone()
+    conn.close()
+
+
+def per_call_write(db_path: str, value: int):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(WRITE_SQL, (value,))
+        conn.commit()
+    conn.close()
+
+
+def run_threads(call, iterations: int, threads: int) -> float:
+    """Run call(i) iterations times in each thread; return the elapsed seconds."""
+    def worker():
+        for i in range(iterations):
+            call(i)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start_time = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return time.perf_counter() - start_time
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='sqlite_connection_benchmark_') as work_dir:
+        # The module-level providers create their databases in the working directory on import
+        os.chdir(work_dir)
+
+        from sqlite.project_settings_sqlite_provider import ProjectSettingsSQLiteProvider
+
+        plain_path = os.path.join(work_dir, 'bench_per_call.db')
+        create_plain_database(plain_path)
+        provider = create_provider(os.path.join(work_dir, 'bench_database.db'))
+        uncached_read = ProjectSettingsSQLiteProvider.get_current_settings.__wrapped__
+
+        def database_read(_):
+            with provider.db.read() as conn:
+                conn.execute(READ_SQL).fetchone()
+
+        def database_write(i):
+            with provider.db.transaction() as conn:
+                conn.execute(WRITE_SQL, (i,))
+
+        scenarios = [
+            ('read', 'per_call_connect', lambda i: per_call_read(plain_path)),
+            ('read', 'database', database_read),
+            ('read', 'provider_uncached', lambda i: uncached_read(provider)),
+            ('read', 'provider_cached', lambda i: provider.get_current_settings()),
+            ('write', 'per_call_connect', lambda i: per_call_write(plain_path, i)),
+            ('write', 'database', database_write)
+        ]
+
+        print(f"iterations={args.iterations}  threads={args.threads}")
+        calls = args.iterations * args.threads
+        results = {}
+        for kind, name, call in scenarios:
+            elapsed = run_threads(call, args.iterations, args.threads)
+            results[(kind, name)] = elapsed
+            print(f"{kind:<6} {name:<18}  {elapsed:8.3f}s  {elapsed / calls * 1e6:10.1f} us/call  "
+                  f"{calls / elapsed if elapsed > 0 else 0.0:10.0f} calls/s", flush=True)
+
+        for kind in ('read', 'write'):
+            baseline = results[(kind, 'per_call_connect')]
+            shared = results[(kind, 'database')]
+            print(f"{kind}: database is {baseline / shared if shared > 0 else 0.0:.1f}x faster than per_call_connect")
+
+        from sqlite.database import close_all_databases
+        close_all_databases()
+        os.chdir(BENCHMARK_DIR)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
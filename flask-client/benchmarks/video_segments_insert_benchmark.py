@@ -0,0 +1,140 @@
+"""
+Video Segments Insert Benchmark - Measures frame record insert throughput into video_stream.db.
+
+Compares three ways of recording frames:
+- per_row_connection: a new sqlite3 connection and commit per row (the former behaviour)
+- persistent_per_row: VideoStreamSQLiteProvider.insert_segment on the shared WAL connection
+- bulk: VideoStreamSQLiteProvider.insert_segments_bulk in batches of the given sizes
+
+Rows are spread over several simulated cameras, like the frame storage writer
+produces them. Each scenario runs against a fresh database in a temporary
+working directory and reports inserts per second.
+
+Usage (from the flask-client directory):
+    python benchmarks/video_segments_insert_benchmark.py
+    python benchmarks/video_segments_insert_benchmark.py --rows 20000 --cameras 8 --batch-sizes 10 50 500
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark video_segments insert throughput.')
+    parser.add_argument('--rows', type=int, default=5000, help='Rows per scenario (default: 5000)')
+    parser.add_argument('--cameras', type=int, default=4, help='Simulated cameras (default: 4)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[10, 50, 500],
+                        help='Rows per insert_segments_bulk call (default: 10 50 500)')
+    parser.add_argument('--synchronous', default=None,
+                        help='Override VIDEO_DB_SYNCHRONOUS (e.g. FULL, NORMAL, OFF)')
+    return parser.parse_args()
+
+
+def generate_rows(count: int, cameras: int) -> list:
+    """Create (camera_id, start_time, file_path) rows, interleaving the cameras."""
+    start = datetime.now()
+    rows = []
+    for i in range(count):
+        camera_id = f"project_camera_{i % cameras}"
+        timestamp = start + timedelta(milliseconds=i * 40)
+        rows.append((camera_id, timestamp, f"storage/project/{camera_id}/frame_{i:07d}.jpg"))
+    return rows
+
+
+def bench_per_row_connection(db_path: str, rows: list) -> float:
+    """Open a connection and commit once per row."""
+    from sqlite.video_stream_sqlite_provider import VideoStreamSQLiteProvider
+    VideoStreamSQLiteProvider(db_path).close()  # Create the schema
+
+    start_time = time.perf_counter()
+    for camera_id, timestamp, file_path in rows:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                INSERT INTO video_segments (camera_id, start_time, file_path)
+                VALUES (?, ?, ?)
+            ''', (camera_id, timestamp.isoformat(), file_path))
+            conn.commit()
+        conn.close()
+    return time.perf_counter() - start_time
+
+
+def bench_persistent_per_row(db_path: str, rows: list) -> float:
+    """Commit once per row on the provider's shared connection."""
+    from sqlite.video_stream_sqlite_provider import VideoStreamSQLiteProvider
+    provider = VideoStreamSQLiteProvider(db_path)
+
+    start_time = time.perf_counter()
+    for camera_id, timestamp, file_path in rows:
+        provider.insert_segment(camera_id, timestamp, file_path)
+    elapsed = time.perf_counter() - start_time
+
+    provider.close()
+    return elapsed
+
+
+def bench_bulk(db_path: str, rows: list, batch_size: int) -> float:
+    """Insert rows in batches, one insert_segments_bulk call per batch."""
+    from sqlite.video_stream_sqlite_provider import VideoStreamSQLiteProvider
+    provider = VideoStreamSQLiteProvider(db_path)
+
+    start_time = time.perf_counter()
+    for offset in range(0, len(rows), batch_size):
+        provider.insert_segments_bulk(rows[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start_time
+
+    provider.close()
+    return elapsed
+
+
+def count_rows(db_path: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        count = conn.execute('SELECT COUNT(*) FROM video_segments').fetchone()[0]
+    conn.close()
+    return count
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='video_segments_benchmark_') as work_dir:
+        # The module-level provider creates video_stream.db in the working directory on import
+        os.chdir(work_dir)
+
+        from infrastructure import config
+        if args.synchronous:
+            config.VIDEO_DB_SYNCHRONOUS = args.synchronous.upper()
+
+        rows = generate_rows(args.rows, args.cameras)
+        scenarios = [
+            ('per_row_connection', lambda path: bench_per_row_connection(path, rows)),
+            ('persistent_per_row', lambda path: bench_persistent_per_row(path, rows))
+        ]
+        for batch_size in args.batch_sizes:
+            scenarios.append((f'bulk_{batch_size}', lambda path, size=batch_size: bench_bulk(path, rows, size)))
+
+        print(f"rows={args.rows}  cameras={args.cameras}  synchronous={config.VIDEO_DB_SYNCHRONOUS}")
+        failed = 0
+        for index, (name, run) in enumerate(scenarios):
+            db_path = os.path.join(work_dir, f'bench_{index}.db')
+            elapsed = run(db_path)
+            inserted = count_rows(db_path)
+            if inserted != len(rows):
+                failed += 1
+            print(f"{name:<20}  {elapsed:8.3f}s  {inserted / elapsed if elapsed > 0 else 0.0:12.0f} inserts/s  "
+                  f"rows={inserted}", flush=True)
+
+        os.chdir(BENCHMARK_DIR)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,7 @@
 #  @author Belt Vision Team
 #  @date 2026
 
+import logging
 from PIL import Image
 import torch
 import torchvision.transforms as transforms
@@ -173,11 +174,13 @@ def classifier_process_image(img2d, classifier_id=None):
     _, predicted_class = torch.max(output, 1)
     predicted_index = predicted_class.item()
     
-    # Log prediction details for debugging
+    # Log prediction details for debugging (raw scores are only converted when DEBUG is enabled)
     from infrastructure.logging.logging_provider import get_logger
     logger = get_logger()
-    logger.warning(f"[Classifier] Raw prediction: class_index={predicted_index}, model_output_shape={output.shape}, raw_scores={output[0].tolist()}")
-    logger.warning(f"[Classifier] Available class_names: {class_names} (length={len(class_names)})")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Classifier] Raw prediction: class_index=%d, model_output_shape=%s, raw_scores=%s",
+                     predicted_index, output.shape, output[0].tolist())
+        logger.debug("[Classifier] Available class_names: %s (length=%d)", class_names, len(class_names))
     
     # Validate that predicted index is within valid range
     if predicted_index >= len(class_names):
@@ -187,6 +190,6 @@ def classifier_process_image(img2d, classifier_id=None):
         predicted_index = len(class_names) - 1  # Clamp to maximum valid index
     
     belt_status = class_names[predicted_index]
-    logger.info(f"[Classifier] Final result: class_index={predicted_index}, status='{belt_status}'")
+    logger.info("[Classifier] Final result: class_index=%d, status='%s'", predicted_index, belt_status)
     
     return belt_status
\ No newline at end of file
@@ -77,6 +77,10 @@ class ClassifierProcessorThread(BaseQueueThread):
         """
         # Initialize base class with queue size limit
         super().__init__(thread_id=thread_id, queue_maxsize=50)
+        
+        # Tracks the active CSV across requests so rotated files can be uploaded.
+        # Only touched by CSV callbacks, which all run in the CSV writer thread.
+        self._previous_csv_tracker = {'path': None}
     
     def _initialize_stats(self) -> Dict[str, Any]:
         """Initialize classifier-specific statistics."""
@@ -177,14 +181,12 @@ class ClassifierProcessorThread(BaseQueueThread):
         from iris_communication.csv_writer_thread import get_csv_writer
         from controllers.camera_controller import create_classifier_csv_callback
         
-        logger.debug(f"[{self.thread_id}] Processing frame with classifier {request.classifier_id}")
+        logger.debug("[%s] Processing frame with classifier %s", self.thread_id, request.classifier_id)
         
         # Run the classifier
         belt_status = classifier_process_image(request.frame, classifier_id=request.classifier_id)
         
-        # Create tracker for CSV callback
-        previous_csv_tracker = {'path': None}
-        
+
         # Queue CSV generation with callback
         csv_writer = get_csv_writer()
         csv_writer.queue_csv_generation(
@@ -195,7 +197,7 @@ class ClassifierProcessorThread(BaseQueueThread):
             callback=create_classifier_csv_callback(
                 request.sftp_server_info,
                 request.project_settings,
-                previous_csv_tracker
+                self._previous_csv_tracker
             )
         )
         
@@ -206,7 +208,7 @@ class ClassifierProcessorThread(BaseQueueThread):
             except Exception as e:
                 logger.error(f"[{self.thread_id}] Error in callback: {e}")
         
-        logger.debug(f"[{self.thread_id}] Classification complete: {belt_status}")
+        logger.debug("[%s] Classification complete: %s", self.thread_id, belt_status)
         
         # Clean up frame data to free memory
         del request.frame
@@ -0,0 +1,165 @@
+"""!
+@file model_compile_thread.py
+@brief Model Compile Thread - Prepares uploaded models in the background.
+
+@details
+Uploading a model only stores its data. The runtime artifact is prepared here,
+outside the request thread: the model file is materialized in the on-disk model
+cache (if the upload did not leave it there already) and loaded once the same way
+the camera threads load it. A broken upload is reported right away instead of at
+the next camera start, and the first camera thread finds the artifact ready and
+in the OS page cache.
+
+Key Features:
+- Queue-based: compile requests are queued by the upload endpoint
+- Results per model version (status, duration, error) are kept for get_stats()
+- Pending requests are dropped on shutdown; models are prepared on first load anyway
+
+@author Belt Vision Team
+@date 2026
+"""
+
+import threading
+import time
+from typing import Dict, Any
+from infrastructure.base_queue_thread import BaseQueueThread
+from infrastructure.logging.logging_provider import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+# Compile results kept for get_stats()
+MAX_COMPILE_RESULTS = 50
+
+
+class ModelCompileRequest:
+    """!
+    @brief Identifies the model version to prepare.
+    """
+    
+    def __init__(self, name: str, version: str):
+        self.name = name
+        self.version = version
+
+
+class ModelCompileThread(BaseQueueThread):
+    """!
+    @brief Background thread that prepares uploaded models one at a time.
+    
+    @note This is a singleton class - use get_model_compiler() to obtain the instance
+    """
+    
+    def __init__(self, thread_id: str = "model_compiler"):
+        """!
+        @brief Initialize the model compile thread.
+        
+        @param thread_id Unique identifier for the thread (default: "model_compiler")
+        """
+        super().__init__(thread_id=thread_id, queue_maxsize=20)
+        
+        # "name:version" -> result of the last compile, oldest first (guarded by self._lock)
+        self._results: Dict[str, Dict[str, Any]] = {}
+    
+    def _initialize_stats(self) -> Dict[str, Any]:
+        """Initialize compile statistics."""
+        return {
+            'total_queued': 0,
+            'total_processed': 0,
+            'total_failed': 0,
+            'queue_size': 0
+        }
+    
+    def _get_queue_timeout(self) -> float:
+        """Return timeout for queue.get() calls."""
+        return 1.0
+    
+    def queue_compile(self, name: str, version: str) -> bool:
+        """!
+        @brief Queue a model version for preparation.
+        
+        @param name Model name
+        @param version Model version
+        
+        @return True if queued, False if the queue is full or the thread is not running
+        """
+        self._set_result(name, version, {'status': 'queued'})
+        return self.queue_item(ModelCompileRequest(name, version))
+    
+    def _process_item(self, request: ModelCompileRequest):
+        """!
+        @brief Materialize the cached model file and load it once.
+        
+        @param request The model version to prepare
+        """
+        from sqlite.ml_sqlite_provider import ml_provider
+        
+        self._set_result(request.name, request.version, {'status': 'compiling'})
+        start_time = time.time()
+        try:
+            if ml_provider.get_model_cache_path(request.name, request.version) is None:
+                raise LookupError(f"Model {request.name}:{request.version} not found")
+            if ml_provider.load_ml_model(request.name, request.version) is None:
+                raise ValueError(f"Model {request.name}:{request.version} has an unknown category")
+        except Exception as e:
+            self._set_result(request.name, request.version, {
+                'status': 'failed', 'error': str(e), 'duration': round(time.time() - start_time, 3)
+            })
+            raise
+        
+        duration = time.time() - start_time
+        self._set_result(request.name, request.version, {'status': 'ready', 'duration': round(duration, 3)})
+        logger.info(f"[{self.thread_id}] Model {request.name}:{request.version} ready in {duration:.1f}s")
+    
+    def _process_remaining_items(self):
+        """Drop pending requests on shutdown instead of loading models while the app exits."""
+        dropped = 0
+        while not self._queue.empty():
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                dropped += 1
+            except Exception:
+                break
+        if dropped:
+            logger.info(f"[{self.thread_id}] Dropped {dropped} pending compile request(s)")
+    
+    def _set_result(self, name: str, version: str, result: Dict[str, Any]):
+        key = f"{name}:{version}"
+        result['updated_at'] = time.time()
+        with self._lock:
+            self._results.pop(key, None)
+            self._results[key] = result
+            while len(self._results) > MAX_COMPILE_RESULTS:
+                del self._results[next(iter(self._results))]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """!
+        @brief Get compile statistics and the result of the latest compile per model version.
+        
+        @return Dictionary with the base counters and 'models' ("name:version" -> result)
+        """
+        stats = super().get_stats()
+        with self._lock:
+            stats['models'] = {key: result.copy() for key, result in self._results.items()}
+        return stats
+
+
+# Global singleton instance
+_model_compiler_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_model_compiler() -> ModelCompileThread:
+    """!
+    @brief Get the global model compile thread singleton instance.
+    
+    @return The global ModelCompileThread singleton instance
+    """
+    global _model_compiler_instance
+    
+    if _model_compiler_instance is None:
+        with _instance_lock:
+            if _model_compiler_instance is None:
+                _model_compiler_instance = ModelCompileThread()
+    
+    return _model_compiler_instance
@@ -41,7 +41,8 @@ class DetectionRequest:
     
     def __init__(self, frame: np.ndarray, model, settings, model_id: str, 
                  timestamp: datetime, image_filename: str, project_settings, 
-                 sftp_server_info, callback: Optional[Callable[[Any], None]] = None):
+                 sftp_server_info, callback: Optional[Callable[[Any], None]] = None,
+                 camera_id: str = ''):
         """!
         @brief Initialize a detection request.
         
@@ -54,6 +55,7 @@ class DetectionRequest:
         @param project_settings Project settings for CSV generation and metadata
         @param sftp_server_info SFTP server configuration for file uploads
         @param callback Optional callback function called with detection result (default: None)
+        @param camera_id Camera identifier used for per-camera summary aggregation (default: '')
         
         @note The frame is copied when queued to avoid data corruption from concurrent access.
         @see ModelDetectorThread.queue_detection()
@@ -67,9 +69,25 @@ class DetectionRequest:
         self.project_settings = project_settings
         self.sftp_server_info = sftp_server_info
         self.callback = callback
+        self.camera_id = camera_id
         self.request_time = time.time()
 
 
+class SummaryFlushRequest:
+    """!
+    @brief Asks for a camera's open summary interval to be written.
+    
+    @details
+    Queued behind the camera's pending detections when its stream stops, so the
+    interval is closed only after its last frames were aggregated.
+    """
+    
+    def __init__(self, camera_id: str, project_settings, sftp_server_info):
+        self.camera_id = camera_id
+        self.project_settings = project_settings
+        self.sftp_server_info = sftp_server_info
+
+
 class ModelDetectorThread(BaseQueueThread):
     """!
     @brief Manages object detection processing in a dedicated background thread.
@@ -104,6 +122,11 @@ class ModelDetectorThread(BaseQueueThread):
         """
         # Initialize base class with queue size limit
         super().__init__(thread_id=thread_id, queue_maxsize=50)
+        
+        # Tracks the active CSVs across requests so rotated files can be uploaded.
+        # Only touched by CSV callbacks, which all run in the CSV writer thread.
+        self._previous_csv_tracker = {'path': None}
+        self._previous_summary_csv_tracker = {'path': None}
     
     def _initialize_stats(self) -> Dict[str, Any]:
         """Initialize model detector-specific statistics."""
@@ -121,7 +144,8 @@ class ModelDetectorThread(BaseQueueThread):
     
     def queue_detection(self, frame: np.ndarray, model, settings, model_id: str,
                        timestamp: datetime, image_filename: str, project_settings, 
-                       sftp_server_info, callback: Optional[Callable[[Any], None]] = None) -> bool:
+                       sftp_server_info, callback: Optional[Callable[[Any], None]] = None,
+                       camera_id: str = '') -> bool:
         """!
         @brief Queue a frame for object detection.
         
@@ -134,6 +158,7 @@ class ModelDetectorThread(BaseQueueThread):
         @param project_settings Project settings for CSV generation and metadata
         @param sftp_server_info SFTP server configuration for file uploads
         @param callback Optional callback function called with detection result (default: None)
+        @param camera_id Camera identifier used for per-camera summary aggregation (default: '')
         
         @return True if queued successfully, False if queue is full or thread not running
         
@@ -163,7 +188,8 @@ class ModelDetectorThread(BaseQueueThread):
             image_filename=image_filename,
             project_settings=project_settings,
             sftp_server_info=sftp_server_info,
-            callback=callback
+            callback=callback,
+            camera_id=camera_id
         )
         
         # Use base class queue_item method
@@ -176,6 +202,20 @@ class ModelDetectorThread(BaseQueueThread):
         
         return success
     
+    def queue_summary_flush(self, camera_id: str, project_settings, sftp_server_info) -> bool:
+        """!
+        @brief Write a camera's open summary interval after its queued detections.
+        
+        @param camera_id Camera identifier used for per-camera summary aggregation
+        @param project_settings Project settings for CSV generation
+        @param sftp_server_info SFTP server configuration for the rotated CSV upload
+        
+        @return True if queued, False if the queue stayed full or the thread is not running
+        
+        @note Waits up to 5 seconds for room - unlike frames, the flush must not be dropped
+        """
+        return self.queue_item(SummaryFlushRequest(camera_id, project_settings, sftp_server_info), timeout=5.0)
+    
     def _process_item(self, request: DetectionRequest):
         """!
         @brief Process a single detection request.
@@ -188,7 +228,9 @@ class ModelDetectorThread(BaseQueueThread):
         Processing Flow:
         1. Run object detection via object_process_image()
         2. Extract particles_to_detect (index 2) for CSV generation
-        3. Queue CSV generation with SFTP upload callback
+        3. Queue CSV generation with SFTP upload callback: per-particle rows ('model'),
+           per-interval summary rows ('model_summary') or both, depending on the
+           project's model_output_mode
         4. Call custom callback if provided
         5. Clean up frame data to free memory
         
@@ -199,7 +241,19 @@ class ModelDetectorThread(BaseQueueThread):
         from iris_communication.csv_writer_thread import get_csv_writer
         from controllers.camera_controller import create_model_csv_callback
         
-        logger.debug(f"[{self.thread_id}] Processing frame with model {request.model_id}")
+        if isinstance(request, SummaryFlushRequest):
+            get_csv_writer().queue_summary_flush(
+                project_settings=request.project_settings,
+                camera_id=request.camera_id,
+                callback=create_model_csv_callback(
+                    request.sftp_server_info,
+                    request.project_settings,
+                    self._previous_summary_csv_tracker
+                )
+            )
+            return
+        
+        logger.debug("[%s] Processing frame with model %s", self.thread_id, request.model_id)
         
         # Run object detection
         result = object_process_image(request.frame, model=request.model, settings=request.settings)
@@ -208,23 +262,40 @@ class ModelDetectorThread(BaseQueueThread):
         # Use particles_to_detect (index 2) for CSV/reporting
         result_for_csv = [result[0], result[1], result[2]]
         
-        # Create tracker for CSV callback
-        previous_csv_tracker = {'path': None}
-        
+
         # Queue CSV generation with callback
         csv_writer = get_csv_writer()
-        csv_writer.queue_csv_generation(
-            project_settings=request.project_settings,
-            timestamp=request.timestamp,
-            data=result_for_csv,
-            folder_type='model',
-            image_filename=request.image_filename,
-            callback=create_model_csv_callback(
-                request.sftp_server_info,
-                request.project_settings,
-                previous_csv_tracker
+        output_mode = getattr(request.project_settings, 'model_output_mode', 'particles')
+        
+        if output_mode in ('particles', 'both'):
+            csv_writer.queue_csv_generation(
+                project_settings=request.project_settings,
+                timestamp=request.timestamp,
+                data=result_for_csv,
+                folder_type='model',
+                image_filename=request.image_filename,
+                callback=create_model_csv_callback(
+                    request.sftp_server_info,
+                    request.project_settings,
+                    self._previous_csv_tracker
+                ),
+                camera_id=request.camera_id
+            )
+        
+        if output_mode in ('summary', 'both'):
+            csv_writer.queue_csv_generation(
+                project_settings=request.project_settings,
+                timestamp=request.timestamp,
+                data=result_for_csv,
+                folder_type='model_summary',
+                image_filename=request.image_filename,
+                callback=create_model_csv_callback(
+                    request.sftp_server_info,
+                    request.project_settings,
+                    self._previous_summary_csv_tracker
+                ),
+                camera_id=request.camera_id
             )
-        )
         
         # Call custom callback if provided
         if request.callback:
@@ -233,7 +304,7 @@ class ModelDetectorThread(BaseQueueThread):
             except Exception as e:
                 logger.error(f"[{self.thread_id}] Error in callback: {e}")
         
-        logger.debug(f"[{self.thread_id}] Detection complete, found {len(result[1])} objects")
+        logger.debug("[%s] Detection complete, found %d objects", self.thread_id, len(result[1]))
         
         # Clean up frame data to free memory
         del request.frame
@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, Response, jsonify, request, redire
 import requests
 import cv2
 import numpy as np
+import threading
 import time
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
@@ -10,12 +11,15 @@ from computer_vision.classifier_image_processor import classifier_process_image
 from computer_vision.classifier_processor_thread import get_classifier_processor
 from computer_vision.model_detector_thread import get_model_detector
 from storage_data.store_data_manager import store_data_manager
-from sqlite.video_stream_sqlite_provider import video_stream_provider
+from storage_data.frame_storage_writer import get_frame_storage_writer
+from storage_data.retention_manager import get_retention_manager
+from storage_data.session_archiver import get_session_archiver
 from iris_communication.iris_input_processor import iris_input_processor
 from iris_communication.sftp_processor import sftp_processor
 from iris_communication.sftp_uploader_thread import get_sftp_uploader
 from iris_communication.csv_writer_thread import get_csv_writer
 from sqlite.sftp_sqlite_provider import sftp_provider
+from sqlite.settings_cache import settings_cache, PROJECT_SETTINGS, DETECTION_MODEL_SETTINGS, SFTP_SERVERS
 from infrastructure.logging.logging_provider import get_logger
 from infrastructure.thread_manager import get_thread_manager
 from infrastructure.socket_manager import get_socket_manager
@@ -33,6 +37,9 @@ csv_writer = get_csv_writer()
 sftp_uploader = get_sftp_uploader()
 classifier_processor = get_classifier_processor()
 model_detector = get_model_detector()
+frame_storage_writer = get_frame_storage_writer()
+retention_manager = get_retention_manager()
+session_archiver = get_session_archiver()
 
 # Webcam server URL from config
 CAMERA_URL = config.get_server_video_url('webcam')
@@ -46,6 +53,45 @@ def generate_frames():
     for chunk in socket_manager.get_stream_generator(CAMERA_URL, chunk_size=1024):
         yield chunk
 
+def _queue_rotated_csv_upload(sftp_server_info, project_settings, csv_path, folder_type):
+    """
+    Queue a rotated (closed) CSV file for SFTP upload.
+    
+    Runs in the CSV writer thread (via the CSV completion callbacks), so any per-server
+    compression happens here and the SFTP uploader thread only has to move bytes.
+    
+    Args:
+        sftp_server_info: SFTP server configuration
+        project_settings: Project settings for SFTP paths
+        csv_path: Local path of the rotated CSV file
+        folder_type: Type of data ('model' or 'classifier')
+    """
+    from iris_communication.payload_compression import compress_file
+    
+    upload_path = csv_path
+    original_size = None
+    remove_after_upload = False
+    
+    payload = compress_file(csv_path, getattr(sftp_server_info, 'compression', 'none'))
+    if payload:
+        upload_path = payload.path
+        original_size = payload.original_size
+        remove_after_upload = True
+        logger.debug(f"[SFTP] Compressed {folder_type} CSV with {payload.method}: "
+                     f"{payload.original_size} -> {payload.compressed_size} bytes")
+    
+    logger.debug("[SFTP] Queuing %s CSV for upload: %s", folder_type, upload_path)
+    success = sftp_uploader.queue_upload(
+        sftp_server_info=sftp_server_info,
+        file_path=upload_path,
+        project_settings=project_settings,
+        folder_type=folder_type,
+        original_size=original_size,
+        remove_after_upload=remove_after_upload
+    )
+    if not success:
+        logger.warning(f"[SFTP] Failed to queue {folder_type} CSV upload (uploader not running or spool unavailable)")
+
 def create_model_csv_callback(sftp_server_info, project_settings, previous_csv_tracker):
     """
     Create a callback function for handling model CSV completion and SFTP upload.
@@ -59,17 +105,10 @@ def create_model_csv_callback(sftp_server_info, project_settings, previous_csv_t
         Callback function that handles CSV completion
     """
     def on_model_csv_complete(csv_path: str):
-        # If there's a previous CSV, queue it for SFTP upload
-        if previous_csv_tracker['path'] and sftp_server_info:
-            logger.debug(f"[SFTP] Queuing model CSV for upload: {previous_csv_tracker['path']}")
-            success = sftp_uploader.queue_upload(
-                sftp_server_info=sftp_server_info,
-                file_path=previous_csv_tracker['path'],
-                project_settings=project_settings,
-                folder_type='model'
-            )
-            if not success:
-                logger.warning(f"[SFTP] Failed to queue model CSV upload (queue may be full)")
+        # If the active CSV changed, the previous one was rotated - queue it for SFTP upload
+        previous_path = previous_csv_tracker['path']
+        if previous_path and previous_path != csv_path and sftp_server_info:
+            _queue_rotated_csv_upload(sftp_server_info, project_settings, previous_path, 'model')
         # Update to current CSV path
         previous_csv_tracker['path'] = csv_path
     
@@ -88,17 +127,10 @@ def create_classifier_csv_callback(sftp_server_info, project_settings, previous_
         Callback function that handles CSV completion
     """
     def on_classifier_csv_complete(csv_path: str):
-        # If there's a previous CSV, queue it for SFTP upload
-        if previous_csv_tracker['path'] and sftp_server_info:
-            logger.debug(f"[SFTP] Queuing classifier CSV for upload: {previous_csv_tracker['path']}")
-            success = sftp_uploader.queue_upload(
-                sftp_server_info=sftp_server_info,
-                file_path=previous_csv_tracker['path'],
-                project_settings=project_settings,
-                folder_type='classifier'
-            )
-            if not success:
-                logger.warning(f"[SFTP] Failed to queue classifier CSV upload (queue may be full)")
+        # If the active CSV changed, the previous one was rotated - queue it for SFTP upload
+        previous_path = previous_csv_tracker['path']
+        if previous_path and previous_path != csv_path and sftp_server_info:
+            _queue_rotated_csv_upload(sftp_server_info, project_settings, previous_path, 'classifier')
         # Update to current CSV path
         previous_csv_tracker['path'] = csv_path
     
@@ -159,6 +191,32 @@ def _initialize_processing_context(thread_id, model_id, classifier_id, settings_
     
     return settings_id, project_settings, project_title, processing_interval, sftp_server_info
 
+def _subscribe_to_settings_changes(thread_id):
+    """
+    Subscribe a camera thread to changes of the settings it uses.
+    
+    Args:
+        thread_id: Thread identifier for logging
+        
+    Returns:
+        Tuple of (event set when settings changed, function that cancels the subscription)
+    """
+    settings_changed = threading.Event()
+    namespaces = (PROJECT_SETTINGS, DETECTION_MODEL_SETTINGS, SFTP_SERVERS)
+    
+    def on_settings_changed(namespace, version):
+        logger.info(f"[Thread {thread_id}] {namespace} changed (version {version}), reloading before the next frame")
+        settings_changed.set()
+    
+    for namespace in namespaces:
+        settings_cache.subscribe(namespace, on_settings_changed)
+    
+    def unsubscribe():
+        for namespace in namespaces:
+            settings_cache.unsubscribe(namespace, on_settings_changed)
+    
+    return settings_changed, unsubscribe
+
 def _load_model_and_settings(model_id, settings_id, thread_id):
     """
     Lazy-load ML model and camera settings.
@@ -186,15 +244,15 @@ def _load_model_and_settings(model_id, settings_id, thread_id):
         traceback.print_exc()
         return None, None, False
 
-def _extract_jpeg_from_frame(frame_data):
+def _extract_jpeg_bytes(frame_data):
     """
-    Extract JPEG image data from MJPEG frame.
+    Extract the encoded JPEG payload from an MJPEG frame.
     
     Args:
         frame_data: Raw frame data from MJPEG stream
         
     Returns:
-        Numpy array of decoded image, or None if extraction failed
+        JPEG bytes as received from the camera server, or None if extraction failed
     """
     header_end = frame_data.find(b'\r\n\r\n')
     if header_end == -1:
@@ -203,10 +261,19 @@ def _extract_jpeg_from_frame(frame_data):
     jpeg_start = header_end + 4
     jpeg_end = frame_data.find(b'\r\n', jpeg_start)
     if jpeg_end == -1:
-        jpeg_data = frame_data[jpeg_start:]
-    else:
-        jpeg_data = frame_data[jpeg_start:jpeg_end]
+        return frame_data[jpeg_start:]
+    return frame_data[jpeg_start:jpeg_end]
+
+def _decode_jpeg(jpeg_data):
+    """
+    Decode JPEG bytes to an image.
     
+    Args:
+        jpeg_data: Encoded JPEG bytes
+        
+    Returns:
+        Numpy array of decoded image, or None if decoding failed
+    """
     # Decode JPEG to numpy array
     nparr = np.frombuffer(jpeg_data, np.uint8)
     img2d = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
@@ -216,44 +283,39 @@ def _extract_jpeg_from_frame(frame_data):
     
     return img2d
 
-def _save_frame_to_storage(img2d, thread_id, project_title, timestamp, filename):
+def _save_frame_to_storage(img2d, thread_id, project_title, timestamp, filename, jpeg_data=None):
     """
-    Save frame to disk and database.
+    Queue frame for writing to disk and database by the frame storage writer thread.
     
     Args:
-        img2d: Frame image as numpy array
+        img2d: Frame image as numpy array (only queued if jpeg_data is missing)
         thread_id: Thread identifier
-        project_title: Project title for camera ID
+        project_title: Project title for camera ID and storage folder
         timestamp: Frame timestamp
         filename: Frame filename
+        jpeg_data: Original JPEG bytes from the camera server (written as-is unless
+                   the storage policy requires re-encoding)
         
     Returns:
-        True if save was successful, False otherwise
+        True if the frame was queued, False if it was dropped
     """
     try:
-        # Save the frame to disk with session tracking
-        filepath = store_data_manager.save_frame(img2d, session_key=thread_id, filename=filename)
-        
-        if filepath:
-            # Insert frame record into database with project_id_camera_id format
-            try:
-                full_camera_id = f"{project_title}_{thread_id}"
-                video_stream_provider.insert_segment(
-                    camera_id=full_camera_id,
-                    start_time=timestamp,
-                    file_path=filepath
-                )
-                return True
-            except Exception as e:
-                logger.error(f"Error inserting frame record to database: {e}")
-                return False
-        return False
+        # Database records use the project_id_camera_id format
+        return frame_storage_writer.queue_frame(
+            camera_id=f"{project_title}_{thread_id}",
+            session_key=thread_id,
+            project_title=project_title,
+            timestamp=timestamp,
+            filename=filename,
+            encoded_image=jpeg_data,
+            image=img2d
+        )
     except Exception as e:
-        logger.error(f"Error saving frame: {e}")
+        logger.error(f"Error queuing frame for storage: {e}")
         return False
 
 def _queue_model_detection(img2d, model, settings, model_id, filename, processing_timestamp, 
-                          project_settings, sftp_server_info):
+                          project_settings, sftp_server_info, camera_id=''):
     """
     Queue frame for model detection processing.
     
@@ -266,6 +328,7 @@ def _queue_model_detection(img2d, model, settings, model_id, filename, processin
         processing_timestamp: Processing timestamp
         project_settings: Project settings
         sftp_server_info: SFTP server configuration
+        camera_id: Camera identifier for per-camera summary statistics
         
     Returns:
         True if queuing was successful, False otherwise
@@ -279,7 +342,8 @@ def _queue_model_detection(img2d, model, settings, model_id, filename, processin
             timestamp=processing_timestamp,
             image_filename=filename,
             project_settings=project_settings,
-            sftp_server_info=sftp_server_info
+            sftp_server_info=sftp_server_info,
+            camera_id=camera_id
         )
         return True
     except Exception as e:
@@ -334,9 +398,9 @@ def _cleanup_processing_resources(thread_id, model, settings):
         except:
             pass
     
-    # Clean up session tracking
+    # Clean up session tracking (after the frames still queued for this camera are written)
     try:
-        store_data_manager.end_session(thread_id)
+        frame_storage_writer.queue_end_session(thread_id)
     except Exception as e:
         logger.error(f"Error ending session: {e}")
     
@@ -366,9 +430,13 @@ def process_video_stream_background(thread_id, url, model_id=None, classifier_id
         settings_id: Optional settings identifier (name)
     """
     # Initialize processing context
+    requested_settings_id = settings_id
     settings_id, project_settings, project_title, processing_interval, sftp_server_info = \
         _initialize_processing_context(thread_id, model_id, classifier_id, settings_id)
     
+    # Pick up settings changes without restarting the thread
+    settings_changed, unsubscribe_settings = _subscribe_to_settings_changes(thread_id)
+    
     # Lazy-load models only when needed (not at thread start)
     model = None
     settings = None
@@ -433,10 +501,20 @@ def process_video_stream_background(thread_id, url, model_id=None, classifier_id
                         frame_data = buffer[start:end]
                         buffer = buffer[end:]
                         
-                        # Extract JPEG image from frame
-                        img2d = _extract_jpeg_from_frame(frame_data)
+                        # Extract JPEG payload from frame and decode it for processing
+                        jpeg_data = _extract_jpeg_bytes(frame_data)
+                        img2d = _decode_jpeg(jpeg_data) if jpeg_data else None
                         
                         if img2d is not None:
+                            # Reload settings that changed since the last frame (model weights stay loaded)
+                            if settings_changed.is_set():
+                                settings_changed.clear()
+                                settings_id, project_settings, project_title, processing_interval, sftp_server_info = \
+                                    _initialize_processing_context(thread_id, model_id, classifier_id, requested_settings_id)
+                                if model_loaded:
+                                    from computer_vision.ml_model_image_processor import get_camera_settings
+                                    settings = get_camera_settings(settings_id)
+                            
                             # Generate timestamp and filename for this frame
                             timestamp = datetime.now()
                             filename = f"frame_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}.jpg"
@@ -444,26 +522,29 @@ def process_video_stream_background(thread_id, url, model_id=None, classifier_id
                             # Save frame to storage directory and database at the same interval as processing
                             current_time = time.time()
                             if current_time - last_frame_save_time >= processing_interval:
-                                _save_frame_to_storage(img2d, thread_id, project_title, timestamp, filename)
+                                _save_frame_to_storage(img2d, thread_id, project_title, timestamp, filename,
+                                                       jpeg_data=jpeg_data)
                                 last_frame_save_time = current_time
                             
                             # Lazy-load model only when we need to process
                             if model_id and not model_loaded:
                                 model, settings, model_loaded = _load_model_and_settings(model_id, settings_id, thread_id)
                             elif not model_id:
-                                logger.debug(f"[Model] No model_id provided, skipping model processing")
+                                logger.debug("[Model] No model_id provided, skipping model processing")
                                 
                             # Process with ML models if specified
                             if model is not None:
                                 current_time = time.time()
                                 if current_time - last_model_processing_time >= processing_interval:
-                                    logger.debug(f"[Processing] Queuing frame for model detection at {current_time:.2f}, interval: {current_time - last_model_processing_time:.2f}s")
+                                    logger.debug("[Processing] Queuing frame for model detection at %.2f, interval: %.2fs",
+                                                 current_time, current_time - last_model_processing_time)
                                     frame_count += 1
                                     processing_timestamp = datetime.now()
                                     
                                     _queue_model_detection(
                                         img2d, model, settings, model_id, filename,
-                                        processing_timestamp, project_settings, sftp_server_info
+                                        processing_timestamp, project_settings, sftp_server_info,
+                                        camera_id=thread_id
                                     )
                                     
                                     last_model_processing_time = current_time
@@ -471,7 +552,8 @@ def process_video_stream_background(thread_id, url, model_id=None, classifier_id
                             if classifier_id:
                                 current_time = time.time()
                                 if current_time - last_classifier_processing_time >= processing_interval:
-                                    logger.debug(f"[Processing] Queuing frame for classifier at {current_time:.2f}, interval: {current_time - last_classifier_processing_time:.2f}s")
+                                    logger.debug("[Processing] Queuing frame for classifier at %.2f, interval: %.2fs",
+                                                 current_time, current_time - last_classifier_processing_time)
                                     # Increment frame count (if not already incremented by model)
                                     if not model_id:
                                         frame_count += 1
@@ -490,8 +572,9 @@ def process_video_stream_background(thread_id, url, model_id=None, classifier_id
                                 'last_update': time.time()
                             })
                             
-                            # Explicitly delete numpy array to free memory
+                            # Explicitly delete numpy array and JPEG payload to free memory
                             del img2d
+                            del jpeg_data
                 
                 # Stream is automatically closed by SocketManager
                 # If we got here without errors, break the retry loop
@@ -531,7 +614,15 @@ def process_video_stream_background(thread_id, url, model_id=None, classifier_id
                 # Don't retry on errors - just stop the thread
                 break
     finally:
+        # Write this camera's open summary interval once its queued detections are processed
+        if model_loaded:
+            try:
+                model_detector.queue_summary_flush(thread_id, project_settings, sftp_server_info)
+            except Exception as e:
+                logger.error(f"Error flushing summary interval: {e}")
+        
         # Clean up all resources
+        unsubscribe_settings()
         _cleanup_processing_resources(thread_id, model, settings)
 
 def process_video_stream(url, model_id=None, classifier_id=None, settings_id=None):
@@ -1027,6 +1118,21 @@ def get_system_resources():
         'logging': logging_stats
     })
 
+@camera_bp.route('/log-level', methods=['GET', 'POST'])
+def log_level():
+    """Get or change the application log level, e.g. POST {"level": "INFO"} to silence per-frame DEBUG messages."""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        level = data.get('level') or request.args.get('level')
+        if not level:
+            return jsonify({'error': 'level is required'}), 400
+        try:
+            logger.set_level(level)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'level': logger.get_level()})
+
 @camera_bp.route('/csv-writer-stats')
 def get_csv_writer_stats():
     """Get CSV writer thread statistics."""
@@ -1038,6 +1144,65 @@ def get_csv_writer_stats():
         'stats': stats
     })
 
+@camera_bp.route('/frame-storage-stats')
+def get_frame_storage_stats():
+    """Get frame storage writer thread statistics."""
+    stats = frame_storage_writer.get_stats()
+    is_running = frame_storage_writer.is_running()
+    
+    return jsonify({
+        'running': is_running,
+        'stats': stats
+    })
+
+@camera_bp.route('/storage-retention-stats')
+def get_storage_retention_stats():
+    """Get retention manager statistics and the size / reclaimable space report of the last sweep."""
+    stats = retention_manager.get_stats()
+    is_running = retention_manager.is_running()
+    
+    return jsonify({
+        'running': is_running,
+        'stats': stats
+    })
+
+@camera_bp.route('/storage-retention/sweep', methods=['POST'])
+def trigger_storage_retention_sweep():
+    """Queue an immediate retention sweep ({"dry_run": true} only reports reclaimable space)."""
+    data = request.get_json(silent=True) or {}
+    dry_run = bool(data.get('dry_run', False))
+    
+    if not retention_manager.request_sweep(dry_run=dry_run):
+        return jsonify({'error': 'Retention manager is not running or busy'}), 503
+    
+    return jsonify({
+        'success': True,
+        'dry_run': dry_run,
+        'message': 'Sweep queued, see /storage-retention-stats for the report'
+    })
+
+@camera_bp.route('/session-archive-stats')
+def get_session_archive_stats():
+    """Get session archiver statistics and the number of bundles per status."""
+    stats = session_archiver.get_stats()
+    is_running = session_archiver.is_running()
+    
+    return jsonify({
+        'running': is_running,
+        'stats': stats
+    })
+
+@camera_bp.route('/session-archive/run', methods=['POST'])
+def trigger_session_archive_run():
+    """Queue an immediate archive run: bundle closed sessions and queue pending bundle uploads."""
+    if not session_archiver.request_run():
+        return jsonify({'error': 'Session archiver is not running or busy'}), 503
+    
+    return jsonify({
+        'success': True,
+        'message': 'Archive run queued, see /session-archive-stats for progress'
+    })
+
 @camera_bp.route('/model-detector-stats')
 def get_model_detector_stats():
     """Get model detector thread statistics."""
@@ -1068,7 +1233,9 @@ def get_sftp_uploader_stats():
     
     return jsonify({
         'running': is_running,
-        'stats': stats
+        'stats': stats,
+        'connection_pool': sftp_processor.get_connection_stats(),
+        'bandwidth': sftp_processor.get_bandwidth_stats()
     })
 
 @camera_bp.route('/cleanup-resources', methods=['POST'])
@@ -49,3 +49,16 @@ def get_server_health(server_name):
         'status': status.value,
         'available': status.value == 'available'
     })
+
+
+@health_bp.route('/health/scheduler')
+def get_health_scheduler_stats():
+    """
+    Get statistics of the health check scheduler.
+    
+    Returns:
+        JSON object with scheduled servers, checks run/failed and check timing
+    """
+    health_service = current_app.config['HEALTH_SERVICE']
+    
+    return jsonify(health_service.get_stats())
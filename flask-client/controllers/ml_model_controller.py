@@ -1,4 +1,6 @@
-from flask import Blueprint, render_template, request, redirect, url_for
+import sqlite3
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify
+from computer_vision.model_compile_thread import get_model_compiler
 
 ml_bp = Blueprint('ml', __name__)
 
@@ -25,12 +27,22 @@ def upload_model():
     if not all([name, version, model_type]):
         return "Missing required fields", 400
 
-    data = file.read()
-    ml_provider.insert_model(name, version, model_type, data, category)
+    # Stream the upload into the model store instead of reading it into memory
+    try:
+        ml_provider.insert_model_from_stream(name, version, model_type, file.stream, category)
+    except sqlite3.IntegrityError:
+        return f"Model {name} version {version} already exists", 409
+
+    # Prepare the runtime artifact in the background
+    get_model_compiler().queue_compile(name, version)
     return redirect(url_for('project.project_settings') + '#ml-models')
 
 @ml_bp.route('/delete-model/<int:model_id>', methods=['POST'])
 def delete_model(model_id):
     from sqlite.ml_sqlite_provider import ml_provider
     ml_provider.delete_model_by_id(model_id)
-    return redirect(url_for('project.project_settings') + '#ml-models')
\ No newline at end of file
+    return redirect(url_for('project.project_settings') + '#ml-models')
+
+@ml_bp.route('/model-compile-stats')
+def model_compile_stats():
+    return jsonify(get_model_compiler().get_stats())
@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request, render_template
-from sqlite.project_settings_sqlite_provider import ProjectSettingsSQLiteProvider
+from sqlite.project_settings_sqlite_provider import project_settings_provider
+from iris_communication.particle_size_aggregator import MODEL_OUTPUT_MODES
 
 project_bp = Blueprint('project', __name__)
-provider = ProjectSettingsSQLiteProvider()
+provider = project_settings_provider
 
 
 @project_bp.route('/project-settings-page')
@@ -33,7 +34,7 @@ def get_project_settings():
 def update_project_settings():
     """
     Update project settings.
-    Expects JSON: { "vm_number": "...", "title": "...", "description": "...", "iris_main_folder": "...", "iris_classifier_subfolder": "...", "iris_model_subfolder": "...", "csv_interval_seconds": 60, "image_processing_interval": 1.0 }
+    Expects JSON: { "vm_number": "...", "title": "...", "description": "...", "iris_main_folder": "...", "iris_classifier_subfolder": "...", "iris_model_subfolder": "...", "csv_interval_seconds": 60, "image_processing_interval": 1.0, "model_output_mode": "particles", "summary_interval_seconds": 60 }
     """
     data = request.get_json()
     
@@ -45,15 +46,38 @@ def update_project_settings():
     iris_model_subfolder = data.get('iris_model_subfolder', '').strip()
     csv_interval_seconds = int(data.get('csv_interval_seconds', 60))
     image_processing_interval = float(data.get('image_processing_interval', 1.0))
+    model_output_mode = data.get('model_output_mode', 'particles').strip() or 'particles'
+    
+    try:
+        summary_interval_seconds = int(data.get('summary_interval_seconds', 60))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'summary_interval_seconds must be an integer'}), 400
     
     if not vm_number or not title:
         return jsonify({'error': 'vm_number and title are required'}), 400
     
+    # Same lower bound as the settings form (min="1"); 0 would make every frame its own interval
+    if summary_interval_seconds < 1:
+        return jsonify({'error': 'summary_interval_seconds must be at least 1'}), 400
+    
+    if model_output_mode not in MODEL_OUTPUT_MODES:
+        return jsonify({'error': f'model_output_mode must be one of {", ".join(MODEL_OUTPUT_MODES)}'}), 400
+    
     success = provider.update_settings(vm_number, title, description, 
                                       iris_main_folder, iris_classifier_subfolder, 
                                       iris_model_subfolder, csv_interval_seconds, 
-                                      image_processing_interval)
+                                      image_processing_interval, model_output_mode,
+                                      summary_interval_seconds)
     
     if success:
         return jsonify({'message': 'Settings updated successfully', 'settings': provider.get_settings_dict()})
     return jsonify({'error': 'Failed to update settings'}), 500
+
+
+@project_bp.route('/settings-cache-stats', methods=['GET'])
+def get_settings_cache_stats():
+    """
+    Get hit/miss counts and namespace versions of the in-process settings cache.
+    """
+    from sqlite.settings_cache import settings_cache
+    return jsonify(settings_cache.get_stats())
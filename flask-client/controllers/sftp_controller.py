@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from sqlite.sftp_sqlite_provider import sftp_provider
+from iris_communication.payload_compression import SUPPORTED_COMPRESSION
 
 sftp_bp = Blueprint('sftp', __name__)
 
@@ -28,11 +29,15 @@ def create_server():
     server_name = data.get('server_name', '').strip()
     username = data.get('username', '').strip()
     password = data.get('password', '').strip()
+    compression = data.get('compression', 'none').strip() or 'none'
     
     if not server_name or not username or not password:
         return jsonify({'error': 'server_name, username, and password are required'}), 400
     
-    server_id = sftp_provider.insert_server(server_name, username, password)
+    if compression not in SUPPORTED_COMPRESSION:
+        return jsonify({'error': f'compression must be one of {", ".join(SUPPORTED_COMPRESSION)}'}), 400
+    
+    server_id = sftp_provider.insert_server(server_name, username, password, compression)
     
     if server_id:
         return jsonify({'message': 'SFTP server created successfully', 'id': server_id}), 201
@@ -47,11 +52,15 @@ def update_server(server_id):
     server_name = data.get('server_name', '').strip()
     username = data.get('username', '').strip()
     password = data.get('password', '').strip()
+    compression = data.get('compression', 'none').strip() or 'none'
     
     if not server_name or not username or not password:
         return jsonify({'error': 'server_name, username, and password are required'}), 400
     
-    success = sftp_provider.update_server(server_id, server_name, username, password)
+    if compression not in SUPPORTED_COMPRESSION:
+        return jsonify({'error': f'compression must be one of {", ".join(SUPPORTED_COMPRESSION)}'}), 400
+    
+    success = sftp_provider.update_server(server_id, server_name, username, password, compression)
     
     if success:
         return jsonify({'message': 'SFTP server updated successfully'})
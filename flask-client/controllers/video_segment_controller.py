@@ -0,0 +1,237 @@
+"""
+Video segment controller for querying stored frame records and serving frames and thumbnails.
+"""
+
+from datetime import datetime
+from flask import Blueprint, jsonify, request, send_file, Response, url_for, stream_with_context
+from infrastructure import config
+from sqlite.video_stream_sqlite_provider import video_stream_provider
+from storage_data.store_data_manager import store_data_manager
+from storage_data.session_exporter import stream_export, EXPORT_FORMATS
+from storage_data.thumbnail_cache import get_thumbnail_cache
+from storage_data.video_segment_writer import find_frame_number
+
+video_segment_bp = Blueprint('video_segment', __name__)
+
+
+def _parse_datetime(value):
+    """
+    Parse an optional ISO 8601 query parameter.
+
+    Frame timestamps are stored as naive local time, so values with a UTC offset
+    (or a trailing 'Z') are converted to local time and made naive.
+    """
+    if not value:
+        return None
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _segment_to_dict(segment):
+    """Segment dictionary with the URLs of its frame and thumbnail."""
+    data = segment.to_dict()
+    data['frame_url'] = url_for('video_segment.get_segment_frame', segment_id=segment.id)
+    data['thumbnail_url'] = url_for('video_segment.get_segment_thumbnail', segment_id=segment.id)
+    return data
+
+
+@video_segment_bp.route('/video-segments', methods=['GET'])
+def query_segments():
+    """
+    Get one page of stored frame records in a time range.
+
+    Query parameters:
+        camera_id: Full camera identifier (project_title_thread_id), optional
+        from: ISO 8601 start time (inclusive), optional
+        to: ISO 8601 end time (exclusive), optional
+        limit: Page size (default VIDEO_SEGMENTS_PAGE_SIZE, max VIDEO_SEGMENTS_MAX_PAGE_SIZE)
+        cursor: next_cursor of the previous page, optional
+        order: 'asc' (default) or 'desc'
+
+    Returns:
+        JSON object with segments and next_cursor (null on the last page)
+    """
+    try:
+        start = _parse_datetime(request.args.get('from'))
+        end = _parse_datetime(request.args.get('to'))
+    except ValueError:
+        return jsonify({'error': 'from and to must be ISO 8601 timestamps'}), 400
+
+    try:
+        limit = int(request.args.get('limit', config.VIDEO_SEGMENTS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    limit = min(limit, config.VIDEO_SEGMENTS_MAX_PAGE_SIZE)
+
+    order = request.args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': "order must be 'asc' or 'desc'"}), 400
+
+    try:
+        segments, next_cursor = video_stream_provider.query_segments(
+            camera_id=request.args.get('camera_id') or None,
+            start=start,
+            end=end,
+            limit=limit,
+            cursor=request.args.get('cursor') or None,
+            descending=order == 'desc'
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'segments': [_segment_to_dict(segment) for segment in segments],
+        'count': len(segments),
+        'next_cursor': next_cursor
+    })
+
+
+@video_segment_bp.route('/video-segments/export', methods=['GET'])
+def export_segments():
+    """
+    Stream the stored frames of a camera and time range as a tar or zip archive.
+
+    Query parameters:
+        format: 'tar' (default) or 'zip'
+        camera_id: Full camera identifier, optional (all cameras if omitted)
+        from: ISO 8601 start time (inclusive), optional
+        to: ISO 8601 end time (exclusive), optional
+        include_csv: '1'/'true' to add the project's model/classifier CSVs overlapping the range
+
+    Returns:
+        Archive streamed in chunks (no temporary file, no archive in memory)
+    """
+    archive_format = request.args.get('format', 'tar').lower()
+    if archive_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+
+    try:
+        start = _parse_datetime(request.args.get('from'))
+        end = _parse_datetime(request.args.get('to'))
+    except ValueError:
+        return jsonify({'error': 'from and to must be ISO 8601 timestamps'}), 400
+
+    camera_id = request.args.get('camera_id') or None
+    include_csv = request.args.get('include_csv', '').lower() in ('1', 'true', 'yes')
+
+    name_parts = ['export', camera_id or 'all']
+    if start:
+        name_parts.append(start.strftime('%Y%m%d_%H%M%S'))
+    if end:
+        name_parts.append(end.strftime('%Y%m%d_%H%M%S'))
+    filename = f"{'_'.join(name_parts)}.{archive_format}"
+
+    stream = stream_export(archive_format, camera_id=camera_id, start=start, end=end, include_csv=include_csv)
+    return Response(
+        stream_with_context(stream),
+        mimetype=EXPORT_FORMATS[archive_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        direct_passthrough=True
+    )
+
+
+@video_segment_bp.route('/video-segments/<int:segment_id>', methods=['GET'])
+def get_segment(segment_id):
+    """Get a single stored frame record."""
+    segment = video_stream_provider.get_segment_by_id(segment_id)
+    if segment:
+        return jsonify(_segment_to_dict(segment))
+    return jsonify({'error': 'Segment not found'}), 404
+
+
+@video_segment_bp.route('/video-segments/<int:segment_id>/frame', methods=['GET'])
+def get_segment_frame(segment_id):
+    """
+    Get the JPEG of a stored frame.
+
+    Single frame files are streamed with send_file (sendfile where the server
+    supports it); frames in packed files are sliced from a memory map; video
+    segments return the still at the 'at' query parameter (default: first frame).
+
+    Returns:
+        JPEG image
+    """
+    segment = video_stream_provider.get_segment_by_id(segment_id)
+    if not segment or not segment.file_path:
+        return jsonify({'error': 'Segment not found'}), 404
+
+    try:
+        at = _parse_datetime(request.args.get('at'))
+    except ValueError:
+        return jsonify({'error': 'at must be an ISO 8601 timestamp'}), 400
+
+    if segment.frame_count is None and segment.byte_offset is None:
+        absolute_path = store_data_manager.project_root / segment.file_path
+        if not absolute_path.is_file():
+            return jsonify({'error': 'Frame file not found'}), 404
+        return send_file(absolute_path, mimetype='image/jpeg', conditional=True,
+                         max_age=config.STORED_FRAME_CACHE_MAX_AGE)
+
+    data = store_data_manager.read_segment_frame(segment, at)
+    if data is None:
+        return jsonify({'error': 'Frame not found'}), 404
+    return Response(data, mimetype='image/jpeg',
+                    headers={'Cache-Control': f'public, max-age={config.STORED_FRAME_CACHE_MAX_AGE}'})
+
+
+@video_segment_bp.route('/video-segments/<int:segment_id>/thumbnail', methods=['GET'])
+def get_segment_thumbnail(segment_id):
+    """
+    Get a thumbnail of a stored frame, generated on first request and cached on disk.
+
+    Query parameters:
+        width: Thumbnail width in pixels (default THUMBNAIL_DEFAULT_WIDTH, max THUMBNAIL_MAX_WIDTH)
+        at: ISO 8601 time of the still for video segments, optional
+
+    Returns:
+        JPEG image
+    """
+    segment = video_stream_provider.get_segment_by_id(segment_id)
+    if not segment or not segment.file_path:
+        return jsonify({'error': 'Segment not found'}), 404
+
+    try:
+        width = int(request.args.get('width', config.THUMBNAIL_DEFAULT_WIDTH))
+    except ValueError:
+        return jsonify({'error': 'width must be an integer'}), 400
+    width = max(16, min(width, config.THUMBNAIL_MAX_WIDTH))
+
+    try:
+        at = _parse_datetime(request.args.get('at'))
+    except ValueError:
+        return jsonify({'error': 'at must be an ISO 8601 timestamp'}), 400
+
+    # Segment ids are never reused, so the id (plus frame number for videos) identifies the image
+    cache_key = str(segment.id)
+    if segment.frame_count is not None:
+        frame_number = 0
+        if at is not None and segment.frame_offsets_ms:
+            frame_number = find_frame_number(segment.frame_offsets_ms, segment.start_time, at)
+        cache_key = f"{segment.id}:{frame_number}"
+
+    # Another request may evict the thumbnail between get_or_create() and send_file();
+    # the evicted entry is gone from the index, so the second attempt regenerates it
+    for attempt in range(2):
+        thumbnail_path = get_thumbnail_cache().get_or_create(
+            cache_key, width, lambda: store_data_manager.read_segment_frame(segment, at)
+        )
+        if thumbnail_path is None:
+            return jsonify({'error': 'Frame not found'}), 404
+        try:
+            return send_file(thumbnail_path, mimetype='image/jpeg', conditional=True,
+                             max_age=config.STORED_FRAME_CACHE_MAX_AGE)
+        except FileNotFoundError:
+            if attempt:
+                raise
+
+
+@video_segment_bp.route('/thumbnail-cache-stats', methods=['GET'])
+def get_thumbnail_cache_stats():
+    """Get thumbnail cache statistics."""
+    return jsonify(get_thumbnail_cache().get_stats())
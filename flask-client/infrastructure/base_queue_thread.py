@@ -44,6 +44,7 @@ class BaseQueueThread(ABC):
     - _initialize_stats(): Define custom statistics keys
     - _on_start(): Called when thread starts
     - _on_stop(): Called when thread stops
+    - _on_idle(): Called when the queue wait times out without an item
     - _on_item_queued(): Called when item is queued successfully
     - _on_item_processed(): Called after item is processed successfully
     - _on_item_failed(exception): Called when item processing fails
@@ -143,12 +144,15 @@ class BaseQueueThread(ABC):
         self._on_stop()
         return True
     
-    def queue_item(self, item: Any) -> bool:
+    def queue_item(self, item: Any, timeout: Optional[float] = None, log_full: bool = True) -> bool:
         """
         Queue an item for processing.
         
         Args:
             item: Item to queue for processing
+            timeout: Seconds to wait for free space if the queue is full
+                     (default: None = don't wait, drop immediately)
+            log_full: Log a warning if the queue is full (callers that retry pass False)
             
         Returns:
             bool: True if queued successfully, False if queue is full or thread not running
@@ -158,8 +162,12 @@ class BaseQueueThread(ABC):
             return False
         
         try:
-            # Try to add to queue (non-blocking)
-            self._queue.put_nowait(item)
+            if timeout:
+                # Apply backpressure: block the producer briefly before dropping
+                self._queue.put(item, timeout=timeout)
+            else:
+                # Try to add to queue (non-blocking)
+                self._queue.put_nowait(item)
             
             # Update statistics
             with self._lock:
@@ -171,7 +179,8 @@ class BaseQueueThread(ABC):
             return True
             
         except queue.Full:
-            logger.warning(f"[{self.thread_id}] Queue is full, dropping item")
+            if log_full:
+                logger.warning("[%s] Queue is full, dropping item", self.thread_id)
             return False
     
     def get_stats(self) -> Dict[str, Any]:
@@ -219,7 +228,8 @@ class BaseQueueThread(ABC):
                 try:
                     item = self._queue.get(timeout=self._get_queue_timeout())
                 except queue.Empty:
-                    # No items in queue, continue loop to check stop event
+                    # No items in queue, run idle housekeeping and check stop event
+                    self._on_idle()
                     continue
                 
                 # Process the item
@@ -323,6 +333,10 @@ class BaseQueueThread(ABC):
         """Called when the thread stops. Override to add custom cleanup logic."""
         pass
     
+    def _on_idle(self):
+        """Called from the worker thread when no item arrived within the queue timeout."""
+        pass
+    
     def _on_item_queued(self, item: Any):
         """Called when an item is successfully queued. Override to add custom logic."""
         pass
@@ -48,6 +48,11 @@ SIMULATOR_VIDEO_ENDPOINT = "/video/simulator"
 # Health check intervals (in seconds)
 HEALTH_CHECK_INTERVAL = 10.0          # How often to check server health
 HEALTH_CHECK_TIMEOUT = 1.5            # Timeout for health check requests
+HEALTH_CHECK_JITTER = 0.1             # Random +/- fraction applied to each check interval
+
+# Health check concurrency (all servers share one scheduler thread and this worker pool)
+HEALTH_CHECK_MAX_WORKERS = 8          # Health checks running concurrently
+HEALTH_CHECK_POOL_HOSTS = 16          # Hosts with pooled keep-alive connections
 
 # ============================================================================
 # Connected Devices Query Configuration
@@ -75,6 +80,148 @@ STREAM_MAX_BUFFER_SIZE = 10 * 1024 * 1024  # 10MB max buffer for video frames
 # Frame processing
 STREAM_CHUNK_CHECK_INTERVAL = 5       # Check stop flag every N chunks
 
+# ============================================================================
+# Frame Storage Configuration
+# ============================================================================
+
+# Frames are stored as the original JPEG bytes received from the camera server.
+# Setting any of these forces a decode/re-encode of every stored frame.
+STORAGE_JPEG_QUALITY = None           # Re-encode stored frames at this JPEG quality (1-100), None = keep original
+STORAGE_MAX_WIDTH = None              # Downscale stored frames wider than this (pixels), None = no limit
+STORAGE_MAX_HEIGHT = None             # Downscale stored frames taller than this (pixels), None = no limit
+STORAGE_FORMAT = 'files'              # 'files' = one JPEG file per frame, 'packed' = one .frames file per session,
+                                      # 'video' = one video file per session (cv2.VideoWriter)
+VIDEO_STORAGE_FOURCC = 'MJPG'         # Codec for STORAGE_FORMAT = 'video' ('mp4v'/'avc1' are smaller, but an .mp4
+                                      # is only readable once closed - a crash loses the whole session)
+VIDEO_STORAGE_EXTENSION = '.avi'      # Container matching the codec ('.mp4' for mp4v/avc1); AVI stays readable after a crash
+VIDEO_STORAGE_FPS = 1.0               # Nominal playback rate; real capture times are in the frame index
+
+# Frame storage writer thread
+FRAME_STORAGE_QUEUE_SIZE = 200        # Max frames waiting to be written
+FRAME_STORAGE_QUEUE_TIMEOUT = 0.05    # Max seconds a camera thread waits for queue space before dropping a frame
+FRAME_STORAGE_DB_BATCH_SIZE = 50      # Insert frame records in batches of this size...
+FRAME_STORAGE_DB_FLUSH_INTERVAL = 2.0 # ...or at least this often (seconds)
+FRAME_STORAGE_DB_MAX_PENDING_ROWS = 5000  # Rows kept for retry while inserts fail (oldest dropped beyond this)
+
+# Frame records database (video_stream.db, overrides the SQLITE_* defaults)
+VIDEO_DB_SYNCHRONOUS = 'NORMAL'       # PRAGMA synchronous (NORMAL is durable in WAL mode except on power loss)
+VIDEO_DB_CACHE_SIZE_KB = 8192         # PRAGMA cache_size in KiB
+VIDEO_DB_BUSY_TIMEOUT = 10.0          # Seconds to wait for a lock held by another process
+VIDEO_DB_MAX_ROWS_PER_TRANSACTION = 500   # Bulk inserts commit after this many rows...
+VIDEO_DB_MAX_TRANSACTION_SECONDS = 0.5    # ...or after the transaction was open this long
+VIDEO_SEGMENTS_PAGE_SIZE = 100        # Default page size of /video-segments
+VIDEO_SEGMENTS_MAX_PAGE_SIZE = 1000   # Upper bound for the limit parameter
+STORED_FRAME_CACHE_MAX_AGE = 3600     # Cache-Control max-age for served frames and thumbnails (stored frames never change)
+
+# Thumbnails of stored frames (generated on demand, LRU disk cache)
+THUMBNAIL_CACHE_DIR = None            # None = <project root>/thumbnail_cache
+THUMBNAIL_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Least recently used thumbnails are evicted above this size
+THUMBNAIL_DEFAULT_WIDTH = 320         # Thumbnail width in pixels if the request does not give one
+THUMBNAIL_MAX_WIDTH = 1280            # Upper bound for the width parameter
+THUMBNAIL_JPEG_QUALITY = 75
+
+# Streaming tar/zip export of stored frames
+EXPORT_CHUNK_SIZE = 1024 * 1024       # Bytes read and sent per chunk
+EXPORT_PAGE_SIZE = 1000               # video_segments rows fetched per index query
+
+# Retention of raw_data_store session folders (oldest sessions are deleted first)
+RETENTION_ENABLED = False                             # Run the periodic (deleting) retention sweep; off by default,
+                                                      # review a dry run (POST /storage-retention/sweep) first
+RETENTION_CHECK_INTERVAL = 900.0                      # Seconds between sweeps
+RETENTION_MAX_AGE_DAYS = 30                           # Delete sessions older than this, None = no age limit
+RETENTION_MAX_PROJECT_BYTES = 50 * 1024 ** 3          # Max size of a project's sessions, None = no size limit
+RETENTION_PROJECT_MAX_BYTES = {}                      # Per-project overrides {project_title: max bytes}
+RETENTION_MAX_FILE_OPS_PER_SECOND = 500               # Throttle for file stat/delete operations during a sweep
+
+# Archival of closed sessions as compressed bundles uploaded over SFTP
+ARCHIVE_ENABLED = False                               # Bundle and upload closed sessions; retention then only
+                                                      # deletes sessions whose bundle has been uploaded
+ARCHIVE_CHECK_INTERVAL = 300.0                        # Seconds between looks for newly closed sessions
+ARCHIVE_COMPRESSION_LEVEL = 1                         # gzip level of the .tar.gz bundles (JPEG/video barely compress)
+ARCHIVE_BUILD_MAX_BYTES_PER_SECOND = 20 * 1024 ** 2   # Disk read throttle while building a bundle
+ARCHIVE_MAX_BUNDLES_PER_CHECK = 10                    # Bundles built per check, so a backlog is worked off gradually
+ARCHIVE_UPLOAD_BANDWIDTH_LIMIT_BPS = 1024 ** 2        # Cap for bundle uploads on top of the shared SFTP cap (0 = none)
+ARCHIVE_REMOTE_SUBFOLDER = 'archive'                  # Bundles go to <iris_main_folder>/<this> on the SFTP server
+
+
+# ============================================================================
+# SFTP Upload Configuration
+# ============================================================================
+
+# SFTP server port
+SFTP_PORT = 22
+
+# Connection pool settings
+SFTP_POOL_MAX_CONNECTIONS_PER_SERVER = 4   # Max authenticated transports per SFTP server
+SFTP_POOL_IDLE_TIMEOUT = 120.0             # Close pooled transports idle for longer (seconds)
+SFTP_POOL_KEEPALIVE_INTERVAL = 30          # SSH keepalive interval for pooled transports (seconds)
+SFTP_CONNECT_TIMEOUT = 10.0                # TCP connect / banner / auth timeout (seconds)
+
+# Upload channels
+SFTP_UPLOAD_CONCURRENCY = 4                # Concurrent upload channels (keep <= SFTP_POOL_MAX_CONNECTIONS_PER_SERVER)
+SFTP_UPLOAD_CHANNEL_QUEUE_SIZE = 25        # Pending uploads per channel before the dispatcher waits
+SFTP_LOW_PRIORITY_QUEUE_SIZE = 50          # Pending low-priority uploads (session archives), started only when idle
+
+# Bandwidth cap shared by all upload channels (0 or None = unlimited)
+SFTP_UPLOAD_BANDWIDTH_LIMIT_BPS = 0        # Bytes per second, e.g. 2 * 1024 * 1024 for 2 MB/s
+SFTP_UPLOAD_BANDWIDTH_BURST_BYTES = None   # Token bucket capacity (None = one second of traffic)
+
+# Upload spool: every upload is stored in upload_spool.db until delivered (survives restarts)
+SFTP_RETRY_BASE_DELAY = 5.0                # Delay before the first retry (seconds), doubled per attempt
+SFTP_RETRY_MAX_DELAY = 600.0               # Upper bound for the retry delay (seconds)
+SFTP_SPOOL_POLL_INTERVAL = 5.0             # How often the spool is checked for due uploads (seconds)
+SFTP_SPOOL_BATCH_SIZE = 20                 # Max spooled uploads dispatched per poll
+
+# Skip-if-identical and resumable uploads
+SFTP_WRITE_CHECKSUM_SIDECAR = False        # Write '<file>.sha256' next to uploads (enables skip-if-identical);
+                                           # off by default - IRIS may pick up every file in the remote folder
+SFTP_SKIP_IDENTICAL_MIN_SIZE = 8 * 1024 * 1024  # Skip-if-identical (and sidecars) only for files of at least this size (bytes)
+SFTP_RESUME_MIN_SIZE = 8 * 1024 * 1024     # Resume interrupted '.part' uploads for files of at least this size (bytes)
+SFTP_RESUME_VERIFY_READBACK = False        # Without server-side hashing (check-file, not in OpenSSH), verify a resumed
+                                           # upload by downloading it again (True) or by its size only (False)
+
+
+# ============================================================================
+# SQLite Database Configuration
+# ============================================================================
+
+# Shared access layer of the sqlite providers (one long-lived WAL connection per thread)
+SQLITE_SYNCHRONOUS = 'NORMAL'          # PRAGMA synchronous (NORMAL is durable in WAL mode except on power loss)
+SQLITE_CACHE_SIZE_KB = 2048            # PRAGMA cache_size in KiB, per connection
+SQLITE_BUSY_TIMEOUT = 10.0             # Seconds to wait for a lock held by another connection
+SQLITE_STATEMENT_CACHE_SIZE = 128      # Prepared statements kept per connection
+
+# On-disk cache of the models stored in ml_models.db (one file per SHA-256, written on first load)
+MODEL_CACHE_DIR = None                 # None = model_cache next to ml_models.db
+MODEL_CACHE_CHUNK_SIZE = 1024 * 1024   # Bytes per read/write when streaming uploads, BLOBs and cache files
+MODEL_CACHE_TMP_MAX_AGE = 3600.0       # Partial cache files older than this (seconds) are removed by the cleanup
+
+
+# ============================================================================
+# Logging Configuration
+# ============================================================================
+
+# Level of the application logger at startup (changeable at runtime via /log-level)
+LOG_LEVEL = 'INFO'                     # 'DEBUG', 'INFO', 'WARNING', 'ERROR' or 'CRITICAL'
+
+# Async log queue between the application threads and the file writer
+LOG_QUEUE_MAXSIZE = 10000              # Records; further records are dropped and counted
+LOG_QUEUE_DEBUG_WATERMARK = 0.8        # Fraction of LOG_QUEUE_MAXSIZE above which DEBUG records are dropped
+LOG_QUEUE_PRIORITY_TIMEOUT = 0.1       # Seconds WARNING and above wait for room in a full queue before being dropped
+LOG_BATCH_SIZE = 500                   # Max records formatted and written per file write
+
+# Per-call-site rate limiting: records beyond the limit are suppressed and counted, and the
+# next record from that call site notes how many similar messages were suppressed
+LOG_RATE_LIMIT_COUNT = 20              # Records per call site and window (0 disables rate limiting)
+LOG_RATE_LIMIT_WINDOW = 60.0           # Window length in seconds
+
+# Deterministic 1-in-N sampling of messages starting with a tag (applied before rate limiting)
+LOG_SAMPLE_RATES = {                   # {message prefix: N}
+    '[Classifier] Available class_names': 10,
+    '[IRIS] Appending to existing': 10,
+    '[SFTP] Queuing': 10,
+}
+
 
 # ============================================================================
 # Helper Functions
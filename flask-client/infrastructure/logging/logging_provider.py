@@ -2,7 +2,7 @@
 # @file logging_provider.py
 # @brief Logging provider module for Belt Vision application
 # @details This module provides efficient logging using Python's standard logging library
-#          with async queue-based handlers, rotating files, and custom formatting.
+#          with a bounded async queue, a batch-writing listener, rotating files, and custom formatting.
 # @author Belt Vision Team
 # @date 2026-02-06
 
@@ -10,9 +10,12 @@ import logging
 import threading
 import queue
 import atexit
+import time
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from infrastructure import config
 
 # Module-level variables for the logging system
 _logger = None
@@ -49,14 +52,22 @@ def _initialize_logging():
         
         # Configure root logger for the application
         _logger = logging.getLogger('BeltVisionApp')
-        _logger.setLevel(logging.DEBUG)
+        _logger.setLevel(config.LOG_LEVEL)
         _logger.propagate = False  # Don't propagate to root logger
         
         # Clear any existing handlers
         _logger.handlers.clear()
         
+        # Rate limit and sample noisy call sites before records are queued
+        _logger.filters.clear()
+        _logger.addFilter(RateLimitFilter(
+            config.LOG_RATE_LIMIT_COUNT,
+            config.LOG_RATE_LIMIT_WINDOW,
+            sample_rates=config.LOG_SAMPLE_RATES
+        ))
+        
         # Create rotating file handler
-        _file_handler = RotatingFileHandler(
+        _file_handler = BatchRotatingFileHandler(
             _log_file_path,
             maxBytes=10*1024*1024,  # 10 MB
             backupCount=5,
@@ -65,18 +76,24 @@ def _initialize_logging():
         _file_handler.setLevel(logging.DEBUG)
         _file_handler.setFormatter(CustomFormatter())
         
-        # Create unbounded queue for async logging (no blocking)
-        # Using unbounded queue to prevent application blocking
-        _log_queue = queue.Queue()
+        # Create bounded queue for async logging
+        # Records that don't fit are dropped (DEBUG first) instead of blocking the application
+        _log_queue = queue.Queue(maxsize=config.LOG_QUEUE_MAXSIZE)
         
         # Create QueueHandler - this is what the application uses (non-blocking)
-        queue_handler = QueueHandler(_log_queue)
+        queue_handler = BoundedQueueHandler(
+            _log_queue,
+            config.LOG_QUEUE_DEBUG_WATERMARK,
+            priority_timeout=config.LOG_QUEUE_PRIORITY_TIMEOUT
+        )
         _logger.addHandler(queue_handler)
         
-        # Create QueueListener - processes logs in background thread
-        _queue_listener = QueueListener(
+        # Create QueueListener - writes logs in batches in a background thread
+        _queue_listener = BatchQueueListener(
             _log_queue,
             _file_handler,
+            batch_size=config.LOG_BATCH_SIZE,
+            drop_source=queue_handler,
             respect_handler_level=True
         )
         
@@ -138,25 +155,56 @@ class LoggingWrapper:
         """Initialize the wrapper - ensures logging system is initialized."""
         _initialize_logging()
     
-    def log(self, message):
+    # Messages may use %-style placeholders with the values passed as args; they are
+    # only formatted if the level is enabled. Arguments are still evaluated by the
+    # caller, so guard expensive ones with isEnabledFor().
+    # stacklevel=2 attributes records to the caller instead of this wrapper.
+    
+    def log(self, message, *args, **kwargs):
         """Log an info message."""
-        _logger.info(message)
+        _logger.info(message, *args, stacklevel=2, **kwargs)
     
-    def info(self, message):
+    def info(self, message, *args, **kwargs):
         """Log an info message."""
-        _logger.info(message)
+        _logger.info(message, *args, stacklevel=2, **kwargs)
     
-    def error(self, message, exc_info=False):
+    def error(self, message, *args, exc_info=False, **kwargs):
         """Log an error message with optional exception info."""
-        _logger.error(message, exc_info=exc_info)
+        _logger.error(message, *args, exc_info=exc_info, stacklevel=2, **kwargs)
     
-    def warning(self, message):
+    def warning(self, message, *args, **kwargs):
         """Log a warning message."""
-        _logger.warning(message)
+        _logger.warning(message, *args, stacklevel=2, **kwargs)
     
-    def debug(self, message):
+    def debug(self, message, *args, **kwargs):
         """Log a debug message."""
-        _logger.debug(message)
+        _logger.debug(message, *args, stacklevel=2, **kwargs)
+    
+    def isEnabledFor(self, level):
+        """Check whether messages of a level (e.g. logging.DEBUG) would be logged."""
+        return _logger.isEnabledFor(level)
+    
+    def get_level(self):
+        """Get the current log level name."""
+        return logging.getLevelName(_logger.level)
+    
+    def set_level(self, level):
+        """
+        Change the log level at runtime.
+        
+        Args:
+            level: Level name ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL') or number
+            
+        Raises:
+            ValueError: If the level is unknown
+        """
+        if isinstance(level, str):
+            level_number = logging.getLevelName(level.upper())
+            if not isinstance(level_number, int):
+                raise ValueError(f"Unknown log level: {level}")
+            level = level_number
+        _logger.setLevel(level)
+        _logger.warning("Log level set to %s", logging.getLevelName(level))
     
     def start(self):
         """Start logging - for backward compatibility (no-op as listener auto-starts)."""
@@ -172,13 +220,24 @@ class LoggingWrapper:
         return _log_queue.qsize() if _log_queue else 0
     
     def get_stats(self):
-        """Get logging statistics."""
-        return {
+        """Get logging statistics, including dropped records and writer throughput."""
+        queue_handler = next((h for h in _logger.handlers if isinstance(h, BoundedQueueHandler)), None)
+        dropped = queue_handler.get_dropped() if queue_handler else {}
+        stats = {
             'queue_size': _log_queue.qsize() if _log_queue else 0,
-            'queue_maxsize': 0,  # Unbounded
+            'queue_maxsize': _log_queue.maxsize if _log_queue else 0,
             'log_file': str(_log_file_path) if _log_file_path else None,
-            'listener_running': _listener_started
+            'level': logging.getLevelName(_logger.level),
+            'listener_running': _listener_started,
+            'dropped': dropped,
+            'dropped_total': sum(dropped.values())
         }
+        if isinstance(_queue_listener, BatchQueueListener):
+            stats.update(_queue_listener.get_stats())
+        rate_limit_filter = next((f for f in _logger.filters if isinstance(f, RateLimitFilter)), None)
+        if rate_limit_filter:
+            stats.update(rate_limit_filter.get_stats())
+        return stats
 
 
 # Legacy class name for backward compatibility
@@ -191,17 +250,27 @@ LoggingProvider = LoggingWrapper
 #          [YYYY-MM-DD HH:MM:SS] [LEVEL] [ThreadName] [module.function] message
 #          Includes exception information when available.
 class CustomFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__()
+        # (second, formatted timestamp) of the last record; records arrive in bursts within a second
+        self._timestamp_cache = (None, '')
+    
     ##
     # @brief Format a log record
     # @details Formats the log record with timestamp, level, thread name, module/function,
     #          and message. Appends exception information if present in the record.
+    #          The timestamp string is reused within the same second.
     # @param record The LogRecord instance to format
     # @return Formatted log string
     def format(self, record):
-        timestamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')
+        second = int(record.created)
+        cached_second, timestamp = self._timestamp_cache
+        if second != cached_second:
+            timestamp = datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')
+            self._timestamp_cache = (second, timestamp)
         level = record.levelname
         thread_name = record.threadName
-        module_name = Path(record.pathname).stem
+        module_name = _module_name(record.pathname)
         function_name = record.funcName
         log_entry = f"[{timestamp}] [{level}] [{thread_name}] [{module_name}.{function_name}] {record.getMessage()}"
         
@@ -211,6 +280,326 @@ class CustomFormatter(logging.Formatter):
         return log_entry
 
 
+##
+# @brief Get the module name (file stem) of a source path
+# @details Cached - log records come from a small, fixed set of source files.
+# @param pathname Source file path of a log record
+# @return The file name without directory and extension
+@lru_cache(maxsize=512)
+def _module_name(pathname):
+    return Path(pathname).stem
+
+
+##
+# @class _CallSite
+# @brief Sampling and rate limiting state of one logging call site
+class _CallSite:
+    __slots__ = ('sample_rate', 'seen', 'window_start', 'passed', 'suppressed')
+    
+    def __init__(self, sample_rate, window_start):
+        self.sample_rate = sample_rate
+        self.seen = 0
+        self.window_start = window_start
+        self.passed = 0
+        self.suppressed = 0
+
+
+##
+# @class RateLimitFilter
+# @brief Logger filter that rate limits and samples records per call site
+# @details A call site is the (file, line) of the logging call. Messages starting with a tag
+#          in sample_rates are sampled deterministically: the 1st, (N+1)th, ... record of the
+#          call site passes. Then at most max_per_window records per call site pass within
+#          window_seconds; the rest are suppressed, and the next record that passes notes how
+#          many similar messages were suppressed.
+class RateLimitFilter(logging.Filter):
+    ##
+    # @brief Initialize the filter
+    # @param max_per_window Records per call site and window (0 disables rate limiting)
+    # @param window_seconds Window length in seconds
+    # @param sample_rates Dictionary of message prefix -> N for 1-in-N sampling (optional)
+    def __init__(self, max_per_window, window_seconds, sample_rates=None):
+        super().__init__()
+        self.max_per_window = max_per_window
+        self.window_seconds = window_seconds
+        self.sample_rates = dict(sample_rates or {})
+        # (pathname, lineno) -> _CallSite
+        self._sites = {}
+        self._lock = threading.Lock()
+        self.suppressed_total = 0
+        self.sampled_out_total = 0
+    
+    ##
+    # @brief Decide whether a record is logged
+    # @param record The LogRecord instance
+    # @return True if the record passes, False if it is sampled out or suppressed
+    def filter(self, record):
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = _CallSite(self._sample_rate(record), record.created)
+            sample_rate = site.sample_rate
+            
+            if sample_rate > 1:
+                site.seen += 1
+                if (site.seen - 1) % sample_rate != 0:
+                    self.sampled_out_total += 1
+                    return False
+            
+            if self.max_per_window > 0:
+                if record.created - site.window_start >= self.window_seconds:
+                    site.window_start = record.created
+                    site.passed = 0
+                if site.passed >= self.max_per_window:
+                    site.suppressed += 1
+                    self.suppressed_total += 1
+                    return False
+                site.passed += 1
+            
+            suppressed = site.suppressed
+            site.suppressed = 0
+        
+        notes = []
+        if suppressed:
+            notes.append(f"suppressed {suppressed} similar messages")
+        if sample_rate > 1:
+            notes.append(f"sampled 1 in {sample_rate}")
+        if notes:
+            record.msg = f"{record.getMessage()} ({', '.join(notes)})"
+            record.args = None
+        return True
+    
+    def _sample_rate(self, record):
+        message = str(record.msg)
+        for tag, rate in self.sample_rates.items():
+            if message.startswith(tag):
+                return rate
+        return 1
+    
+    ##
+    # @brief Get the rate limiting and sampling counters
+    # @return Dictionary with suppressed and sampled-out record counts
+    def get_stats(self):
+        with self._lock:
+            return {
+                'rate_limited': self.suppressed_total,
+                'rate_limited_pending': sum(site.suppressed for site in self._sites.values()),
+                'sampled_out': self.sampled_out_total
+            }
+
+
+##
+# @class BoundedQueueHandler
+# @brief QueueHandler for a bounded queue that drops records instead of blocking
+# @details DEBUG records are dropped once the queue is filled above the DEBUG watermark,
+#          INFO records when the queue is full. WARNING and above wait up to priority_timeout
+#          seconds for room before they are dropped. Dropped records are counted per level.
+class BoundedQueueHandler(QueueHandler):
+    ##
+    # @brief Initialize the handler
+    # @param log_queue Bounded queue.Queue shared with the listener
+    # @param debug_watermark Fraction of the queue size above which DEBUG records are dropped
+    # @param priority_timeout Seconds WARNING and above wait for room in a full queue
+    def __init__(self, log_queue, debug_watermark, priority_timeout=0.0):
+        super().__init__(log_queue)
+        self.debug_limit = int(log_queue.maxsize * debug_watermark)
+        self.priority_timeout = priority_timeout
+        self._dropped = {}
+        self._dropped_lock = threading.Lock()
+    
+    ##
+    # @brief Queue a record, or count it as dropped
+    # @details DEBUG records are checked before prepare() so dropped ones are never formatted.
+    # @param record The LogRecord instance to queue
+    def emit(self, record):
+        if self.debug_limit > 0 and record.levelno <= logging.DEBUG and self.queue.qsize() >= self.debug_limit:
+            self._count_drop(record)
+            return
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+    
+    ##
+    # @brief Put a record on the queue, waiting briefly only for WARNING and above
+    # @param record The prepared LogRecord instance
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING and self.priority_timeout > 0:
+                self.queue.put(record, timeout=self.priority_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self._count_drop(record)
+    
+    def _count_drop(self, record):
+        with self._dropped_lock:
+            self._dropped[record.levelname] = self._dropped.get(record.levelname, 0) + 1
+    
+    ##
+    # @brief Get the number of dropped records per level name
+    # @return Dictionary of level name -> dropped record count
+    def get_dropped(self):
+        with self._dropped_lock:
+            return dict(self._dropped)
+    
+    ##
+    # @brief Get the total number of dropped records
+    # @return Dropped record count over all levels
+    def get_dropped_total(self):
+        with self._dropped_lock:
+            return sum(self._dropped.values())
+
+
+##
+# @class BatchQueueListener
+# @brief QueueListener that drains the queue in batches
+# @details Takes up to batch_size queued records at a time and hands them to handlers
+#          with an emit_batch() method in one call (other handlers get them one by one).
+#          Records dropped by the queue handler are reported in the log as a single warning
+#          with the next batch. Keeps write counters and the recent throughput for get_stats().
+class BatchQueueListener(QueueListener):
+    # Seconds over which the records_per_second stat is measured
+    RATE_WINDOW = 10.0
+    
+    ##
+    # @brief Initialize the listener
+    # @param log_queue Queue to drain
+    # @param handlers Handlers that receive the records
+    # @param batch_size Max records per batch
+    # @param drop_source BoundedQueueHandler whose drops are reported in the log (optional)
+    # @param respect_handler_level Only pass records at or above each handler's level
+    def __init__(self, log_queue, *handlers, batch_size=500, drop_source=None, respect_handler_level=False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = max(1, batch_size)
+        self.drop_source = drop_source
+        self._reported_drops = 0
+        self.records_written = 0
+        self.batches_written = 0
+        self.max_batch_size = 0
+        self._rate_window_start = time.time()
+        self._rate_window_records = 0
+        self.records_per_second = 0.0
+    
+    ##
+    # @brief Put the stop sentinel on the queue
+    # @details The queue is bounded - wait for room instead of failing with queue.Full.
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+    
+    ##
+    # @brief Drain the queue in batches until the sentinel is seen
+    def _monitor(self):
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            
+            records = [record for record in batch if record is not self._sentinel]
+            if records:
+                self.handle_batch(records)
+            for _ in batch:
+                self.queue.task_done()
+            if len(records) < len(batch):
+                break
+    
+    ##
+    # @brief Pass a batch of records to the handlers
+    # @param records LogRecord instances in queue order
+    def handle_batch(self, records):
+        drop_record = self._make_drop_record()
+        if drop_record is not None:
+            records.append(drop_record)
+        
+        for handler in self.handlers:
+            if self.respect_handler_level:
+                selected = [record for record in records if record.levelno >= handler.level]
+            else:
+                selected = records
+            if not selected:
+                continue
+            if hasattr(handler, 'emit_batch'):
+                handler.emit_batch(selected)
+            else:
+                for record in selected:
+                    handler.handle(record)
+        
+        self._count_batch(len(records))
+    
+    def _make_drop_record(self):
+        if self.drop_source is None:
+            return None
+        dropped_total = self.drop_source.get_dropped_total()
+        if dropped_total <= self._reported_drops:
+            return None
+        message = "[Logging] Log queue overflow - dropped %d record(s) since last report (%s)"
+        record = logging.LogRecord('BeltVisionApp', logging.WARNING, __file__, 0, message,
+                                   (dropped_total - self._reported_drops, self.drop_source.get_dropped()),
+                                   None, func='handle_batch')
+        self._reported_drops = dropped_total
+        return record
+    
+    def _count_batch(self, size):
+        self.records_written += size
+        self.batches_written += 1
+        self.max_batch_size = max(self.max_batch_size, size)
+        
+        self._rate_window_records += size
+        now = time.time()
+        elapsed = now - self._rate_window_start
+        if elapsed >= self.RATE_WINDOW:
+            self.records_per_second = self._rate_window_records / elapsed
+            self._rate_window_start = now
+            self._rate_window_records = 0
+    
+    ##
+    # @brief Get the writer counters
+    # @return Dictionary with records/batches written, batch sizes and throughput over the last window
+    def get_stats(self):
+        batches = self.batches_written
+        records_per_second = self.records_per_second
+        if batches and records_per_second == 0.0:
+            # No full window yet - use the current one
+            elapsed = time.time() - self._rate_window_start
+            records_per_second = self._rate_window_records / elapsed if elapsed > 0 else 0.0
+        return {
+            'records_written': self.records_written,
+            'batches_written': batches,
+            'avg_batch_size': round(self.records_written / batches, 1) if batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'records_per_second': round(records_per_second, 1)
+        }
+
+
+##
+# @class BatchRotatingFileHandler
+# @brief RotatingFileHandler that writes a batch of records in a single call
+# @details Formats the whole batch, rolls the file over if the batch would exceed maxBytes,
+#          then writes and flushes once per batch instead of once per record.
+class BatchRotatingFileHandler(RotatingFileHandler):
+    ##
+    # @brief Format and write a batch of records
+    # @param records LogRecord instances to write
+    def emit_batch(self, records):
+        self.acquire()
+        try:
+            data = ''.join(self.format(record) + self.terminator for record in records)
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() > 0 and self.stream.tell() + len(data) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
 ##
 # @brief Get the LoggingWrapper instance
 # @details Convenience function to obtain a logging wrapper instance.
@@ -1,3 +1,4 @@
 from .server_health_monitor import HealthMonitoringService, ServerConfig
+from .health_check_scheduler import HealthCheckScheduler
 
-__all__ = ['HealthMonitoringService', 'ServerConfig']
+__all__ = ['HealthMonitoringService', 'ServerConfig', 'HealthCheckScheduler']
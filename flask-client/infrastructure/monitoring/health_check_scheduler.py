@@ -0,0 +1,215 @@
+"""
+Health Check Scheduler
+
+Runs the periodic health checks of all monitored servers with a constant number of threads:
+one timer thread keeps a heap of due times and hands due checks to a small worker pool,
+so checks of different servers run concurrently and a slow server doesn't delay the others.
+
+A monitor is rescheduled only after its check completes, so checks of one server never
+overlap. Each interval is jittered to keep checks of many servers from firing in lockstep.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from infrastructure.logging.logging_provider import get_logger
+
+logger = get_logger()
+
+
+class HealthCheckScheduler:
+    """
+    Heap-based timer thread that runs health checks on a worker pool.
+    
+    Scheduled monitors must provide run_check() (perform one check) and
+    next_delay() (seconds until the next check).
+    """
+    
+    def __init__(self, max_workers: int = 4, name: str = "HealthCheck"):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            max_workers: Worker threads running checks concurrently
+            name: Prefix for the timer and worker thread names
+        """
+        self._max_workers = max(1, max_workers)
+        self._name = name
+        self._heap: List[Tuple[float, int, Any]] = []
+        # monitor -> sequence number of its current heap entry; entries with another number are stale
+        self._entries: Dict[Any, int] = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Statistics (guarded by self._condition)
+        self._checks_run = 0
+        self._checks_failed = 0
+        self._total_check_time = 0.0
+        self._max_start_delay = 0.0
+    
+    def start(self) -> None:
+        """Start the timer thread and the worker pool."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix=f"{self._name}Worker"
+            )
+            self._thread = threading.Thread(target=self._run, name=f"{self._name}Scheduler", daemon=True)
+            self._thread.start()
+        logger.info(f"Health check scheduler started ({self._max_workers} workers)")
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the timer thread and the worker pool.
+        
+        Checks already running are allowed to finish; pending ones are dropped.
+        
+        Args:
+            timeout: Seconds to wait for the timer thread
+        """
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._heap.clear()
+            self._entries.clear()
+            self._condition.notify()
+            thread, executor = self._thread, self._executor
+        
+        if thread:
+            thread.join(timeout=timeout)
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("Health check scheduler stopped")
+    
+    def is_running(self) -> bool:
+        """Check if the scheduler is running."""
+        return self._running
+    
+    def schedule(self, monitor: Any, delay: float = 0.0) -> None:
+        """
+        Schedule a monitor's next check, replacing any pending one.
+        
+        Args:
+            monitor: Object providing run_check() and next_delay()
+            delay: Seconds until the check
+        """
+        with self._condition:
+            self._push(monitor, delay)
+    
+    def remove(self, monitor: Any) -> None:
+        """
+        Stop scheduling a monitor. A check already running completes but isn't rescheduled.
+        
+        Args:
+            monitor: A previously scheduled monitor
+        """
+        with self._condition:
+            self._entries.pop(monitor, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+        
+        Returns:
+            Dictionary with scheduled monitors, checks run/failed, average check time
+            and the largest delay between a check's due time and its start
+        """
+        with self._condition:
+            return {
+                'running': self._running,
+                'workers': self._max_workers,
+                'scheduled': len(self._entries),
+                'checks_run': self._checks_run,
+                'checks_failed': self._checks_failed,
+                'avg_check_time': round(self._total_check_time / self._checks_run, 3) if self._checks_run else 0.0,
+                'max_start_delay': round(self._max_start_delay, 3)
+            }
+    
+    def _push(self, monitor: Any, delay: float) -> None:
+        # Caller holds self._condition
+        if not self._running:
+            return
+        sequence = next(self._sequence)
+        self._entries[monitor] = sequence
+        heapq.heappush(self._heap, (time.monotonic() + max(0.0, delay), sequence, monitor))
+        self._condition.notify()
+    
+    def _run(self) -> None:
+        """Timer loop: wait for the earliest due check and hand it to the worker pool."""
+        while True:
+            with self._condition:
+                while self._running:
+                    # Drop entries of removed or rescheduled monitors
+                    while self._heap and self._entries.get(self._heap[0][2]) != self._heap[0][1]:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    wait_time = self._heap[0][0] - time.monotonic()
+                    if wait_time <= 0:
+                        break
+                    self._condition.wait(wait_time)
+                
+                if not self._running:
+                    return
+                due_time, sequence, monitor = heapq.heappop(self._heap)
+                executor = self._executor
+            
+            try:
+                executor.submit(self._execute, monitor, sequence, due_time)
+            except RuntimeError:
+                # Executor shut down while stopping
+                return
+    
+    def _execute(self, monitor: Any, sequence: int, due_time: float) -> None:
+        """Run one check on a worker thread and reschedule the monitor."""
+        start_time = time.monotonic()
+        failed = False
+        try:
+            monitor.run_check()
+        except Exception as e:
+            failed = True
+            logger.error(f"Error in health check: {e}")
+        check_time = time.monotonic() - start_time
+        
+        try:
+            delay = monitor.next_delay()
+        except Exception as e:
+            logger.error(f"Error computing next health check delay: {e}")
+            delay = 10.0
+        
+        with self._condition:
+            self._checks_run += 1
+            self._checks_failed += failed
+            self._total_check_time += check_time
+            self._max_start_delay = max(self._max_start_delay, start_time - due_time)
+            # Reschedule only if the monitor wasn't removed or rescheduled meanwhile
+            if self._entries.get(monitor) == sequence:
+                self._push(monitor, delay)
+
+
+def jittered(interval: float, jitter: float) -> float:
+    """
+    Randomize an interval by up to +/- jitter (fraction of the interval).
+    
+    Args:
+        interval: Interval in seconds
+        jitter: Fraction of the interval, e.g. 0.1 for +/- 10%
+    
+    Returns:
+        The jittered interval (never negative)
+    """
+    if jitter <= 0:
+        return interval
+    return max(0.0, interval * random.uniform(1.0 - jitter, 1.0 + jitter))
@@ -7,16 +7,21 @@ This module implements a health monitoring system for server connections followi
 - Liskov Substitution: All monitors are interchangeable through the base interface
 - Interface Segregation: Clean, focused interfaces
 - Dependency Inversion: Depends on abstractions (ABC) not concrete implementations
+
+All monitors share one HealthCheckScheduler (a timer thread and a small worker pool),
+so the thread count stays constant however many servers are registered.
 """
 
+import random
 import threading
-import time
 import requests
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Callable, Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Any
 from dataclasses import dataclass
+from infrastructure import config as app_config
 from infrastructure.logging.logging_provider import get_logger
+from infrastructure.monitoring.health_check_scheduler import HealthCheckScheduler, jittered
 
 logger = get_logger()
 
@@ -31,10 +36,10 @@ def get_health_check_session():
         with _session_lock:
             if _health_check_session is None:
                 _health_check_session = requests.Session()
-                # Configure for health checks: small pool, no retries
+                # Configure for health checks: one small pool per host, no retries
                 adapter = requests.adapters.HTTPAdapter(
-                    pool_connections=5,
-                    pool_maxsize=5,
+                    pool_connections=app_config.HEALTH_CHECK_POOL_HOSTS,
+                    pool_maxsize=app_config.HEALTH_CHECK_MAX_WORKERS,
                     max_retries=0,
                     pool_block=False
                 )
@@ -93,13 +98,14 @@ class ServerHealthMonitor(IHealthMonitor):
     Monitors health of a single server (Single Responsibility Principle).
     
     This class is responsible only for monitoring one server's health status.
-    It runs in its own thread and periodically checks if the server is available.
+    Its checks are run periodically by a HealthCheckScheduler shared with other monitors.
     """
     
     def __init__(
         self, 
         config: ServerConfig,
-        on_status_change: Optional[Callable[[str, ServerStatus, ServerStatus], None]] = None
+        on_status_change: Optional[Callable[[str, ServerStatus, ServerStatus], None]] = None,
+        scheduler: Optional[HealthCheckScheduler] = None
     ):
         """
         Initialize the health monitor.
@@ -107,37 +113,42 @@ class ServerHealthMonitor(IHealthMonitor):
         Args:
             config: Server configuration
             on_status_change: Optional callback function(server_name, old_status, new_status)
+            scheduler: Scheduler running the checks (default: a private single-worker scheduler)
         """
         self._config = config
         self._on_status_change = on_status_change
         self._status = ServerStatus.UNKNOWN
         self._running = False
-        self._thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
+        self._health_url = f"{config.url.rstrip('/')}:{config.port}{config.health_endpoint}"
+        self._owns_scheduler = scheduler is None
+        self._scheduler = scheduler or HealthCheckScheduler(max_workers=1, name=f"HealthMonitor-{config.name}")
         
     def start(self) -> None:
-        """Start the health monitoring thread."""
+        """Schedule the first health check (spread over the jitter range)."""
         if self._running:
             logger.warning(f"Health monitor for {self._config.name} is already running")
             return
         
         self._running = True
-        self._thread = threading.Thread(
-            target=self._monitor_loop,
-            name=f"HealthMonitor-{self._config.name}",
-            daemon=True
+        if self._owns_scheduler:
+            self._scheduler.start()
+        initial_delay = self._config.check_interval * app_config.HEALTH_CHECK_JITTER * random.random()
+        self._scheduler.schedule(self, initial_delay)
+        logger.info(
+            f"Health monitor started for {self._config.name} at {self._health_url} "
+            f"(checking every {self._config.check_interval}s)"
         )
-        self._thread.start()
-        logger.info(f"Health monitor started for {self._config.name} (checking every {self._config.check_interval}s)")
     
     def stop(self) -> None:
-        """Stop the health monitoring thread."""
+        """Stop scheduling health checks."""
         if not self._running:
             return
         
         self._running = False
-        if self._thread:
-            self._thread.join(timeout=5)
+        self._scheduler.remove(self)
+        if self._owns_scheduler:
+            self._scheduler.stop()
         logger.info(f"Health monitor stopped for {self._config.name}")
     
     def get_status(self) -> ServerStatus:
@@ -149,36 +160,35 @@ class ServerHealthMonitor(IHealthMonitor):
         """Check if server is currently available."""
         return self.get_status() == ServerStatus.AVAILABLE
     
-    def _monitor_loop(self) -> None:
-        """Main monitoring loop running in separate thread."""
-        while self._running:
-            try:
-                # Perform health check
-                new_status = self._check_health()
-                
-                # Update status and trigger callback if changed
-                with self._lock:
-                    old_status = self._status
-                    if new_status != old_status:
-                        self._status = new_status
-                        logger.info(
-                            f"Server {self._config.name} status changed: "
-                            f"{old_status.value} -> {new_status.value}"
-                        )
-                        
-                        # Trigger callback if provided
-                        if self._on_status_change:
-                            try:
-                                self._on_status_change(self._config.name, old_status, new_status)
-                            except Exception as e:
-                                logger.error(f"Error in status change callback for {self._config.name}: {e}")
-                
-                # Wait before next check
-                time.sleep(self._config.check_interval)
-                
-            except Exception as e:
-                logger.error(f"Error in health monitor loop for {self._config.name}: {e}")
-                time.sleep(self._config.check_interval)
+    def run_check(self) -> None:
+        """Perform one health check and report a status change (called by the scheduler)."""
+        try:
+            # Perform health check
+            new_status = self._check_health()
+            
+            # Update status and trigger callback if changed
+            with self._lock:
+                old_status = self._status
+                if new_status != old_status:
+                    self._status = new_status
+                    logger.info(
+                        f"Server {self._config.name} status changed: "
+                        f"{old_status.value} -> {new_status.value}"
+                    )
+                    
+                    # Trigger callback if provided
+                    if self._on_status_change:
+                        try:
+                            self._on_status_change(self._config.name, old_status, new_status)
+                        except Exception as e:
+                            logger.error(f"Error in status change callback for {self._config.name}: {e}")
+                            
+        except Exception as e:
+            logger.error(f"Error in health check for {self._config.name}: {e}")
+    
+    def next_delay(self) -> float:
+        """Get the seconds until the next check (check interval with jitter)."""
+        return jittered(self._config.check_interval, app_config.HEALTH_CHECK_JITTER)
     
     def _check_health(self) -> ServerStatus:
         """
@@ -190,26 +200,23 @@ class ServerHealthMonitor(IHealthMonitor):
         session = get_health_check_session()
         
         try:
-            full_url = f"http://localhost:{self._config.port}{self._config.health_endpoint}"
             # Use shared session and shorter timeout for health checks
-            response = session.get(full_url, timeout=self._config.timeout)
+            response = session.get(self._health_url, timeout=self._config.timeout)
             
             if response.status_code == 200:
                 return ServerStatus.AVAILABLE
             else:
-                logger.debug(
-                    f"Server {self._config.name} returned status {response.status_code}"
-                )
+                logger.debug("Server %s returned status %d", self._config.name, response.status_code)
                 return ServerStatus.UNAVAILABLE
                 
         except requests.exceptions.ConnectionError:
-            logger.debug(f"Server {self._config.name} is not reachable")
+            logger.debug("Server %s is not reachable at %s", self._config.name, self._health_url)
             return ServerStatus.UNAVAILABLE
         except requests.exceptions.Timeout:
-            logger.debug(f"Server {self._config.name} health check timed out")
+            logger.debug("Server %s health check timed out", self._config.name)
             return ServerStatus.UNAVAILABLE
         except Exception as e:
-            logger.debug(f"Error checking {self._config.name}: {e}")
+            logger.debug("Error checking %s: %s", self._config.name, e)
             return ServerStatus.UNAVAILABLE
 
 
@@ -218,14 +225,23 @@ class HealthMonitoringService:
     Service that manages all server health monitors (Dependency Inversion Principle).
     
     This class coordinates multiple health monitors and provides a unified interface
-    for managing server health monitoring across the application.
+    for managing server health monitoring across the application. All monitors share
+    one HealthCheckScheduler, so checks run concurrently on a fixed set of threads.
     """
     
-    def __init__(self):
-        """Initialize the health monitoring service."""
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the health monitoring service.
+        
+        Args:
+            max_workers: Health checks running concurrently (default: config.HEALTH_CHECK_MAX_WORKERS)
+        """
         self._monitors: Dict[str, ServerHealthMonitor] = {}
         self._lock = threading.Lock()
         self._status_change_callbacks: List[Callable[[str, ServerStatus, ServerStatus], None]] = []
+        self._scheduler = HealthCheckScheduler(
+            max_workers=max_workers or app_config.HEALTH_CHECK_MAX_WORKERS
+        )
         
     def register_server(self, config: ServerConfig) -> None:
         """
@@ -242,7 +258,8 @@ class HealthMonitoringService:
             # Create monitor with internal callback
             monitor = ServerHealthMonitor(
                 config=config,
-                on_status_change=self._on_monitor_status_change
+                on_status_change=self._on_monitor_status_change,
+                scheduler=self._scheduler
             )
             self._monitors[config.name] = monitor
             logger.info(f"Registered server {config.name} for health monitoring")
@@ -263,6 +280,7 @@ class HealthMonitoringService:
     
     def start_all(self) -> None:
         """Start monitoring all registered servers."""
+        self._scheduler.start()
         with self._lock:
             for name, monitor in self._monitors.items():
                 monitor.start()
@@ -273,8 +291,18 @@ class HealthMonitoringService:
         with self._lock:
             for name, monitor in self._monitors.items():
                 monitor.stop()
+        self._scheduler.stop()
         logger.info("Stopped all health monitoring")
     
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get health check scheduler statistics.
+        
+        Returns:
+            Dictionary with scheduled servers, checks run/failed and check timing
+        """
+        return self._scheduler.get_stats()
+    
     def get_server_status(self, server_name: str) -> Optional[ServerStatus]:
         """
         Get the current status of a specific server.
@@ -0,0 +1,102 @@
+"""
+Bandwidth Limiter - Token bucket used to cap SFTP upload throughput.
+
+Camera ingest and SFTP uploads often share the same uplink. When a backlog of
+rotated CSVs drains after an outage, unthrottled uploads can saturate that link
+and starve the camera streams. The token bucket is shared by all upload channels,
+so the cap applies to the combined upload rate.
+
+Tokens are bytes. Callers report bytes after they are sent; if the bucket is in
+debt, the caller sleeps until the debt is paid back. A burst of up to one second
+of traffic is allowed after an idle period.
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional
+from infrastructure import config
+
+
+class TokenBucket:
+    """Thread-safe token bucket measured in bytes per second."""
+    
+    def __init__(self, rate_bps: float, burst_bytes: Optional[float] = None):
+        """
+        Initialize the token bucket.
+        
+        Args:
+            rate_bps: Sustained rate in bytes per second
+            burst_bytes: Bucket capacity in bytes (default: one second of traffic)
+        """
+        self.rate_bps = float(rate_bps)
+        self.burst_bytes = float(burst_bytes) if burst_bytes else self.rate_bps
+        self._tokens = self.burst_bytes
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._total_wait_time = 0.0
+    
+    def consume(self, num_bytes: int):
+        """
+        Account for bytes that were just sent, sleeping if the rate was exceeded.
+        
+        Args:
+            num_bytes: Number of bytes sent
+        """
+        if num_bytes <= 0:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst_bytes, self._tokens + (now - self._last_refill) * self.rate_bps)
+            self._last_refill = now
+            self._tokens -= num_bytes
+            self._total_bytes += num_bytes
+            wait_time = -self._tokens / self.rate_bps if self._tokens < 0 else 0.0
+            self._total_wait_time += wait_time
+        
+        # Sleep outside the lock so other channels can report their progress meanwhile
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    def make_progress_callback(self):
+        """
+        Create a paramiko put()/get() progress callback that throttles the transfer.
+        
+        Returns:
+            Callable (bytes_transferred, total_bytes) for a single transfer
+        """
+        last_transferred = [0]
+        
+        def callback(transferred: int, total: int):
+            self.consume(transferred - last_transferred[0])
+            last_transferred[0] = transferred
+        
+        return callback
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get bandwidth limiter statistics.
+        
+        Returns:
+            dict: Configured rate, bytes accounted and total throttling delay
+        """
+        with self._lock:
+            return {
+                'rate_limit_bps': self.rate_bps,
+                'total_bytes': self._total_bytes,
+                'total_wait_time': round(self._total_wait_time, 3)
+            }
+
+
+def create_upload_limiter() -> Optional[TokenBucket]:
+    """
+    Create the upload token bucket from configuration.
+    
+    Returns:
+        TokenBucket, or None if SFTP_UPLOAD_BANDWIDTH_LIMIT_BPS disables the cap
+    """
+    rate = config.SFTP_UPLOAD_BANDWIDTH_LIMIT_BPS
+    if not rate or rate <= 0:
+        return None
+    return TokenBucket(rate, config.SFTP_UPLOAD_BANDWIDTH_BURST_BYTES)
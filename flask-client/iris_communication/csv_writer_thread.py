@@ -28,7 +28,8 @@ class CsvGenerationRequest:
     
     def __init__(self, project_settings, timestamp: datetime, data, 
                  folder_type: str, image_filename: str = None, 
-                 callback: Optional[Callable[[str], None]] = None):
+                 callback: Optional[Callable[[str], None]] = None, camera_id: str = '',
+                 flush_summary: bool = False):
         """
         Initialize a CSV generation request.
         
@@ -36,9 +37,11 @@ class CsvGenerationRequest:
             project_settings: Project settings for CSV generation
             timestamp: Timestamp for the CSV data
             data: Data to write to CSV (format depends on folder_type)
-            folder_type: Type of data ('model' or 'classifier')
+            folder_type: Type of data ('model', 'model_summary' or 'classifier')
             image_filename: Optional image filename reference
             callback: Optional callback function to call with CSV path when complete
+            camera_id: Camera identifier (used for per-camera summary aggregation)
+            flush_summary: Write the camera's open summary interval instead of new data
         """
         self.project_settings = project_settings
         self.timestamp = timestamp
@@ -46,6 +49,8 @@ class CsvGenerationRequest:
         self.folder_type = folder_type
         self.image_filename = image_filename
         self.callback = callback
+        self.camera_id = camera_id
+        self.flush_summary = flush_summary
         self.request_time = time.time()
 
 
@@ -83,7 +88,8 @@ class CsvWriterThread(BaseQueueThread):
     
     def queue_csv_generation(self, project_settings, timestamp: datetime, data,
                             folder_type: str, image_filename: str = None,
-                            callback: Optional[Callable[[str], None]] = None) -> bool:
+                            callback: Optional[Callable[[str], None]] = None,
+                            camera_id: str = '') -> bool:
         """
         Queue a CSV generation request.
         
@@ -91,9 +97,10 @@ class CsvWriterThread(BaseQueueThread):
             project_settings: Project settings for CSV generation
             timestamp: Timestamp for the CSV data
             data: Data to write to CSV
-            folder_type: Type of data ('model' or 'classifier')
+            folder_type: Type of data ('model', 'model_summary' or 'classifier')
             image_filename: Optional image filename reference
             callback: Optional callback function called with CSV path when complete
+            camera_id: Camera identifier (used for per-camera summary aggregation)
             
         Returns:
             bool: True if queued successfully, False if queue is full or thread not running
@@ -105,12 +112,39 @@ class CsvWriterThread(BaseQueueThread):
             data=data,
             folder_type=folder_type,
             image_filename=image_filename,
-            callback=callback
+            callback=callback,
+            camera_id=camera_id
         )
         
         # Use base class queue_item method
         return self.queue_item(request)
     
+    def queue_summary_flush(self, project_settings, camera_id: str,
+                            callback: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        Queue writing a camera's open 'model_summary' interval (e.g. when its stream stops).
+        
+        Args:
+            project_settings: Project settings for CSV generation
+            camera_id: Camera identifier whose interval is closed
+            callback: Optional callback function called with CSV path when complete
+            
+        Returns:
+            bool: True if queued successfully, False if queue stayed full or thread not running
+        """
+        request = CsvGenerationRequest(
+            project_settings=project_settings,
+            timestamp=datetime.now(),
+            data=None,
+            folder_type='model_summary',
+            callback=callback,
+            camera_id=camera_id,
+            flush_summary=True
+        )
+        
+        # Wait for room - a dropped flush would lose the interval
+        return self.queue_item(request, timeout=5.0)
+    
     def _process_item(self, request: CsvGenerationRequest):
         """
         Process a single CSV generation request.
@@ -121,22 +155,29 @@ class CsvWriterThread(BaseQueueThread):
         # Import here to avoid circular dependencies
         from iris_communication.iris_input_processor import iris_input_processor
         
-        logger.debug(f"[{self.thread_id}] Generating CSV for {request.folder_type}")
-        
-        # Generate the CSV file
-        csv_path = iris_input_processor.generate_iris_input_data(
-            project_settings=request.project_settings,
-            timestamp=request.timestamp,
-            data=request.data,
-            folder_type=request.folder_type,
-            image_filename=request.image_filename
-        )
+        if request.flush_summary:
+            csv_path = iris_input_processor.flush_particle_summary(request.project_settings, request.camera_id)
+            if not csv_path:
+                # Nothing aggregated for this camera
+                return
+        else:
+            logger.debug("[%s] Generating CSV for %s", self.thread_id, request.folder_type)
+            
+            # Generate the CSV file
+            csv_path = iris_input_processor.generate_iris_input_data(
+                project_settings=request.project_settings,
+                timestamp=request.timestamp,
+                data=request.data,
+                folder_type=request.folder_type,
+                image_filename=request.image_filename,
+                camera_id=request.camera_id
+            )
         
         # Update statistics
         with self._lock:
             if csv_path:
                 self._stats['total_written'] += 1
-                logger.info(f"[{self.thread_id}] CSV written: {csv_path}")
+                logger.debug("[%s] CSV written: %s", self.thread_id, csv_path)
             else:
                 self._stats['total_failed'] += 1
                 logger.warning(f"[{self.thread_id}] CSV generation returned None")
@@ -147,6 +188,17 @@ class CsvWriterThread(BaseQueueThread):
                 request.callback(csv_path)
             except Exception as e:
                 logger.error(f"[{self.thread_id}] Error in callback: {e}")
+    
+    def _on_stop(self):
+        """Write the open summary intervals of all cameras so the last interval isn't lost on shutdown."""
+        from iris_communication.iris_input_processor import iris_input_processor
+        
+        try:
+            csv_path = iris_input_processor.flush_particle_summary()
+            if csv_path:
+                logger.info(f"[{self.thread_id}] Wrote open summary intervals to {csv_path}")
+        except Exception as e:
+            logger.error(f"[{self.thread_id}] Error writing open summary intervals: {e}")
 
 
 # Global singleton instance
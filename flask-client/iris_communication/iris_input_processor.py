@@ -4,6 +4,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import Any, Optional
 from infrastructure.logging.logging_provider import get_logger
+from iris_communication.particle_size_aggregator import ParticleSizeAggregator, SUMMARY_COLUMNS
 
 # Initialize logger
 logger = get_logger()
@@ -19,6 +20,10 @@ class IrisInputProcessor:
         self.active_csv_files = {}
         # Track last processing time for calculating time_diff and images_per_second
         self.last_processing_time = {}
+        # Per-camera particle size distribution for 'model_summary' output
+        self.particle_aggregator = ParticleSizeAggregator()
+        # Project settings of the last 'model_summary' request, used to flush on shutdown
+        self._summary_project_settings = None
     
     def _calculate_timing_metrics(self, folder_type: str) -> tuple[float, float]:
         current_time = datetime.now()
@@ -87,6 +92,15 @@ class IrisInputProcessor:
         df = pd.DataFrame(rows)
         return df
     
+    def _transform_model_data_to_summary_dataframe(self, data: Any, camera_id: str, status_timestamp: datetime,
+                                                  summary_interval_seconds: int) -> pd.DataFrame:
+        # Feed the particles into the per-camera interval statistics; rows are only
+        # produced when an interval closes, so most calls return an empty DataFrame
+        particles = data[2] if isinstance(data, list) and len(data) >= 3 else []
+        rows = self.particle_aggregator.add(camera_id or 'default', status_timestamp, particles,
+                                            summary_interval_seconds)
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    
     def create_iris_csv_input(self, 
                              csv_name: str, 
                              project_title: str, 
@@ -97,7 +111,10 @@ class IrisInputProcessor:
                              subfolder: str,
                              folder_type: str = 'classifier',
                              image_filename: str = '',
-                             csv_interval_seconds: int = 60) -> Optional[str]:
+                             csv_interval_seconds: int = 60,
+                             camera_id: str = '',
+                             summary_interval_seconds: int = 60,
+                             summary_rows: Optional[list] = None) -> Optional[str]:
         """
         Create CSV file with IRIS input data.
         
@@ -109,9 +126,12 @@ class IrisInputProcessor:
             data: The result or status data to store
             iris_main_folder: Main folder path for IRIS data
             subfolder: Subfolder within the main IRIS folder (e.g., model or classifier subfolder)
-            folder_type: Type of folder - 'model' or 'classifier'
+            folder_type: Type of folder - 'model', 'model_summary' or 'classifier'
             image_filename: Name of the stored image file (for model results)
             csv_interval_seconds: Seconds to accumulate data in same CSV file
+            camera_id: Camera identifier (used to aggregate 'model_summary' rows per camera)
+            summary_interval_seconds: Seconds covered by one 'model_summary' row
+            summary_rows: Already closed 'model_summary' rows to write instead of aggregating data
             
         Returns:
             Path to the created CSV file, or None if failed
@@ -140,7 +160,7 @@ class IrisInputProcessor:
                 else:
                     # Use existing file
                     csv_filepath = Path(active_info['path'])
-                    logger.info(f"[IRIS] Appending to existing {folder_type} CSV: {csv_filepath.name}")
+                    logger.debug("[IRIS] Appending to existing %s CSV: %s", folder_type, csv_filepath.name)
             else:
                 # No active file, create new one
                 create_new_file = True
@@ -174,6 +194,17 @@ class IrisInputProcessor:
                 if df is not None:
                     # Write to CSV (with or without header based on mode)
                     df.to_csv(csv_filepath, mode=mode, index=False, header=create_new_file)
+            elif folder_type == 'model_summary':
+                # Aggregated particle size distribution: one row per camera per interval
+                if summary_rows is not None:
+                    df = pd.DataFrame(summary_rows, columns=SUMMARY_COLUMNS)
+                else:
+                    df = self._transform_model_data_to_summary_dataframe(data, camera_id, status_timestamp,
+                                                                        summary_interval_seconds)
+                
+                # New files always get a header so the active CSV exists even before the first row
+                if create_new_file or not df.empty:
+                    df.to_csv(csv_filepath, mode=mode, index=False, header=create_new_file)
             else:
                 # Classifier results: transform and write using pandas
                 df = self._transform_classifier_data_to_dataframe(data, status_str)
@@ -186,7 +217,9 @@ class IrisInputProcessor:
             logger.error(f"Error generating IRIS input data: {e}")
             return None
     
-    def generate_iris_input_data(self, project_settings, timestamp: datetime, data: Any, folder_type: str, image_filename: str = '') -> Optional[str]:
+    def generate_iris_input_data(self, project_settings, timestamp: datetime, data: Any, folder_type: str,
+                                 image_filename: str = '', camera_id: str = '',
+                                 summary_rows: Optional[list] = None) -> Optional[str]:
         """
         Wrapper method to generate IRIS input CSV data with automatic configuration.
         
@@ -194,8 +227,10 @@ class IrisInputProcessor:
             project_settings: ProjectSettings object containing IRIS configuration
             timestamp: Timestamp for the data
             data: The result or status data to store
-            folder_type: Type of folder - 'model' or 'classifier'
+            folder_type: Type of folder - 'model', 'model_summary' or 'classifier'
             image_filename: Name of the stored image file (for model results)
+            camera_id: Camera identifier (for per-camera 'model_summary' aggregation)
+            summary_rows: Already closed 'model_summary' rows to write instead of aggregating data
             
         Returns:
             Path to the created CSV file, or None if not created
@@ -211,11 +246,16 @@ class IrisInputProcessor:
         # Get CSV interval from project settings
         csv_interval = getattr(project_settings, 'csv_interval_seconds', 60)
         
+        summary_interval = getattr(project_settings, 'summary_interval_seconds', 60)
+        
+        if folder_type == 'model_summary':
+            self._summary_project_settings = project_settings
+        
         # Determine subfolder based on type
-        if folder_type == 'model':
+        if folder_type in ('model', 'model_summary'):
             subfolder = project_settings.iris_model_subfolder
             if not subfolder:
-                logger.warning(f"[IRIS] Skipping model CSV - No model subfolder configured")
+                logger.warning(f"[IRIS] Skipping {folder_type} CSV - No model subfolder configured")
                 return None
         elif folder_type == 'classifier':
             subfolder = project_settings.iris_classifier_subfolder
@@ -227,8 +267,11 @@ class IrisInputProcessor:
             return None
         
         # Generate CSV name
-        csv_name = f"{subfolder}_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}"
-        logger.info(f"[IRIS] Generating {folder_type} CSV: {csv_name}")
+        if folder_type == 'model_summary':
+            csv_name = f"{subfolder}_summary_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}"
+        else:
+            csv_name = f"{subfolder}_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}"
+        logger.debug("[IRIS] Generating %s CSV: %s", folder_type, csv_name)
         
         # Create CSV
         csv_path = self.create_iris_csv_input(
@@ -241,13 +284,49 @@ class IrisInputProcessor:
             subfolder=subfolder,
             folder_type=folder_type,
             image_filename=image_filename,
-            csv_interval_seconds=csv_interval
+            csv_interval_seconds=csv_interval,
+            camera_id=camera_id,
+            summary_interval_seconds=summary_interval,
+            summary_rows=summary_rows
         )
         
         if csv_path:
-            logger.info(f"[IRIS] {folder_type.capitalize()} CSV created at: {csv_path}")
+            logger.debug("[IRIS] %s CSV created at: %s", folder_type.capitalize(), csv_path)
         
         return csv_path
+    
+    def flush_particle_summary(self, project_settings=None, camera_id: Optional[str] = None) -> Optional[str]:
+        """
+        Write the open 'model_summary' interval of one camera (or all cameras) early,
+        e.g. when a stream stops or the application shuts down.
+        
+        Args:
+            project_settings: ProjectSettings object (default: settings of the last summary request)
+            camera_id: Camera identifier, or None to flush every camera
+            
+        Returns:
+            Path to the CSV file the rows were written to, or None if there was nothing to write
+        """
+        if camera_id is not None:
+            # Same key as used when aggregating
+            camera_id = camera_id or 'default'
+        rows = self.particle_aggregator.flush(camera_id)
+        if not rows:
+            return None
+        
+        project_settings = project_settings or self._summary_project_settings
+        if not project_settings:
+            logger.warning(f"[IRIS] Dropping {len(rows)} summary row(s) - No project settings found")
+            return None
+        
+        return self.generate_iris_input_data(
+            project_settings=project_settings,
+            timestamp=datetime.now(),
+            data=None,
+            folder_type='model_summary',
+            camera_id=camera_id or '',
+            summary_rows=rows
+        )
 
 
 # Global instance
@@ -0,0 +1,104 @@
+"""
+Payload Compression - Compresses rotated IRIS CSV files before SFTP upload.
+
+Model CSVs repeat long timestamp and image-name strings on every row, so they
+compress very well. Compression runs in the CSV writer thread (inside the CSV
+completion callbacks) so the SFTP uploader thread only has to move bytes.
+
+Supported methods:
+- 'none': upload the CSV as-is
+- 'gzip': standard library gzip, always available
+- 'zstd': requires the optional 'zstandard' package, falls back to gzip if missing
+"""
+
+import gzip
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Optional
+from infrastructure.logging.logging_provider import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+SUPPORTED_COMPRESSION = ('none', 'gzip', 'zstd')
+
+# Chunk size used when streaming file contents through the compressor
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class CompressedPayload:
+    """Result of compressing a file for upload."""
+    path: str
+    original_size: int
+    compressed_size: int
+    method: str
+
+
+def _compress_gzip(source_path: str, target_path: str):
+    with open(source_path, 'rb') as src, gzip.open(target_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+
+
+def _compress_zstd(source_path: str, target_path: str):
+    import zstandard
+    compressor = zstandard.ZstdCompressor(level=10)
+    with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+        compressor.copy_stream(src, dst, read_size=_COPY_CHUNK_SIZE)
+
+
+def compress_file(file_path: str, method: str) -> Optional[CompressedPayload]:
+    """
+    Compress a file next to the original (e.g. data.csv -> data.csv.gz).
+
+    The compressed file is written under a temporary name and renamed into place,
+    so a crash never leaves a truncated payload that looks complete.
+
+    Args:
+        file_path: Local file to compress
+        method: One of SUPPORTED_COMPRESSION
+
+    Returns:
+        CompressedPayload describing the compressed file, or None if no compression
+        was requested or compression failed (caller should upload the original file)
+    """
+    if not method or method == 'none':
+        return None
+
+    if method not in SUPPORTED_COMPRESSION:
+        logger.warning(f"[Compression] Unknown compression method '{method}', uploading uncompressed")
+        return None
+
+    if method == 'zstd':
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            logger.warning("[Compression] zstandard package not installed, falling back to gzip")
+            method = 'gzip'
+
+    extension = '.gz' if method == 'gzip' else '.zst'
+    target_path = f"{file_path}{extension}"
+    temp_path = f"{target_path}.tmp"
+
+    try:
+        if method == 'gzip':
+            _compress_gzip(file_path, temp_path)
+        else:
+            _compress_zstd(file_path, temp_path)
+        os.replace(temp_path, target_path)
+
+        return CompressedPayload(
+            path=target_path,
+            original_size=os.path.getsize(file_path),
+            compressed_size=os.path.getsize(target_path),
+            method=method
+        )
+    except Exception as e:
+        logger.error(f"[Compression] Failed to compress {file_path} with {method}: {e}")
+        try:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        except OSError:
+            pass
+        return None
@@ -0,0 +1,333 @@
+"""
+SFTP Connection Pool - Reuses authenticated SFTP sessions across uploads.
+
+Opening a paramiko.Transport costs a TCP connect, an SSH key exchange and an
+authentication round trip. This module keeps authenticated transports per SFTP
+server and hands them out to SftpProcessor, so consecutive uploads only pay for
+the file transfer itself.
+
+Key Features:
+- Pool of authenticated transports per SftpServerInfos (bounded per server)
+- SSH keepalive on pooled transports and idle expiry
+- Transparent reconnect: dead transports are discarded and replaced on acquire
+- Cache of remote directories already known to exist (skips stat/mkdir walks)
+- Statistics: connection setup time and reuse rate
+"""
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple, Any
+import paramiko
+from sqlite.sftp_sqlite_provider import SftpServerInfos
+from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
+
+logger = get_logger()
+
+
+class PooledSftpConnection:
+    """An authenticated transport with its SFTP channel."""
+    
+    def __init__(self, key: Tuple, transport: paramiko.Transport, sftp: paramiko.SFTPClient):
+        self.key = key
+        self.transport = transport
+        self.sftp = sftp
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.use_count = 0
+    
+    @property
+    def reused(self) -> bool:
+        """True if this connection already served a previous upload."""
+        return self.use_count > 1
+    
+    def is_alive(self) -> bool:
+        """Check if the underlying transport is still usable."""
+        return self.transport is not None and self.transport.is_active()
+    
+    def close(self):
+        """Close the SFTP channel and transport, ignoring errors."""
+        try:
+            self.sftp.close()
+        except Exception:
+            pass
+        try:
+            self.transport.close()
+        except Exception:
+            pass
+
+
+class SftpConnectionPool:
+    """
+    Thread-safe pool of authenticated SFTP connections keyed by server credentials.
+    """
+    
+    def __init__(
+        self,
+        max_connections_per_server: int = None,
+        idle_timeout: float = None,
+        keepalive_interval: int = None,
+        connect_timeout: float = None,
+        port: int = None
+    ):
+        """
+        Initialize the connection pool.
+        
+        Args:
+            max_connections_per_server: Maximum open transports per SFTP server
+            idle_timeout: Seconds after which an idle transport is closed
+            keepalive_interval: SSH keepalive interval in seconds
+            connect_timeout: Connect/banner/auth timeout in seconds
+            port: SFTP server port
+        """
+        self.max_connections_per_server = max_connections_per_server or config.SFTP_POOL_MAX_CONNECTIONS_PER_SERVER
+        self.idle_timeout = idle_timeout or config.SFTP_POOL_IDLE_TIMEOUT
+        self.keepalive_interval = keepalive_interval or config.SFTP_POOL_KEEPALIVE_INTERVAL
+        self.connect_timeout = connect_timeout or config.SFTP_CONNECT_TIMEOUT
+        self.port = port or config.SFTP_PORT
+        
+        self._condition = threading.Condition()
+        self._idle: Dict[Tuple, List[PooledSftpConnection]] = {}
+        self._open_counts: Dict[Tuple, int] = {}
+        self._known_directories: Dict[Tuple, Set[str]] = {}
+        
+        self._stats = {
+            'connections_created': 0,
+            'connections_reused': 0,
+            'connections_discarded': 0,
+            'connections_expired': 0,
+            'connect_failures': 0,
+            'total_connect_time': 0.0,
+            'last_connect_time_ms': 0.0,
+            'directory_cache_hits': 0,
+            'directory_cache_misses': 0
+        }
+    
+    @staticmethod
+    def _make_key(server_info: SftpServerInfos) -> Tuple:
+        # Password is part of the key so edited credentials never reuse a stale session
+        return (server_info.server_name, server_info.username, server_info.password)
+    
+    @staticmethod
+    def _describe_key(key: Tuple) -> str:
+        return f"{key[1]}@{key[0]}"
+    
+    def _connect(self, key: Tuple) -> PooledSftpConnection:
+        """Open and authenticate a new transport (called without the pool lock held)."""
+        server_name, username, password = key
+        start_time = time.time()
+        sock = None
+        transport = None
+        try:
+            sock = socket.create_connection((server_name, self.port), timeout=self.connect_timeout)
+            transport = paramiko.Transport(sock)
+            transport.banner_timeout = self.connect_timeout
+            transport.auth_timeout = self.connect_timeout
+            transport.connect(username=username, password=password)
+            transport.set_keepalive(self.keepalive_interval)
+            sftp = paramiko.SFTPClient.from_transport(transport)
+        except Exception:
+            if transport is not None:
+                transport.close()
+            elif sock is not None:
+                sock.close()
+            raise
+        
+        connect_time = time.time() - start_time
+        with self._condition:
+            self._stats['connections_created'] += 1
+            self._stats['total_connect_time'] += connect_time
+            self._stats['last_connect_time_ms'] = round(connect_time * 1000, 1)
+        
+        logger.info(f"[SFTP Pool] Opened connection to {self._describe_key(key)} in {connect_time * 1000:.0f}ms")
+        return PooledSftpConnection(key, transport, sftp)
+    
+    def acquire(self, server_info: SftpServerInfos, timeout: Optional[float] = None) -> PooledSftpConnection:
+        """
+        Get an authenticated connection for a server, reusing an idle one when possible.
+        
+        Blocks while the server already has max_connections_per_server connections in use.
+        
+        Args:
+            server_info: SFTP server credentials
+            timeout: Maximum seconds to wait for a free slot (None = connect timeout)
+        
+        Returns:
+            PooledSftpConnection ready for use
+        
+        Raises:
+            TimeoutError: If no connection slot became available in time
+            Exception: Any connection/authentication error from paramiko
+        """
+        key = self._make_key(server_info)
+        wait_timeout = timeout if timeout is not None else self.connect_timeout
+        deadline = time.time() + wait_timeout
+        
+        with self._condition:
+            while True:
+                idle = self._idle.get(key)
+                while idle:
+                    connection = idle.pop()
+                    if connection.is_alive():
+                        connection.use_count += 1
+                        connection.last_used = time.time()
+                        self._stats['connections_reused'] += 1
+                        return connection
+                    
+                    # Transport died while idle (server restart, link drop) - replace it
+                    self._open_counts[key] -= 1
+                    self._stats['connections_discarded'] += 1
+                    connection.close()
+                
+                if self._open_counts.get(key, 0) < self.max_connections_per_server:
+                    # Reserve a slot, then connect outside the lock
+                    self._open_counts[key] = self._open_counts.get(key, 0) + 1
+                    break
+                
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"No SFTP connection available for {self._describe_key(key)}")
+                self._condition.wait(remaining)
+        
+        try:
+            connection = self._connect(key)
+        except Exception:
+            with self._condition:
+                self._open_counts[key] -= 1
+                self._stats['connect_failures'] += 1
+                self._condition.notify()
+            raise
+        
+        connection.use_count = 1
+        return connection
+    
+    def release(self, connection: PooledSftpConnection, discard: bool = False):
+        """
+        Return a connection to the pool.
+        
+        Args:
+            connection: Connection obtained from acquire()
+            discard: Close the connection instead of keeping it (e.g. after an error)
+        """
+        with self._condition:
+            if discard or not connection.is_alive():
+                self._open_counts[connection.key] -= 1
+                self._stats['connections_discarded'] += 1
+                connection.close()
+            else:
+                connection.last_used = time.time()
+                self._idle.setdefault(connection.key, []).append(connection)
+            self._condition.notify()
+    
+    @contextmanager
+    def connection(self, server_info: SftpServerInfos):
+        """
+        Context manager that acquires a connection and releases it afterwards.
+        
+        The connection is discarded if the block raises, so a broken transport is
+        never handed out again.
+        
+        Args:
+            server_info: SFTP server credentials
+        """
+        connection = self.acquire(server_info)
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, discard=True)
+            raise
+        else:
+            self.release(connection)
+    
+    def is_known_directory(self, connection: PooledSftpConnection, remote_path: str) -> bool:
+        """Check if a remote directory is already known to exist on this server."""
+        with self._condition:
+            known = remote_path in self._known_directories.get(connection.key, ())
+            if known:
+                self._stats['directory_cache_hits'] += 1
+            else:
+                self._stats['directory_cache_misses'] += 1
+            return known
+    
+    def mark_directory(self, connection: PooledSftpConnection, remote_path: str):
+        """Remember that a remote directory exists on this server."""
+        with self._condition:
+            self._known_directories.setdefault(connection.key, set()).add(remote_path)
+    
+    def forget_directory(self, connection: PooledSftpConnection, remote_path: str):
+        """Drop a remote directory from the cache (e.g. it was removed remotely)."""
+        with self._condition:
+            self._known_directories.get(connection.key, set()).discard(remote_path)
+    
+    def cleanup_idle(self) -> int:
+        """
+        Close idle connections that exceeded the idle timeout.
+        
+        Returns:
+            int: Number of connections closed
+        """
+        now = time.time()
+        expired = []
+        with self._condition:
+            for key, idle in self._idle.items():
+                keep = []
+                for connection in idle:
+                    if now - connection.last_used > self.idle_timeout or not connection.is_alive():
+                        expired.append(connection)
+                        self._open_counts[key] -= 1
+                    else:
+                        keep.append(connection)
+                self._idle[key] = keep
+            self._stats['connections_expired'] += len(expired)
+            if expired:
+                self._condition.notify_all()
+        
+        for connection in expired:
+            connection.close()
+        
+        if expired:
+            logger.debug(f"[SFTP Pool] Closed {len(expired)} idle connection(s)")
+        return len(expired)
+    
+    def close_all(self):
+        """Close every idle connection (connections in use are closed when released)."""
+        with self._condition:
+            connections = [c for idle in self._idle.values() for c in idle]
+            for key in self._idle:
+                self._open_counts[key] -= len(self._idle[key])
+            self._idle.clear()
+            self._known_directories.clear()
+            self._condition.notify_all()
+        
+        for connection in connections:
+            connection.close()
+        logger.info(f"[SFTP Pool] Closed {len(connections)} pooled connection(s)")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool statistics.
+        
+        Returns:
+            dict: Setup times, reuse rate and per-server connection counts
+        """
+        with self._condition:
+            stats = self._stats.copy()
+            created = stats['connections_created']
+            reused = stats['connections_reused']
+            stats['avg_connect_time_ms'] = round(stats.pop('total_connect_time') / created * 1000, 1) if created else 0.0
+            stats['reuse_rate'] = round(reused / (created + reused), 3) if (created + reused) else 0.0
+            stats['servers'] = {
+                self._describe_key(key): {
+                    'open': count,
+                    'idle': len(self._idle.get(key, [])),
+                    'known_directories': len(self._known_directories.get(key, ()))
+                }
+                for key, count in self._open_counts.items()
+            }
+            return stats
+
+
+# Global instance
+sftp_connection_pool = SftpConnectionPool()
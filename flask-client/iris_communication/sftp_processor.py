@@ -1,112 +1,398 @@
+import hashlib
 import os
-import paramiko
+from typing import Optional, List
 from sqlite.sftp_sqlite_provider import SftpServerInfos
+from iris_communication.sftp_connection_pool import sftp_connection_pool, PooledSftpConnection
+from iris_communication.bandwidth_limiter import TokenBucket, create_upload_limiter
 from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
 
 # Initialize logger
 logger = get_logger()
 
+# Read size used for hashing and for resumed (appending) uploads
+_CHUNK_SIZE = 1024 * 1024
+
 
 class SftpProcessor:
     """Handles SFTP file transfer operations."""
     
-    def __init__(self):
-        pass
+    def __init__(self, connection_pool=None, bandwidth_limiter=None):
+        self.connection_pool = connection_pool or sftp_connection_pool
+        self.bandwidth_limiter = bandwidth_limiter if bandwidth_limiter is not None else create_upload_limiter()
     
-    def transferData(self, sftp_server_info: SftpServerInfos, file_path: str, project_settings, folder_type: str) -> dict:
+    def transferData(self, sftp_server_info: SftpServerInfos, file_path: str, project_settings, folder_type: str,
+                     remote_directory: Optional[str] = None, bandwidth_limiter: Optional[TokenBucket] = None) -> dict:
         """
         Transfer a single CSV file to an SFTP server.
         
+        The file is uploaded as '<name>.part' and renamed once the transfer is complete.
+        If SFTP_WRITE_CHECKSUM_SIDECAR is set, files of at least SFTP_SKIP_IDENTICAL_MIN_SIZE
+        bytes get a '<name>.sha256' sidecar, and their upload is skipped if the remote file
+        already has the same size and sidecar checksum. Large files resume
+        from an existing '.part' and are verified before the rename (see _verify_resumed_upload).
+        Connections come from the shared connection pool; if a reused connection turns
+        out to be broken, the upload is retried once on a fresh connection.
+        Safe to call from several threads at once; each call uses its own pooled connection.
+        
         Args:
             sftp_server_info: SftpServerInfos object containing server credentials
             file_path: Local file path to the CSV file to transfer
             project_settings: ProjectSettings object containing IRIS folder configuration
             folder_type: Type of data - 'model' or 'classifier'
-            
+            remote_directory: Explicit remote directory (e.g. resolved when the upload was spooled);
+                              project_settings/folder_type are ignored if given
+            bandwidth_limiter: Additional cap for this transfer (e.g. low-priority archive uploads),
+                               applied on top of the shared upload cap
+        
         Returns:
-            dict: Summary of transfer results with success/failure information
+            dict: Summary of transfer results with success/failure information.
+                  Failures carry 'retryable': False when retrying cannot help.
         """
         if not os.path.exists(file_path):
             return {
                 'success': False,
+                'retryable': False,
                 'error': f'File not found: {file_path}'
             }
         
         if not os.path.isfile(file_path):
             return {
                 'success': False,
+                'retryable': False,
                 'error': f'Path is not a file: {file_path}'
             }
         
         # Validate project settings
-        if not project_settings:
+        if remote_directory is None and not project_settings:
             return {
                 'success': False,
+                'retryable': False,
                 'error': 'Project settings not found. Please configure project settings first.'
             }
         
-        transport = None
-        sftp = None
+        # Get file name from path
+        file_name = os.path.basename(file_path)
+        target_directory = remote_directory if remote_directory is not None else self.resolve_target_directory(project_settings, folder_type)
+        remote_file_path = f"{target_directory}/{file_name}"
+        file_size = os.path.getsize(file_path)
         
-        try:
-            # Connect to SFTP server
-            transport = paramiko.Transport((sftp_server_info.server_name, 22))
-            transport.connect(username=sftp_server_info.username, password=sftp_server_info.password)
-            sftp = paramiko.SFTPClient.from_transport(transport)
-            
-            # Get file name from path
-            file_name = os.path.basename(file_path)
-            
-            # Determine the target directory based on the folder type and project settings
-            if folder_type == 'model':
-                # Model data - use iris_main_folder/iris_model_subfolder
-                target_directory = f'{project_settings.iris_main_folder}/{project_settings.iris_model_subfolder}'
-            elif folder_type == 'classifier':
-                # Classifier data - use iris_main_folder/iris_classifier_subfolder
-                target_directory = f'{project_settings.iris_main_folder}/{project_settings.iris_classifier_subfolder}'
-            else:
-                # Default to iris_main_folder if folder type doesn't match
-                target_directory = project_settings.iris_main_folder
-            
-            # Ensure target directory exists (create if it doesn't)
+        for attempt in range(2):
+            connection = None
             try:
-                sftp.stat(target_directory)
-            except FileNotFoundError:
-                # Create directory if it doesn't exist
-                self._create_remote_directory(sftp, target_directory)
+                with self.connection_pool.connection(sftp_server_info) as connection:
+                    # Ensure target directory exists (create if it doesn't)
+                    self._ensure_remote_directory(connection, target_directory)
+                    transfer = self._upload_file(connection.sftp, file_path, remote_file_path, file_size,
+                                                 self._get_limiters(bandwidth_limiter))
+                
+                if transfer['skipped']:
+                    logger.info(f"Skipped {file_name}: identical file already at {remote_file_path}")
+                elif transfer['resumed_from']:
+                    logger.info(f"Successfully uploaded {file_name} to {remote_file_path} "
+                                f"(resumed at {transfer['resumed_from']} of {file_size} bytes)")
+                else:
+                    logger.info(f"Successfully uploaded {file_name} to {remote_file_path}")
+                
+                return {
+                    'success': True,
+                    'message': f'Successfully uploaded {file_name}',
+                    'file': file_name,
+                    'local_path': file_path,
+                    'remote_path': remote_file_path,
+                    'bytes': transfer['bytes_sent'],
+                    'skipped': transfer['skipped'],
+                    'resumed_from': transfer['resumed_from']
+                }
             
-            # Upload the file to the target directory
-            remote_file_path = f"{target_directory}/{file_name}"
-            sftp.put(file_path, remote_file_path)
-            
-            logger.info(f"Successfully uploaded {file_name} to {remote_file_path}")
+            except Exception as e:
+                # A pooled transport may have been dropped by the server, or a cached
+                # directory removed remotely - retry once on a fresh connection
+                if attempt == 0 and connection is not None and (connection.reused or isinstance(e, FileNotFoundError)):
+                    self.connection_pool.forget_directory(connection, target_directory)
+                    logger.warning(f"SFTP upload on pooled connection failed ({e}), reconnecting")
+                    continue
+                
+                logger.error(f"Error during SFTP upload: {e}")
+                return {
+                    'success': False,
+                    'retryable': True,
+                    'error': f'SFTP upload error: {str(e)}'
+                }
+    
+    def _get_limiters(self, extra_limiter: Optional[TokenBucket]) -> List[TokenBucket]:
+        """Token buckets a transfer has to pass: the shared cap and an optional per-transfer cap."""
+        return [limiter for limiter in (self.bandwidth_limiter, extra_limiter) if limiter]
+    
+    def _make_progress_callback(self, limiters: Optional[List[TokenBucket]]):
+        """Combine the put() progress callbacks of several token buckets (None if the transfer is not capped)."""
+        callbacks = [limiter.make_progress_callback() for limiter in limiters or []]
+        if not callbacks:
+            return None
+        
+        def callback(transferred: int, total: int):
+            for limiter_callback in callbacks:
+                limiter_callback(transferred, total)
+        
+        return callback
+    
+    def _upload_file(self, sftp, file_path: str, remote_file_path: str, file_size: int,
+                     limiters: Optional[List[TokenBucket]] = None) -> dict:
+        """
+        Upload a file unless an identical copy is already on the server.
+        
+        The local file is only hashed when a checksum is needed: for the skip-if-identical
+        check and sidecar, or to verify a resumed upload.
+        
+        Args:
+            sftp: Active SFTP client connection
+            file_path: Local file path
+            remote_file_path: Final remote path
+            file_size: Local file size in bytes
+            limiters: Token buckets throttling the transfer
+        
+        Returns:
+            dict with 'skipped', 'bytes_sent' and 'resumed_from' (0 if not resumed)
+        """
+        check_identical = config.SFTP_WRITE_CHECKSUM_SIDECAR and file_size >= config.SFTP_SKIP_IDENTICAL_MIN_SIZE
+        checksum = self._sha256_file(file_path) if check_identical else None
+        if check_identical and self._is_remote_identical(sftp, remote_file_path, file_size, checksum):
+            return {'skipped': True, 'bytes_sent': 0, 'resumed_from': 0}
+        
+        # Upload under a temporary name and rename once complete, so the remote
+        # side never picks up a partially transferred file
+        temp_remote_path = f"{remote_file_path}.part"
+        bytes_sent = 0
+        offset = self._get_resume_offset(sftp, temp_remote_path, file_size)
+        if offset:
+            bytes_sent += self._append_upload(sftp, file_path, temp_remote_path, offset, limiters)
+            if not self._verify_resumed_upload(sftp, temp_remote_path, file_path, file_size, checksum):
+                logger.warning(f"Verification failed after resuming {temp_remote_path}, uploading it again in full")
+                offset = 0
+        
+        if not offset:
+            sftp.put(file_path, temp_remote_path, callback=self._make_progress_callback(limiters))
+            bytes_sent += file_size
+        
+        self._rename_remote_file(sftp, temp_remote_path, remote_file_path)
+        if check_identical:
+            self._write_checksum_sidecar(sftp, remote_file_path, checksum)
+        
+        return {'skipped': False, 'bytes_sent': bytes_sent, 'resumed_from': offset}
+    
+    def _sha256_file(self, file_path: str) -> str:
+        """Compute the SHA-256 hex digest of a local file."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _is_remote_identical(self, sftp, remote_file_path: str, file_size: int, checksum: str) -> bool:
+        """
+        Check if the remote file has the same size and the same checksum in its sidecar.
+        
+        Only a missing file or sidecar means "not identical"; other SFTP errors propagate
+        so the upload fails (and is retried) instead of silently re-uploading.
+        
+        Args:
+            sftp: Active SFTP client connection
+            remote_file_path: Final remote path
+            file_size: Local file size in bytes
+            checksum: SHA-256 hex digest of the local file
+        
+        Returns:
+            bool: True if the upload can be skipped
+        """
+        try:
+            if sftp.stat(remote_file_path).st_size != file_size:
+                return False
+            with sftp.open(f"{remote_file_path}.sha256", 'r') as sidecar:
+                content = sidecar.read(1024).decode('utf-8', errors='replace').split()
+        except FileNotFoundError:
+            # Remote file or sidecar does not exist (paramiko raises ENOENT as FileNotFoundError)
+            return False
+        return bool(content) and content[0].lower() == checksum
+    
+    def _get_resume_offset(self, sftp, temp_remote_path: str, file_size: int) -> int:
+        """
+        Get the size of a partial upload that can be resumed.
+        
+        Only files of at least SFTP_RESUME_MIN_SIZE bytes are resumed; smaller files are
+        cheaper to upload again than to verify.
+        
+        Returns:
+            int: Byte offset to resume from, or 0 to upload from the start
+        """
+        if file_size < config.SFTP_RESUME_MIN_SIZE:
+            return 0
+        try:
+            part_size = sftp.stat(temp_remote_path).st_size
+        except IOError:
+            return 0
+        return part_size if 0 < part_size < file_size else 0
+    
+    def _append_upload(self, sftp, file_path: str, temp_remote_path: str, offset: int,
+                       limiters: Optional[List[TokenBucket]] = None) -> int:
+        """
+        Send the rest of a file into an existing partial remote file.
+        
+        Args:
+            sftp: Active SFTP client connection
+            file_path: Local file path
+            temp_remote_path: Remote '.part' file holding the first offset bytes
+            offset: Number of bytes already on the server
+            limiters: Token buckets throttling the transfer
+        
+        Returns:
+            int: Number of bytes sent
+        """
+        bytes_sent = 0
+        with open(file_path, 'rb') as local_file, sftp.open(temp_remote_path, 'r+') as remote_file:
+            local_file.seek(offset)
+            remote_file.seek(offset)
+            remote_file.set_pipelined(True)
+            for chunk in iter(lambda: local_file.read(_CHUNK_SIZE), b''):
+                remote_file.write(chunk)
+                bytes_sent += len(chunk)
+                for limiter in limiters or []:
+                    limiter.consume(len(chunk))
+        return bytes_sent
+    
+    def _verify_resumed_upload(self, sftp, remote_path: str, file_path: str, file_size: int,
+                               checksum: Optional[str] = None) -> bool:
+        """
+        Verify a resumed upload before it is renamed.
+        
+        Uses the server-side SHA-256 (check-file extension) when available. Otherwise the
+        file is read back and hashed only if SFTP_RESUME_VERIFY_READBACK is set, since that
+        downloads the whole file again; by default only its size is checked.
+        
+        Args:
+            sftp: Active SFTP client connection
+            remote_path: Remote '.part' file
+            file_path: Local file path
+            file_size: Local file size in bytes
+            checksum: SHA-256 hex digest of the local file, if already computed
+        
+        Returns:
+            bool: True if the remote file matches the local file
+        """
+        with sftp.open(remote_path, 'r') as remote_file:
+            try:
+                remote_checksum = remote_file.check('sha256').hex()
+            except IOError:
+                # Server does not support check-file (e.g. OpenSSH)
+                remote_checksum = None
+            if remote_checksum is not None:
+                return remote_checksum == (checksum or self._sha256_file(file_path))
             
-            return {
-                'success': True,
-                'message': f'Successfully uploaded {file_name}',
-                'file': file_name,
-                'local_path': file_path,
-                'remote_path': remote_file_path
-            }
+            if not config.SFTP_RESUME_VERIFY_READBACK:
+                return remote_file.stat().st_size == file_size
             
-        except Exception as e:
-            logger.error(f"Error during SFTP upload: {e}")
-            return {
-                'success': False,
-                'error': f'SFTP upload error: {str(e)}'
-            }
-        finally:
-            # Always close connections to prevent socket leaks
-            if sftp:
-                try:
-                    sftp.close()
-                except:
-                    pass
-            if transport:
-                try:
-                    transport.close()
-                except:
-                    pass
+            checksum = checksum or self._sha256_file(file_path)
+            remote_file.prefetch()
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: remote_file.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+            return digest.hexdigest() == checksum
+    
+    def _write_checksum_sidecar(self, sftp, remote_file_path: str, checksum: str):
+        """Write '<file>.sha256' in sha256sum format next to an uploaded file."""
+        try:
+            with sftp.open(f"{remote_file_path}.sha256", 'w') as sidecar:
+                sidecar.write(f"{checksum}  {os.path.basename(remote_file_path)}\n")
+        except IOError as e:
+            logger.warning(f"Could not write checksum sidecar for {remote_file_path}: {e}")
+    
+    def get_connection_stats(self) -> dict:
+        """Get statistics of the underlying SFTP connection pool."""
+        return self.connection_pool.get_stats()
+    
+    def get_bandwidth_stats(self) -> dict:
+        """Get statistics of the upload bandwidth limiter (None if uploads are not capped)."""
+        return self.bandwidth_limiter.get_stats() if self.bandwidth_limiter else None
+    
+    def get_remote_path(self, sftp_server_info: SftpServerInfos, file_path: str, remote_directory: str) -> str:
+        """
+        Get the server-qualified remote destination of a file.
+        
+        Args:
+            sftp_server_info: SftpServerInfos object containing server credentials
+            file_path: Local file path
+            remote_directory: Remote target directory
+        
+        Returns:
+            '<server_name>:<remote file path>'
+        """
+        return f"{sftp_server_info.server_name}:{remote_directory}/{os.path.basename(file_path)}"
+    
+    def resolve_target_directory(self, project_settings, folder_type: str) -> str:
+        """
+        Determine the remote directory for a file based on the folder type.
+        
+        Args:
+            project_settings: ProjectSettings object containing IRIS folder configuration
+            folder_type: Type of data - 'model', 'classifier' or 'archive'
+        
+        Returns:
+            Remote directory path
+        """
+        if folder_type == 'model':
+            # Model data - use iris_main_folder/iris_model_subfolder
+            return f'{project_settings.iris_main_folder}/{project_settings.iris_model_subfolder}'
+        elif folder_type == 'classifier':
+            # Classifier data - use iris_main_folder/iris_classifier_subfolder
+            return f'{project_settings.iris_main_folder}/{project_settings.iris_classifier_subfolder}'
+        elif folder_type == 'archive':
+            # Session archive bundles - use iris_main_folder/ARCHIVE_REMOTE_SUBFOLDER
+            return f'{project_settings.iris_main_folder}/{config.ARCHIVE_REMOTE_SUBFOLDER}'
+        # Default to iris_main_folder if folder type doesn't match
+        return project_settings.iris_main_folder
+    
+    def _ensure_remote_directory(self, connection: PooledSftpConnection, remote_path: str):
+        """
+        Make sure a remote directory exists, using the pool's directory cache.
+        
+        Args:
+            connection: Pooled SFTP connection
+            remote_path: Remote directory path
+        """
+        if self.connection_pool.is_known_directory(connection, remote_path):
+            return
+        
+        try:
+            connection.sftp.stat(remote_path)
+        except FileNotFoundError:
+            # Create directory if it doesn't exist
+            self._create_remote_directory(connection.sftp, remote_path)
+        
+        self.connection_pool.mark_directory(connection, remote_path)
+    
+    def _rename_remote_file(self, sftp, source_path: str, target_path: str):
+        """
+        Atomically move an uploaded file into its final remote location.
+        
+        Uses the posix-rename extension (overwrites the target atomically) when the
+        server supports it, otherwise falls back to remove + rename.
+        
+        Args:
+            sftp: Active SFTP client connection
+            source_path: Remote path of the fully uploaded temporary file
+            target_path: Final remote path
+        """
+        try:
+            sftp.posix_rename(source_path, target_path)
+            return
+        except IOError:
+            # Server does not support posix-rename@openssh.com
+            pass
+        
+        try:
+            sftp.remove(target_path)
+        except FileNotFoundError:
+            pass
+        sftp.rename(source_path, target_path)
     
     def _create_remote_directory(self, sftp, remote_path: str):
         """
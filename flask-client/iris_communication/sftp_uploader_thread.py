@@ -4,20 +4,41 @@ SFTP Uploader Thread - Dedicated thread for handling SFTP file uploads.
 This module provides a queue-based SFTP upload system that runs in a separate thread.
 It ensures that SFTP operations don't block the main camera processing thread.
 
+The dispatcher thread hands each request to one of several upload channels. Every
+channel is a worker thread with its own pooled SFTP connection, so a backlog drains
+in parallel. Requests for the same remote path always go to the same channel, which
+keeps them in order.
+
 Key Features:
 - Single responsibility: Only handles SFTP uploads
 - Queue-based: Upload requests are queued and processed asynchronously
+- Concurrent upload channels with per-remote-path ordering
+- Optional shared bandwidth cap (see bandwidth_limiter)
+- Low-priority uploads (e.g. session archive bundles) run one at a time on a channel of their
+  own; they start only while the upload channels are idle and never hold up other uploads
+- Per-folder-type hooks: completion callbacks and an additional bandwidth cap
+- Durable spool: every upload is written to SQLite when it is queued and removed only once
+  it is delivered (or rejected as non-retryable). The in-memory queues are a view of the
+  spool; failed uploads are retried with exponential backoff, and all undelivered uploads
+  are reloaded on startup
 - Graceful shutdown: Properly stops when application exits
 - Thread-safe: Uses queue.Queue for thread-safe communication
 """
 
+import os
+import queue
+import random
 import threading
 import time
-from typing import Optional, Dict, Any
+import zlib
+from typing import Optional, Dict, Any, List, Callable
 from infrastructure.base_queue_thread import BaseQueueThread
+from infrastructure import config
 from infrastructure.logging.logging_provider import get_logger
-from iris_communication.sftp_processor import sftp_processor
-from sqlite.sftp_sqlite_provider import SftpServerInfos
+from iris_communication.sftp_processor import sftp_processor, SftpProcessor
+from iris_communication.bandwidth_limiter import TokenBucket
+from sqlite.sftp_sqlite_provider import SftpServerInfos, sftp_provider
+from sqlite.upload_spool_sqlite_provider import upload_spool_provider, SpooledUpload
 
 # Initialize logger
 logger = get_logger()
@@ -27,7 +48,9 @@ class SftpUploadRequest:
     """Represents a single SFTP upload request."""
     
     def __init__(self, sftp_server_info: SftpServerInfos, file_path: str, 
-                 project_settings, folder_type: str):
+                 project_settings, folder_type: str, original_size: Optional[int] = None,
+                 remove_after_upload: bool = False, remote_directory: Optional[str] = None,
+                 spool_id: Optional[int] = None, attempts: int = 0, low_priority: bool = False):
         """
         Initialize an upload request.
         
@@ -36,12 +59,40 @@ class SftpUploadRequest:
             file_path: Local file path to upload
             project_settings: Project settings for determining remote paths
             folder_type: Type of data ('model' or 'classifier')
+            original_size: Size of the uncompressed source if file_path is a compressed payload
+            remove_after_upload: Delete the local file once uploaded (temporary payloads)
+            remote_directory: Remote target directory (resolved from project_settings if None)
+            spool_id: Row id in the upload spool (None if the upload could not be spooled)
+            attempts: Number of failed attempts so far
+            low_priority: Only upload while no other uploads are pending; never spooled
         """
         self.sftp_server_info = sftp_server_info
         self.file_path = file_path
         self.project_settings = project_settings
         self.folder_type = folder_type
+        self.original_size = original_size
+        self.remove_after_upload = remove_after_upload
+        self.spool_id = spool_id
+        self.attempts = attempts
+        self.low_priority = low_priority
         self.timestamp = time.time()
+        
+        # Resolve the target directory now, so a retry uploads to the same place
+        # even if the project settings change in the meantime
+        if remote_directory is None and project_settings:
+            remote_directory = sftp_processor.resolve_target_directory(project_settings, folder_type)
+        self.remote_directory = remote_directory
+
+
+class FolderTypeHandler:
+    """Hooks registered for all uploads of one folder type."""
+    
+    def __init__(self, on_uploaded: Optional[Callable[[SftpUploadRequest, dict], None]] = None,
+                 on_failed: Optional[Callable[[SftpUploadRequest, dict], None]] = None,
+                 bandwidth_limiter: Optional[TokenBucket] = None):
+        self.on_uploaded = on_uploaded
+        self.on_failed = on_failed
+        self.bandwidth_limiter = bandwidth_limiter
 
 
 class SftpUploaderThread(BaseQueueThread):
@@ -49,16 +100,41 @@ class SftpUploaderThread(BaseQueueThread):
     Manages SFTP uploads in a dedicated background thread.
     
     This class handles all SFTP upload operations asynchronously using a queue.
-    Upload requests are queued and processed one at a time in the background.
+    The base class worker dispatches requests to a fixed set of upload channels,
+    which perform the uploads concurrently.
     """
     
-    def __init__(self, thread_id: str = "sftp_uploader"):
+    def __init__(self, thread_id: str = "sftp_uploader", concurrency: Optional[int] = None,
+                 processor: Optional[SftpProcessor] = None):
         """
         Initialize the SFTP uploader thread.
         
         Args:
             thread_id: Unique identifier for the thread
+            concurrency: Number of upload channels (default: config.SFTP_UPLOAD_CONCURRENCY)
+            processor: SftpProcessor performing the transfers (default: global sftp_processor)
         """
+        self.processor = processor or sftp_processor
+        self.concurrency = max(1, concurrency or config.SFTP_UPLOAD_CONCURRENCY)
+        self._channel_queues: List[queue.Queue] = [
+            queue.Queue(maxsize=config.SFTP_UPLOAD_CHANNEL_QUEUE_SIZE) for _ in range(self.concurrency)
+        ]
+        self._channel_threads: List[threading.Thread] = []
+        # Uploads that only start while the channels are idle
+        self._low_priority_queue = queue.Queue(maxsize=config.SFTP_LOW_PRIORITY_QUEUE_SIZE)
+        # Separate channel for low-priority uploads, so a long, throttled archive upload
+        # never blocks the regular channel its remote path would hash to
+        self._low_priority_channel: queue.Queue = queue.Queue()
+        self._folder_type_handlers: Dict[str, FolderTypeHandler] = {}
+        
+        # Spool rows currently queued or uploading (guarded by self._lock)
+        self._inflight_spool_ids = set()
+        # Serializes spool inserts with spool polls, so a new row is never dispatched twice
+        self._spool_lock = threading.Lock()
+        # Servers with uploads waiting in backoff (guarded by self._lock)
+        self._backed_off_servers = set()
+        self._last_spool_poll = 0.0
+        
         # Initialize base class with queue size limit
         super().__init__(thread_id=thread_id, queue_maxsize=100)
     
@@ -69,15 +145,136 @@ class SftpUploaderThread(BaseQueueThread):
             'total_processed': 0,
             'total_uploaded': 0,  # SFTP-specific: successful uploads
             'total_failed': 0,
-            'queue_size': 0
+            'queue_size': 0,
+            'upload_concurrency': self.concurrency,
+            'active_uploads': 0,
+            'active_low_priority_uploads': 0,
+            'bytes_uploaded': 0,
+            'total_skipped': 0,  # Uploads skipped because an identical remote file exists
+            'total_resumed': 0,  # Uploads resumed from a partial remote file
+            'bytes_resume_saved': 0,  # Bytes not re-sent thanks to resumed uploads
+            'total_spooled': 0,  # Uploads written to the retry spool
+            'total_retried': 0,  # Spooled uploads dispatched for another attempt
+            'spool_depth': 0,
+            'spool_oldest_age': 0.0,  # Seconds since the oldest spooled upload was created
+            'spool_max_attempts': 0,
+            'total_compressed_uploads': 0,
+            'bytes_original': 0,  # Uncompressed size of compressed uploads
+            'bytes_sent': 0,  # Bytes actually sent for compressed uploads
+            'bytes_saved': 0,
+            'compression_ratio': 0.0,  # bytes_original / bytes_sent
+            'total_low_priority_queued': 0,
+            'low_priority_queue_size': 0
         }
     
     def _get_queue_timeout(self) -> float:
         """Return timeout for queue.get() calls."""
         return 1.0
     
+    def _on_start(self):
+        """Start the upload channel threads and reload all undelivered uploads from the spool."""
+        # Everything still in the spool was queued, uploading or in backoff when the previous
+        # run stopped - retry all of it right away (called with self._lock held)
+        self._inflight_spool_ids = set()
+        self._backed_off_servers = set()
+        self._last_spool_poll = 0.0
+        try:
+            pending = upload_spool_provider.count_items()
+            upload_spool_provider.make_all_due()
+            if pending:
+                logger.info(f"[{self.thread_id}] Reloading {pending} undelivered upload(s) from the spool")
+        except Exception as e:
+            logger.warning(f"[{self.thread_id}] Could not read upload spool: {e}")
+        
+        self._channel_threads = []
+        for index, channel_queue in enumerate(self._channel_queues):
+            thread = threading.Thread(
+                target=self._channel_worker,
+                args=(index, channel_queue),
+                name=f"{self.thread_id}_channel_{index}",
+                daemon=True
+            )
+            thread.start()
+            self._channel_threads.append(thread)
+        thread = threading.Thread(
+            target=self._channel_worker,
+            args=(self.concurrency, self._low_priority_channel),
+            name=f"{self.thread_id}_channel_low_priority",
+            daemon=True
+        )
+        thread.start()
+        self._channel_threads.append(thread)
+        logger.info(f"[{self.thread_id}] Started {self.concurrency} upload channel(s) and a low-priority channel")
+    
+    def _on_idle(self):
+        """Retry due spooled uploads, start a low-priority upload and close idle pooled SFTP connections."""
+        self._drain_spool()
+        self._dispatch_low_priority()
+        self.processor.connection_pool.cleanup_idle()
+    
+    def _process_remaining_items(self):
+        """Leave queued uploads in the spool on shutdown; only unspooled ones are still dispatched."""
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if request.spool_id is None:
+                    self._dispatch(request)
+            finally:
+                self._queue.task_done()
+    
+    def _on_stop(self):
+        """Stop the upload channels, then close all pooled SFTP connections."""
+        # Low-priority uploads are not spooled; their owners are told and queue them again later
+        dropped = 0
+        while True:
+            try:
+                request = self._low_priority_queue.get_nowait()
+            except queue.Empty:
+                break
+            dropped += 1
+            self._notify_failed(request, 'Uploader stopped')
+        if dropped:
+            logger.info(f"[{self.thread_id}] Dropped {dropped} pending low-priority upload(s)")
+        # Channels finish their current upload and skip spooled requests (see _channel_worker)
+        for channel_queue in self._channel_queues + [self._low_priority_channel]:
+            channel_queue.put(None)
+        for thread in self._channel_threads:
+            thread.join(timeout=10.0)
+            if thread.is_alive():
+                logger.warning(f"[{self.thread_id}] Upload channel {thread.name} did not stop in time")
+        self.processor.connection_pool.close_all()
+        
+        try:
+            remaining = upload_spool_provider.count_items()
+            if remaining:
+                logger.info(f"[{self.thread_id}] {remaining} undelivered upload(s) stay in the spool for the next start")
+        except Exception as e:
+            logger.warning(f"[{self.thread_id}] Could not read upload spool: {e}")
+    
+    def register_folder_type(self, folder_type: str,
+                             on_uploaded: Optional[Callable[[SftpUploadRequest, dict], None]] = None,
+                             on_failed: Optional[Callable[[SftpUploadRequest, dict], None]] = None,
+                             bandwidth_limiter: Optional[TokenBucket] = None):
+        """
+        Register hooks for all uploads of a folder type, including spooled retries.
+        
+        Callbacks run in the upload channel thread and must not block for long.
+        
+        Args:
+            folder_type: Folder type the hooks apply to
+            on_uploaded: Called with (request, result) after a successful upload
+            on_failed: Called with (request, result) after a failed attempt
+            bandwidth_limiter: Cap applied to these uploads on top of the shared cap
+        """
+        with self._lock:
+            self._folder_type_handlers[folder_type] = FolderTypeHandler(on_uploaded, on_failed, bandwidth_limiter)
+    
     def queue_upload(self, sftp_server_info: SftpServerInfos, file_path: str,
-                     project_settings, folder_type: str) -> bool:
+                     project_settings, folder_type: str, original_size: Optional[int] = None,
+                     remove_after_upload: bool = False, low_priority: bool = False) -> bool:
         """
         Queue a file for SFTP upload.
         
@@ -86,46 +283,410 @@ class SftpUploaderThread(BaseQueueThread):
             file_path: Local file path to upload
             project_settings: Project settings for determining remote paths
             folder_type: Type of data ('model' or 'classifier')
+            original_size: Size of the uncompressed source if file_path is a compressed payload
+            remove_after_upload: Delete the local file once uploaded (temporary payloads)
+            low_priority: Start only while no other uploads are pending; runs on the low-priority
+                          channel, so it never delays later uploads. Low-priority uploads are
+                          neither spooled nor retried; the caller re-queues them after a failure
             
         Returns:
-            bool: True if queued successfully, False if queue is full or thread not running
+            bool: True if the upload was spooled (and queued if there was room), False if the
+                  thread is not running or the upload could be neither spooled nor queued
+                  (low priority: the queue is full)
         """
+        if not self.is_running():
+            logger.warning(f"[{self.thread_id}] Cannot queue upload - thread not running")
+            return False
+        
         # Create upload request
         request = SftpUploadRequest(
             sftp_server_info=sftp_server_info,
             file_path=file_path,
             project_settings=project_settings,
-            folder_type=folder_type
+            folder_type=folder_type,
+            original_size=original_size,
+            remove_after_upload=remove_after_upload,
+            low_priority=low_priority
         )
         
-        # Use base class queue_item method
-        return self.queue_item(request)
+        if low_priority:
+            try:
+                self._low_priority_queue.put_nowait(request)
+            except queue.Full:
+                return False
+            with self._lock:
+                self._stats['total_low_priority_queued'] += 1
+            return True
+        
+        # Write-ahead: the upload is in the spool before it is queued, so it survives a crash
+        spooled = self._spool_new(request)
+        
+        # Use base class queue_item method; if the queue is full the upload waits in the spool
+        # and is dispatched by the next spool poll
+        if not self._queue.full() and self.queue_item(request):
+            return True
+        
+        if not spooled:
+            logger.error(f"[{self.thread_id}] Upload queue is full and spool unavailable, dropping {file_path}")
+            return False
+        
+        with self._lock:
+            self._inflight_spool_ids.discard(request.spool_id)
+        logger.info(f"[{self.thread_id}] Upload queue is full, {file_path} waits in the spool")
+        return True
+    
+    def _spool_new(self, request: SftpUploadRequest) -> bool:
+        """
+        Write a new upload to the spool and mark it in flight.
+        
+        Returns:
+            bool: True if spooled, False if it can only be kept in memory
+        """
+        if request.remote_directory is None:
+            logger.warning(f"[{self.thread_id}] Cannot spool {request.file_path}: no project settings")
+            return False
+        
+        try:
+            with self._spool_lock:
+                request.spool_id = upload_spool_provider.insert_item(
+                    server_id=request.sftp_server_info.id,
+                    file_path=request.file_path,
+                    folder_type=request.folder_type,
+                    remote_directory=request.remote_directory,
+                    original_size=request.original_size,
+                    remove_after_upload=request.remove_after_upload
+                )
+                with self._lock:
+                    self._inflight_spool_ids.add(request.spool_id)
+                    self._stats['total_spooled'] += 1
+        except Exception as e:
+            logger.error(f"[{self.thread_id}] Failed to spool upload {request.file_path}: {e}")
+            request.spool_id = None
+            return False
+        return True
     
     def _process_item(self, request: SftpUploadRequest):
         """
-        Process a single SFTP upload request.
+        Dispatch an upload request to its channel.
+        
+        Blocks while the channel queue is full, which lets the main queue fill up
+        and queue_upload() report backpressure to callers.
+        
+        Args:
+            request: SFTP upload request to dispatch
+        """
+        self._dispatch(request)
+        self._drain_spool()
+    
+    def _dispatch(self, request: SftpUploadRequest):
+        """Put a request on the channel that owns its remote path."""
+        remote_key = self.processor.get_remote_path(
+            request.sftp_server_info, request.file_path, request.remote_directory or ''
+        )
+        # Stable hash so every upload to the same remote path uses the same (FIFO) channel
+        channel = zlib.crc32(remote_key.encode('utf-8')) % self.concurrency
+        self._channel_queues[channel].put(request)
+    
+    def _dispatch_low_priority(self):
+        """
+        Start one low-priority upload if no other upload is running or waiting.
+        
+        Low-priority uploads run on their own channel, one at a time: once started, regular
+        uploads keep flowing through the other channels while the low-priority one continues.
+        """
+        if self._low_priority_queue.empty() or not self._queue.empty() or not self._low_priority_channel.empty():
+            return
+        with self._lock:
+            if self._stats['active_uploads'] > 0 or self._stats['active_low_priority_uploads'] > 0:
+                return
+        if any(not channel_queue.empty() for channel_queue in self._channel_queues):
+            return
+        try:
+            request = self._low_priority_queue.get_nowait()
+        except queue.Empty:
+            return
+        self._low_priority_channel.put(request)
+    
+    def _drain_spool(self):
+        """
+        Dispatch spooled uploads whose next attempt is due.
+        
+        Runs in the dispatcher thread, at most once per SFTP_SPOOL_POLL_INTERVAL
+        (right away again after a full batch, so a reloaded backlog drains quickly).
+        """
+        now = time.time()
+        if now - self._last_spool_poll < config.SFTP_SPOOL_POLL_INTERVAL:
+            return
+        self._last_spool_poll = now
+        
+        try:
+            with self._spool_lock:
+                with self._lock:
+                    inflight = list(self._inflight_spool_ids)
+                items = upload_spool_provider.get_due_items(limit=config.SFTP_SPOOL_BATCH_SIZE, exclude_ids=inflight)
+                with self._lock:
+                    self._inflight_spool_ids.update(item.id for item in items)
+        except Exception as e:
+            logger.error(f"[{self.thread_id}] Failed to read upload spool: {e}")
+            return
+        
+        if len(items) >= config.SFTP_SPOOL_BATCH_SIZE:
+            self._last_spool_poll = 0.0
+        
+        for item in items:
+            request = self._request_from_spool(item)
+            if request is None:
+                with self._lock:
+                    self._inflight_spool_ids.discard(item.id)
+                continue
+            with self._lock:
+                self._stats['total_retried'] += 1
+            logger.debug(f"[{self.thread_id}] Retrying spooled upload {item.file_path} (attempt {item.attempts + 1})")
+            self._dispatch(request)
+    
+    def _request_from_spool(self, item: SpooledUpload) -> Optional[SftpUploadRequest]:
+        """Rebuild an upload request from a spool row, dropping rows that can no longer be uploaded."""
+        server_info = sftp_provider.get_server_by_id(item.server_id)
+        if server_info is None or not os.path.isfile(item.file_path):
+            reason = 'SFTP server was deleted' if server_info is None else 'local file is gone'
+            logger.warning(f"[{self.thread_id}] Dropping spooled upload {item.file_path}: {reason}")
+            upload_spool_provider.delete_item(item.id)
+            return None
+        
+        return SftpUploadRequest(
+            sftp_server_info=server_info,
+            file_path=item.file_path,
+            project_settings=None,
+            folder_type=item.folder_type,
+            original_size=item.original_size,
+            remove_after_upload=item.remove_after_upload,
+            remote_directory=item.remote_directory,
+            spool_id=item.id,
+            attempts=item.attempts
+        )
+    
+    def _get_retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter: a random delay between 50% and 100% of the capped exponential delay."""
+        delay = min(config.SFTP_RETRY_MAX_DELAY, config.SFTP_RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+    
+    def _spool(self, request: SftpUploadRequest, error: str, delay: float) -> bool:
+        """
+        Store an upload in the durable spool, or reschedule it if it is already spooled.
+        
+        Args:
+            request: Upload request
+            error: Reason for spooling (stored as last_error)
+            delay: Seconds until the next attempt
+            
+        Returns:
+            bool: True if the upload is in the spool
+        """
+        if request.remote_directory is None:
+            logger.error(f"[{self.thread_id}] Cannot spool {request.file_path}: no project settings")
+            return False
+        
+        next_attempt_at = time.time() + delay
+        try:
+            if request.spool_id is not None:
+                upload_spool_provider.reschedule_item(request.spool_id, request.attempts, next_attempt_at, error)
+            else:
+                request.spool_id = upload_spool_provider.insert_item(
+                    server_id=request.sftp_server_info.id,
+                    file_path=request.file_path,
+                    folder_type=request.folder_type,
+                    remote_directory=request.remote_directory,
+                    original_size=request.original_size,
+                    remove_after_upload=request.remove_after_upload,
+                    attempts=request.attempts,
+                    next_attempt_at=next_attempt_at,
+                    last_error=error
+                )
+                with self._lock:
+                    self._stats['total_spooled'] += 1
+        except Exception as e:
+            logger.error(f"[{self.thread_id}] Failed to spool upload {request.file_path}: {e}")
+            return False
+        
+        if delay > 0:
+            with self._lock:
+                self._backed_off_servers.add(request.sftp_server_info.id)
+        return True
+    
+    def _channel_worker(self, index: int, channel_queue: queue.Queue):
+        """
+        Worker function of one upload channel.
+        
+        Args:
+            index: Channel number (the low-priority channel is numbered after the regular ones)
+            channel_queue: Queue of requests assigned to this channel (None stops the channel)
+        """
+        while True:
+            request = channel_queue.get()
+            try:
+                if request is None:
+                    break
+                
+                # Stopping: leave spooled uploads in the spool for the next start
+                if self._stop_event.is_set() and (request.spool_id is not None or request.low_priority):
+                    with self._lock:
+                        self._inflight_spool_ids.discard(request.spool_id)
+                    if request.low_priority:
+                        self._notify_failed(request, 'Uploader stopped')
+                    continue
+                
+                active_key = 'active_low_priority_uploads' if request.low_priority else 'active_uploads'
+                with self._lock:
+                    self._stats[active_key] += 1
+                try:
+                    self._upload(request)
+                except Exception as e:
+                    with self._lock:
+                        self._stats['total_failed'] += 1
+                    logger.error(f"[{self.thread_id}] Channel {index} failed to upload {request.file_path}: {e}", exc_info=True)
+                    # Back off like a failed attempt, otherwise the next spool poll retries it right away
+                    if request.spool_id is not None:
+                        request.attempts += 1
+                        self._spool(request, error=str(e), delay=self._get_retry_delay(request.attempts))
+                    # Let the owner release the upload (e.g. the archiver queues the bundle again)
+                    self._notify_failed(request, str(e))
+                finally:
+                    with self._lock:
+                        self._stats[active_key] -= 1
+                        self._inflight_spool_ids.discard(request.spool_id)
+            finally:
+                channel_queue.task_done()
+    
+    def _upload(self, request: SftpUploadRequest):
+        """
+        Perform a single SFTP upload request.
         
         Args:
             request: SFTP upload request to process
         """
         logger.info(f"[{self.thread_id}] Processing upload: {request.file_path}")
+        with self._lock:
+            handler = self._folder_type_handlers.get(request.folder_type)
         
         # Perform the actual SFTP upload
-        result = sftp_processor.transferData(
+        result = self.processor.transferData(
             sftp_server_info=request.sftp_server_info,
             file_path=request.file_path,
             project_settings=request.project_settings,
-            folder_type=request.folder_type
+            folder_type=request.folder_type,
+            remote_directory=request.remote_directory,
+            bandwidth_limiter=handler.bandwidth_limiter if handler else None
         )
+        server_id = request.sftp_server_info.id
         
         # Update statistics based on result
         with self._lock:
             if result.get('success'):
                 self._stats['total_uploaded'] += 1
+                self._stats['bytes_uploaded'] += result.get('bytes', 0)
+                if result.get('skipped'):
+                    self._stats['total_skipped'] += 1
+                if result.get('resumed_from'):
+                    self._stats['total_resumed'] += 1
+                    self._stats['bytes_resume_saved'] += result['resumed_from']
+                if request.original_size is not None:
+                    self._record_compression(request)
                 logger.info(f"[{self.thread_id}] Successfully uploaded: {result.get('remote_path')}")
             else:
                 self._stats['total_failed'] += 1
                 logger.error(f"[{self.thread_id}] Upload failed: {result.get('error', 'Unknown error')}")
+            server_recovered = result.get('success') and server_id in self._backed_off_servers
+            if server_recovered:
+                self._backed_off_servers.discard(server_id)
+        
+        if result.get('success'):
+            if request.spool_id is not None:
+                upload_spool_provider.delete_item(request.spool_id)
+            if server_recovered:
+                # Server is reachable again - retry its spooled uploads now instead of waiting out the backoff
+                resumed = upload_spool_provider.reset_server_backoff(server_id)
+                self._last_spool_poll = 0.0
+                logger.info(f"[{self.thread_id}] SFTP server {request.sftp_server_info.server_name} is back, "
+                            f"resuming {resumed} spooled upload(s)")
+        elif request.low_priority:
+            # Not spooled - the owner of the upload queues it again (see on_failed)
+            pass
+        elif result.get('retryable', True):
+            request.attempts += 1
+            delay = self._get_retry_delay(request.attempts)
+            if self._spool(request, error=result.get('error', 'Unknown error'), delay=delay):
+                logger.info(f"[{self.thread_id}] Spooled {request.file_path} for retry in {delay:.0f}s "
+                            f"(attempt {request.attempts})")
+        elif request.spool_id is not None:
+            upload_spool_provider.delete_item(request.spool_id)
+        
+        self._notify_handler(handler, request, result)
+        
+        # Temporary payloads (e.g. compressed CSVs) are only kept until they reach the server
+        if result.get('success') and request.remove_after_upload:
+            try:
+                os.remove(request.file_path)
+            except OSError as e:
+                logger.warning(f"[{self.thread_id}] Could not remove uploaded payload {request.file_path}: {e}")
+    
+    def _notify_failed(self, request: SftpUploadRequest, error: str):
+        """Run the folder type's failure callback for an upload that did not produce a result."""
+        with self._lock:
+            handler = self._folder_type_handlers.get(request.folder_type)
+        self._notify_handler(handler, request, {'success': False, 'error': error, 'retryable': True})
+    
+    def _notify_handler(self, handler: Optional[FolderTypeHandler], request: SftpUploadRequest, result: dict):
+        """Run the folder type's completion callback for an upload attempt."""
+        if handler is None:
+            return
+        callback = handler.on_uploaded if result.get('success') else handler.on_failed
+        if callback is None:
+            return
+        try:
+            callback(request, result)
+        except Exception as e:
+            logger.error(f"[{self.thread_id}] Upload callback for {request.file_path} failed: {e}", exc_info=True)
+    
+    def _record_compression(self, request: SftpUploadRequest):
+        """
+        Update compression statistics for a successfully uploaded compressed payload.
+        
+        Must be called with self._lock held.
+        
+        Args:
+            request: The uploaded request (original_size must be set)
+        """
+        try:
+            sent_size = os.path.getsize(request.file_path)
+        except OSError:
+            return
+        
+        self._stats['total_compressed_uploads'] += 1
+        self._stats['bytes_original'] += request.original_size
+        self._stats['bytes_sent'] += sent_size
+        self._stats['bytes_saved'] = self._stats['bytes_original'] - self._stats['bytes_sent']
+        if self._stats['bytes_sent'] > 0:
+            self._stats['compression_ratio'] = round(
+                self._stats['bytes_original'] / self._stats['bytes_sent'], 2
+            )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get current thread statistics, including the depth of the retry spool.
+        
+        Returns:
+            dict: Copy of current statistics
+        """
+        try:
+            spool_stats = upload_spool_provider.get_spool_stats()
+        except Exception as e:
+            logger.warning(f"[{self.thread_id}] Could not read upload spool stats: {e}")
+            spool_stats = {}
+        
+        with self._lock:
+            self._stats.update(spool_stats)
+            self._stats['low_priority_queue_size'] = self._low_priority_queue.qsize()
+        return super().get_stats()
 
 
 # Global singleton instance
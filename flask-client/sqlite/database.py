@@ -0,0 +1,201 @@
+"""
+Shared SQLite access layer used by all providers.
+
+Opening a connection per call costs a file open, schema parse and pragma setup
+on every query, and every committed write pays its own journal sync. A Database
+keeps one long-lived connection per thread instead:
+
+- WAL journal with tuned pragmas, so readers never block the writer
+- Python's per-connection statement cache: as long as a provider passes the same
+  SQL text (module constants or literals, parameters bound with '?'), the
+  prepared statement is reused instead of parsed again
+- transaction(): BEGIN IMMEDIATE ... COMMIT / ROLLBACK, nestable within a thread
+- Schema migrations tracked in PRAGMA user_version, run once when the database
+  is first opened
+
+Connections run in autocommit mode; statements outside transaction() commit
+on their own.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence
+from infrastructure import config
+from infrastructure.logging.logging_provider import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+# A migration brings the schema from version N to N + 1 (list index N)
+Migration = Callable[[sqlite3.Connection], None]
+
+
+class _ThreadConnection:
+    """Connection of one thread and its transaction nesting depth."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.depth = 0
+
+
+class Database:
+    """
+    One SQLite database file with a long-lived connection per thread.
+    """
+
+    def __init__(self, db_path: str, migrations: Sequence[Migration] = (), synchronous: Optional[str] = None,
+                 cache_size_kb: Optional[int] = None, busy_timeout: Optional[float] = None):
+        """
+        Initialize the database and bring its schema up to date.
+
+        Args:
+            db_path: Path of the database file
+            migrations: Schema migrations in order; migration i runs once when user_version == i
+            synchronous: PRAGMA synchronous (default: SQLITE_SYNCHRONOUS)
+            cache_size_kb: Page cache per connection in KiB (default: SQLITE_CACHE_SIZE_KB)
+            busy_timeout: Seconds to wait for a lock held by another connection (default: SQLITE_BUSY_TIMEOUT)
+        """
+        self.db_path = db_path
+        self.synchronous = synchronous or config.SQLITE_SYNCHRONOUS
+        self.cache_size_kb = cache_size_kb if cache_size_kb is not None else config.SQLITE_CACHE_SIZE_KB
+        self.busy_timeout = busy_timeout if busy_timeout is not None else config.SQLITE_BUSY_TIMEOUT
+        self._lock = threading.Lock()
+        self._connections: Dict[int, _ThreadConnection] = {}  # thread ident -> connection
+        self.migrate(migrations)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False, cached_statements=config.SQLITE_STATEMENT_CACHE_SIZE)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def _get_thread_connection(self) -> _ThreadConnection:
+        thread_connection = self._connections.get(threading.get_ident())
+        if thread_connection is None:
+            thread_connection = _ThreadConnection(self._open())
+            with self._lock:
+                self._close_dead_threads()
+                self._connections[threading.get_ident()] = thread_connection
+        return thread_connection
+
+    def _close_dead_threads(self):
+        """Close the connections of threads that have ended (called with the lock held)."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).conn.close()
+
+    def connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection (opened on first use)."""
+        return self._get_thread_connection().conn
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run reads on the calling thread's connection.
+
+        Each statement sees the latest committed data; use transaction() when
+        several reads must see the same snapshot.
+
+        Yields:
+            sqlite3.Connection
+        """
+        yield self._get_thread_connection().conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block in a write transaction on the calling thread's connection.
+
+        Commits when the outermost block completes and rolls back if it raises.
+        Nested blocks join the enclosing transaction.
+
+        Yields:
+            sqlite3.Connection
+        """
+        thread_connection = self._get_thread_connection()
+        conn = thread_connection.conn
+        if thread_connection.depth > 0:
+            thread_connection.depth += 1
+            try:
+                yield conn
+            finally:
+                thread_connection.depth -= 1
+            return
+
+        conn.execute('BEGIN IMMEDIATE')
+        thread_connection.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            thread_connection.depth = 0
+
+    def get_schema_version(self) -> int:
+        """Get the schema version stored in PRAGMA user_version."""
+        return self.connection().execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self, migrations: Sequence[Migration]):
+        """
+        Run the migrations the database has not seen yet, each in its own transaction.
+
+        Databases created before versioning have user_version 0, so the first migration
+        of every provider must be idempotent (CREATE ... IF NOT EXISTS, column checks).
+        """
+        version = self.get_schema_version()
+        for target_version in range(version + 1, len(migrations) + 1):
+            with self.transaction() as conn:
+                # Re-check inside the write lock in case another process migrated meanwhile
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= target_version:
+                    continue
+                migrations[target_version - 1](conn)
+                conn.execute(f'PRAGMA user_version = {target_version}')
+            logger.info(f"[Migration] {self.db_path} migrated to schema version {target_version}")
+
+    def close(self):
+        """Close the connections of all threads (they are reopened on next use)."""
+        with self._lock:
+            for thread_connection in self._connections.values():
+                thread_connection.conn.close()
+            self._connections.clear()
+
+
+# Databases by absolute path, so providers of the same file share the connections
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def open_database(db_path: str, migrations: Sequence[Migration] = (), **options) -> Database:
+    """
+    Get the Database of a file, opening and migrating it on first use.
+
+    Args:
+        db_path: Path of the database file
+        migrations: Schema migrations of the file (only applied when it is first opened)
+        **options: synchronous, cache_size_kb, busy_timeout overrides
+
+    Returns:
+        Database
+    """
+    key = os.path.abspath(db_path)
+    with _databases_lock:
+        database = _databases.get(key)
+        if database is None:
+            database = Database(db_path, migrations, **options)
+            _databases[key] = database
+        return database
+
+
+def close_all_databases():
+    """Close the connections of every opened database (e.g. on shutdown)."""
+    with _databases_lock:
+        for database in _databases.values():
+            database.close()
@@ -1,61 +1,172 @@
+import hashlib
 import sqlite3
 import os
 import tempfile
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, Tuple, BinaryIO
+from infrastructure import config
+from infrastructure.logging.logging_provider import get_logger
+from sqlite.database import open_database
+from sqlite.settings_cache import cached, invalidates, ML_MODELS
+
+# Initialize logger
+logger = get_logger()
+
+MODEL_FILE_SUFFIX = '.pt'
+
+# Model data no longer referenced by any model version
+DELETE_UNUSED_BLOBS_SQL = 'DELETE FROM model_blobs WHERE sha256 NOT IN (SELECT sha256 FROM ml_models)'
 
 
 class MLSQLiteProvider:
     """
     SQLite provider for storing and retrieving machine learning models and classifiers as BLOBs.
-    Supports versioning and temporary file retrieval for runtime use.
+    Supports versioning; models are loaded from an on-disk cache holding one file per SHA-256
+    of the model data, written once on first load.
+
+    Model data lives in model_blobs, keyed by its SHA-256, so versions with identical
+    files share one BLOB. Uploads are streamed in chunks through incremental BLOB I/O.
     """
 
-    def __init__(self, db_path: str = 'ml_models.db'):
+    def __init__(self, db_path: str = 'ml_models.db', cache_dir: Optional[str] = None):
         self.db_path = db_path
-        self._init_db()
-
-    def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            # Drop table if exists to ensure correct schema
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS ml_models (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    version TEXT NOT NULL,
-                    model_type TEXT NOT NULL,
-                    data BLOB NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    category TEXT NOT NULL DEFAULT 'model',
-                    UNIQUE(name, version)
-                )
-            ''')
-            # Create index for faster lookups
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_ml_models_name_version ON ml_models(name, version)')
+        self.cache_dir = Path(cache_dir or config.MODEL_CACHE_DIR or Path(db_path).resolve().parent / 'model_cache')
+        self.db = open_database(db_path, [self._create_tables, self._add_sha256_column, self._move_data_to_blobs])
+        self.cleanup_model_cache()
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Schema version 1: create the tables if they don't exist."""
+        # Drop table if exists to ensure correct schema
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS ml_models (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                version TEXT NOT NULL,
+                model_type TEXT NOT NULL,
+                data BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                category TEXT NOT NULL DEFAULT 'model',
+                UNIQUE(name, version)
+            )
+        ''')
+        # Create index for faster lookups
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_ml_models_name_version ON ml_models(name, version)')
+
+    def _add_sha256_column(self, conn: sqlite3.Connection):
+        """Schema version 2: store the SHA-256 of the model data (computed for existing rows)."""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(ml_models)')}
+        if 'sha256' not in columns:
+            conn.execute('ALTER TABLE ml_models ADD COLUMN sha256 TEXT')
+        for (model_id,) in conn.execute('SELECT id FROM ml_models WHERE sha256 IS NULL').fetchall():
+            digest = hashlib.sha256()
+            with conn.blobopen('ml_models', 'data', model_id, readonly=True) as blob:
+                for chunk in iter(lambda: blob.read(config.MODEL_CACHE_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            conn.execute('UPDATE ml_models SET sha256 = ? WHERE id = ?', (digest.hexdigest(), model_id))
 
+    def _move_data_to_blobs(self, conn: sqlite3.Connection):
+        """Schema version 3: keep model data once per SHA-256 in model_blobs."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS model_blobs (
+                sha256 TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('''
+            INSERT OR IGNORE INTO model_blobs (sha256, data, size)
+            SELECT sha256, data, length(data) FROM ml_models
+        ''')
+        conn.execute('ALTER TABLE ml_models DROP COLUMN data')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_ml_models_sha256 ON ml_models(sha256)')
+
+    @invalidates(ML_MODELS)
     def insert_model(self, name: str, version: str, model_type: str, data: bytes, category: str = 'model') -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        sha256 = hashlib.sha256(data).hexdigest()
+        with self.db.transaction() as conn:
+            conn.execute('INSERT OR IGNORE INTO model_blobs (sha256, data, size) VALUES (?, ?, ?)',
+                         (sha256, data, len(data)))
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO ml_models (name, version, model_type, data, category)
+                INSERT INTO ml_models (name, version, model_type, category, sha256)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (name, version, model_type, data, category))
-            conn.commit()
+            ''', (name, version, model_type, category, sha256))
             return cursor.lastrowid
 
+    @invalidates(ML_MODELS)
+    def insert_model_from_stream(self, name: str, version: str, model_type: str, stream: BinaryIO,
+                                 category: str = 'model') -> int:
+        """
+        Store a model read from a file-like object without holding it in memory.
+
+        The stream is copied in MODEL_CACHE_CHUNK_SIZE pieces into a staging file in the
+        cache directory while it is hashed. Unless a BLOB with the same SHA-256 already
+        exists, a zero-filled BLOB of the right size is inserted and filled from the
+        staging file through incremental BLOB I/O. The staging file then becomes the
+        cache entry, so the first load needs no copy.
+
+        Raises:
+            sqlite3.IntegrityError: The name/version already exists
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, staging_path = tempfile.mkstemp(dir=self.cache_dir, prefix='upload.', suffix='.tmp')
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(config.MODEL_CACHE_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+
+            with self.db.transaction() as conn:
+                row = conn.execute('SELECT rowid FROM model_blobs WHERE sha256 = ?', (sha256,)).fetchone()
+                deduplicated = row is not None
+                if not deduplicated:
+                    cursor = conn.execute('INSERT INTO model_blobs (sha256, data, size) VALUES (?, zeroblob(?), ?)',
+                                          (sha256, size, size))
+                    with open(staging_path, 'rb') as f, conn.blobopen('model_blobs', 'data', cursor.lastrowid) as blob:
+                        for chunk in iter(lambda: f.read(config.MODEL_CACHE_CHUNK_SIZE), b''):
+                            blob.write(chunk)
+                cursor = conn.execute('''
+                    INSERT INTO ml_models (name, version, model_type, category, sha256)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (name, version, model_type, category, sha256))
+                model_id = cursor.lastrowid
+
+            cache_path = self.cache_dir / f'{sha256}{MODEL_FILE_SUFFIX}'
+            if cache_path.is_file():
+                os.remove(staging_path)
+            else:
+                os.replace(staging_path, cache_path)
+        except BaseException:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+            raise
+
+        if deduplicated:
+            logger.info(f"[ModelStore] {name}:{version} is identical to a stored model, sharing its data")
+        else:
+            logger.info(f"[ModelStore] Stored {name}:{version} ({size / 1024 / 1024:.1f} MB)")
+        return model_id
+
     def insert_model_from_file(self, name: str, version: str, model_type: str, file_path: str) -> int:
         with open(file_path, 'rb') as f:
-            data = f.read()
-        return self.insert_model(name, version, model_type, data)
+            return self.insert_model_from_stream(name, version, model_type, f)
 
     def get_model(self, name: str, version: str) -> Optional[Tuple[int, str, str, bytes, datetime, datetime]]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, name, version, model_type, data, created_at, updated_at, category
-                FROM ml_models
-                WHERE name = ? AND version = ?
+                SELECT m.id, m.name, m.version, m.model_type, b.data, m.created_at, m.updated_at, m.category
+                FROM ml_models m
+                JOIN model_blobs b ON b.sha256 = m.sha256
+                WHERE m.name = ? AND m.version = ?
             ''', (name, version))
             row = cursor.fetchone()
             if row:
@@ -70,18 +181,90 @@ class MLSQLiteProvider:
         model = self.get_model(name, version)
         return model[4] if model else None
 
-    def get_model_to_temp_file(self, name: str, version: str, suffix: Optional[str] = None) -> Optional[str]:
-        data = self.get_model_data(name, version)
-        if data is None:
+    def get_model_cache_path(self, name: str, version: str) -> Optional[str]:
+        """Get the path of the cached model file, writing it on first use."""
+        with self.db.read() as conn:
+            row = conn.execute('SELECT sha256 FROM ml_models WHERE name = ? AND version = ?',
+                               (name, version)).fetchone()
+        if not row:
+            return None
+        return self._ensure_cached(row[0])
+
+    def _ensure_cached(self, sha256: str) -> Optional[str]:
+        """
+        Copy a model BLOB into the cache unless its file already exists.
+
+        The BLOB is streamed in MODEL_CACHE_CHUNK_SIZE pieces into a temporary file
+        that is renamed into place once its hash matches, so readers never see a
+        partial file and concurrent loads of the same model simply race to the
+        same result.
+        """
+        path = self.cache_dir / f'{sha256}{MODEL_FILE_SUFFIX}'
+        if path.is_file():
+            return str(path)
+
+        with self.db.read() as conn:
+            row = conn.execute('SELECT rowid FROM model_blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        if not row:
+            logger.error(f"[ModelCache] No stored data for model {sha256}")
             return None
 
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file.write(data)
-            return temp_file.name
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f'{sha256}.', suffix='.tmp')
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as f, self.db.read() as conn:
+                with conn.blobopen('model_blobs', 'data', row[0], readonly=True) as blob:
+                    for chunk in iter(lambda: blob.read(config.MODEL_CACHE_CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        f.write(chunk)
+            if digest.hexdigest() != sha256:
+                logger.error(f"[ModelCache] SHA-256 mismatch for model data {sha256}, not caching it")
+                os.remove(temp_path)
+                return None
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        logger.info(f"[ModelCache] Cached model data as {path.name}")
+        return str(path)
+
+    def cleanup_model_cache(self) -> int:
+        """
+        Remove cached files of models that are no longer stored, and partial files left behind.
+
+        Returns:
+            Number of removed files
+        """
+        if not self.cache_dir.is_dir():
+            return 0
+        with self.db.read() as conn:
+            referenced = {row[0] for row in conn.execute('SELECT sha256 FROM model_blobs')}
 
+        removed = 0
+        now = time.time()
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith('.tmp'):
+                stale = now - entry.stat().st_mtime > config.MODEL_CACHE_TMP_MAX_AGE
+            else:
+                stale = entry.name.endswith(MODEL_FILE_SUFFIX) and entry.name[:-len(MODEL_FILE_SUFFIX)] not in referenced
+            if not stale:
+                continue
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"[ModelCache] Could not remove {entry.name}: {e}")
+        if removed:
+            logger.info(f"[ModelCache] Removed {removed} stale cache file(s)")
+        return removed
+
+    @cached(ML_MODELS)
     def list_models(self) -> list:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, name, version, model_type, created_at, updated_at
@@ -91,8 +274,9 @@ class MLSQLiteProvider:
             ''')
             return cursor.fetchall()
 
+    @cached(ML_MODELS)
     def list_classifiers(self) -> list:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, name, version, model_type, created_at, updated_at
@@ -102,8 +286,9 @@ class MLSQLiteProvider:
             ''')
             return cursor.fetchall()
 
+    @cached(ML_MODELS)
     def list_model_versions(self, name: str) -> list:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT version, model_type, created_at
@@ -113,43 +298,51 @@ class MLSQLiteProvider:
             ''', (name,))
             return cursor.fetchall()
 
+    @invalidates(ML_MODELS)
     def delete_model(self, name: str, version: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM ml_models WHERE name = ? AND version = ?', (name, version))
-            conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+            conn.execute(DELETE_UNUSED_BLOBS_SQL)
+        if deleted:
+            self.cleanup_model_cache()
+        return deleted
 
+    @invalidates(ML_MODELS)
     def delete_model_by_id(self, model_id: int) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM ml_models WHERE id = ?', (model_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+            conn.execute(DELETE_UNUSED_BLOBS_SQL)
+        if deleted:
+            self.cleanup_model_cache()
+        return deleted
 
     def load_ml_model(self, name: str, version: str):
-        data = self.get_model_data(name, version)
-        if not data:
+        with self.db.read() as conn:
+            row = conn.execute('SELECT category, sha256 FROM ml_models WHERE name = ? AND version = ?',
+                               (name, version)).fetchone()
+        if not row:
             return None
-        model_info = self.get_model(name, version)
-        if not model_info:
+        category, sha256 = row
+        model_path = self._ensure_cached(sha256)
+        if not model_path:
             return None
-        category = model_info[7]  # category
-        model_type = model_info[3]
-        import io
         if category == 'model':
             from ultralytics import YOLO
-            # YOLO requires a file path, not BytesIO, so save to temp file
-            temp_path = self.get_model_to_temp_file(name, version, suffix='.pt')
-            if temp_path:
-                return YOLO(temp_path)
-            return None
+            # YOLO requires a file path, so it loads the cached file directly
+            return YOLO(model_path)
         elif category == 'classifier':
             import torch
             import torchvision.models as models
             
-            # Load state dict to determine number of classes
-            state_dict = torch.load(io.BytesIO(data), weights_only=False)
+            # Map the cached file instead of reading it into memory (needs the zip checkpoint format)
+            try:
+                state_dict = torch.load(model_path, weights_only=False, mmap=True)
+            except (RuntimeError, TypeError):
+                state_dict = torch.load(model_path, weights_only=False)
             
             # Get number of classes from the fc layer in state dict
             if 'fc.weight' in state_dict:
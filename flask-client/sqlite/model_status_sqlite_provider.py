@@ -1,6 +1,8 @@
 import sqlite3
 from typing import Optional, List
 from dataclasses import dataclass
+from sqlite.database import open_database
+from sqlite.settings_cache import cached, invalidates, MODEL_STATUS
 
 
 @dataclass
@@ -19,34 +21,33 @@ class ModelStatus:
 class ModelStatusSQLiteProvider:
     def __init__(self, db_path: str = 'model_status.db'):
         self.db_path = db_path
-        self._init_db()
+        self.db = open_database(db_path, [self._create_tables])
 
-    def _init_db(self):
-        """Initialize the database and create tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS model_status (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT NOT NULL UNIQUE
-                )
-            ''')
-            conn.commit()
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Schema version 1: create the tables if they don't exist."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS model_status (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
 
+    @invalidates(MODEL_STATUS)
     def insert_status(self, id: int, name: str) -> bool:
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO model_status (id, name)
                     VALUES (?, ?)
                 ''', (id, name))
-                conn.commit()
                 return True
         except sqlite3.IntegrityError:
             return False
 
+    @cached(MODEL_STATUS)
     def get_status_by_id(self, status_id: int) -> Optional[ModelStatus]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, name
@@ -58,8 +59,9 @@ class ModelStatusSQLiteProvider:
                 return ModelStatus(id=row[0], name=row[1])
             return None
 
+    @cached(MODEL_STATUS)
     def get_all_statuses(self) -> List[ModelStatus]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, name
@@ -69,9 +71,10 @@ class ModelStatusSQLiteProvider:
             rows = cursor.fetchall()
             return [ModelStatus(id=row[0], name=row[1]) for row in rows]
 
+    @invalidates(MODEL_STATUS)
     def update_status(self, old_id: int, new_id: int, name: str) -> bool:
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 # If ID is changing, we need to delete and insert
                 if old_id != new_id:
@@ -83,23 +86,22 @@ class ModelStatusSQLiteProvider:
                         SET name = ?
                         WHERE id = ?
                     ''', (name, new_id))
-                conn.commit()
                 return cursor.rowcount > 0 or old_id != new_id
         except sqlite3.IntegrityError:
             return False
 
+    @invalidates(MODEL_STATUS)
     def delete_status(self, status_id: int) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM model_status WHERE id = ?', (status_id,))
-            conn.commit()
             return cursor.rowcount > 0
 
+    @invalidates(MODEL_STATUS)
     def delete_all_statuses(self) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM model_status')
-            conn.commit()
             return cursor.rowcount
 
 
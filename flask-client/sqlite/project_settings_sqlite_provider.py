@@ -2,6 +2,8 @@ import sqlite3
 from datetime import datetime
 from typing import Optional
 from dataclasses import dataclass
+from sqlite.database import open_database
+from sqlite.settings_cache import cached, invalidates, PROJECT_SETTINGS
 
 
 @dataclass
@@ -15,6 +17,8 @@ class ProjectSettings:
     iris_model_subfolder: Optional[str] = None
     csv_interval_seconds: int = 60
     image_processing_interval: float = 1.0
+    model_output_mode: str = 'particles'  # 'particles', 'summary' or 'both'
+    summary_interval_seconds: int = 60
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
@@ -30,6 +34,8 @@ class ProjectSettings:
             'iris_model_subfolder': self.iris_model_subfolder,
             'csv_interval_seconds': self.csv_interval_seconds,
             'image_processing_interval': self.image_processing_interval,
+            'model_output_mode': self.model_output_mode,
+            'summary_interval_seconds': self.summary_interval_seconds,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -38,40 +44,53 @@ class ProjectSettings:
 class ProjectSettingsSQLiteProvider:
     def __init__(self, db_path: str = 'project_settings.db'):
         self.db_path = db_path
-        self._init_db()
+        self.db = open_database(db_path, [self._create_tables])
 
-    def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS project_settings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    vm_number TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    iris_main_folder TEXT,
-                    iris_classifier_subfolder TEXT,
-                    iris_model_subfolder TEXT,
-                    csv_interval_seconds INTEGER DEFAULT 60,
-                    image_processing_interval REAL DEFAULT 1.0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            # Insert default settings if not exists
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM project_settings')
-            if cursor.fetchone()[0] == 0:
-                cursor.execute('''
-                    INSERT INTO project_settings (vm_number, title, description, iris_main_folder, iris_classifier_subfolder, iris_model_subfolder, csv_interval_seconds, image_processing_interval)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', ('VM001', 'Belt Vision Project', 'Default project configuration', '', '', '', 60, 1.0))
-            conn.commit()
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Schema version 1: create the tables if they don't exist."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS project_settings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                vm_number TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                iris_main_folder TEXT,
+                iris_classifier_subfolder TEXT,
+                iris_model_subfolder TEXT,
+                csv_interval_seconds INTEGER DEFAULT 60,
+                image_processing_interval REAL DEFAULT 1.0,
+                model_output_mode TEXT DEFAULT 'particles',
+                summary_interval_seconds INTEGER DEFAULT 60,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Add new columns to existing table if they don't exist (migration)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(project_settings)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'model_output_mode' not in columns:
+            conn.execute("ALTER TABLE project_settings ADD COLUMN model_output_mode TEXT DEFAULT 'particles'")
+        
+        if 'summary_interval_seconds' not in columns:
+            conn.execute('ALTER TABLE project_settings ADD COLUMN summary_interval_seconds INTEGER DEFAULT 60')
+        
+        # Insert default settings if not exists
+        cursor.execute('SELECT COUNT(*) FROM project_settings')
+        if cursor.fetchone()[0] == 0:
+            cursor.execute('''
+                INSERT INTO project_settings (vm_number, title, description, iris_main_folder, iris_classifier_subfolder, iris_model_subfolder, csv_interval_seconds, image_processing_interval)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', ('VM001', 'Belt Vision Project', 'Default project configuration', '', '', '', 60, 1.0))
 
+    @cached(PROJECT_SETTINGS)
     def get_current_settings(self) -> Optional[ProjectSettings]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, vm_number, title, description, iris_main_folder, iris_classifier_subfolder, iris_model_subfolder, csv_interval_seconds, image_processing_interval, created_at, updated_at
+                SELECT id, vm_number, title, description, iris_main_folder, iris_classifier_subfolder, iris_model_subfolder, csv_interval_seconds, image_processing_interval, created_at, updated_at, model_output_mode, summary_interval_seconds
                 FROM project_settings
                 ORDER BY id DESC
                 LIMIT 1
@@ -90,16 +109,20 @@ class ProjectSettingsSQLiteProvider:
                     iris_model_subfolder=row[6],
                     csv_interval_seconds=row[7] if row[7] is not None else 60,
                     image_processing_interval=row[8] if row[8] is not None else 1.0,
+                    model_output_mode=row[11] or 'particles',
+                    summary_interval_seconds=row[12] if row[12] is not None else 60,
                     created_at=created_at,
                     updated_at=updated_at
                 )
             return None
 
+    @invalidates(PROJECT_SETTINGS)
     def update_settings(self, vm_number: str, title: str, description: str, 
                         iris_main_folder: str = '', iris_classifier_subfolder: str = '', 
                         iris_model_subfolder: str = '', csv_interval_seconds: int = 60,
-                        image_processing_interval: float = 1.0) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+                        image_processing_interval: float = 1.0, model_output_mode: str = 'particles',
+                        summary_interval_seconds: int = 60) -> bool:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT id FROM project_settings ORDER BY id DESC LIMIT 1')
             existing = cursor.fetchone()
@@ -109,19 +132,22 @@ class ProjectSettingsSQLiteProvider:
                     UPDATE project_settings
                     SET vm_number = ?, title = ?, description = ?, iris_main_folder = ?, 
                         iris_classifier_subfolder = ?, iris_model_subfolder = ?, csv_interval_seconds = ?, 
-                        image_processing_interval = ?, updated_at = CURRENT_TIMESTAMP
+                        image_processing_interval = ?, model_output_mode = ?, summary_interval_seconds = ?,
+                        updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 ''', (vm_number, title, description, iris_main_folder, iris_classifier_subfolder, 
-                      iris_model_subfolder, csv_interval_seconds, image_processing_interval, existing[0]))
+                      iris_model_subfolder, csv_interval_seconds, image_processing_interval,
+                      model_output_mode, summary_interval_seconds, existing[0]))
             else:
                 cursor.execute('''
                     INSERT INTO project_settings (vm_number, title, description, iris_main_folder, 
-                                                   iris_classifier_subfolder, iris_model_subfolder, csv_interval_seconds, image_processing_interval)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                                                   iris_classifier_subfolder, iris_model_subfolder, csv_interval_seconds, image_processing_interval,
+                                                   model_output_mode, summary_interval_seconds)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (vm_number, title, description, iris_main_folder, iris_classifier_subfolder, 
-                      iris_model_subfolder, csv_interval_seconds, image_processing_interval))
+                      iris_model_subfolder, csv_interval_seconds, image_processing_interval,
+                      model_output_mode, summary_interval_seconds))
             
-            conn.commit()
             return True
 
     def get_settings_dict(self) -> Optional[dict]:
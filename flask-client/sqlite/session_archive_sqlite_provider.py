@@ -0,0 +1,158 @@
+import sqlite3
+import time
+from typing import Optional, List
+from dataclasses import dataclass
+from sqlite.database import open_database
+
+# Archive states
+STATUS_BUNDLED = 'bundled'      # Bundle built, waiting for upload
+STATUS_UPLOADED = 'uploaded'    # Bundle is on the SFTP server; the session may be deleted locally
+
+
+@dataclass
+class SessionArchive:
+    id: int
+    project_title: str
+    session_folder: str
+    bundle_path: str
+    status: str
+    file_count: int
+    source_bytes: int
+    bundle_bytes: int
+    created_at: float
+    uploaded_at: Optional[float]
+    remote_path: Optional[str]
+
+    def to_dict(self) -> dict:
+        """Convert the archive record to a dictionary."""
+        return {
+            'id': self.id,
+            'project_title': self.project_title,
+            'session_folder': self.session_folder,
+            'bundle_path': self.bundle_path,
+            'status': self.status,
+            'file_count': self.file_count,
+            'source_bytes': self.source_bytes,
+            'bundle_bytes': self.bundle_bytes,
+            'created_at': self.created_at,
+            'uploaded_at': self.uploaded_at,
+            'remote_path': self.remote_path
+        }
+
+
+class SessionArchiveSQLiteProvider:
+    """Tracks the archival bundles of recording sessions and whether they reached the SFTP server."""
+
+    def __init__(self, db_path: str = 'session_archives.db'):
+        self.db_path = db_path
+        self.db = open_database(db_path, [self._create_tables])
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Schema version 1: create the tables if they don't exist."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS session_archives (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_title TEXT NOT NULL,
+                session_folder TEXT NOT NULL UNIQUE,
+                bundle_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                source_bytes INTEGER NOT NULL DEFAULT 0,
+                bundle_bytes INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                uploaded_at REAL,
+                remote_path TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_session_archives_status
+            ON session_archives (status, created_at)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_session_archives_bundle
+            ON session_archives (bundle_path)
+        ''')
+
+    def _row_to_archive(self, row) -> SessionArchive:
+        return SessionArchive(
+            id=row[0], project_title=row[1], session_folder=row[2], bundle_path=row[3], status=row[4],
+            file_count=row[5], source_bytes=row[6], bundle_bytes=row[7], created_at=row[8],
+            uploaded_at=row[9], remote_path=row[10]
+        )
+
+    def insert_archive(self, project_title: str, session_folder: str, bundle_path: str, file_count: int,
+                       source_bytes: int, bundle_bytes: int) -> Optional[int]:
+        """Record a newly built bundle (replaces an earlier record of the same session)."""
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO session_archives (project_title, session_folder, bundle_path, status,
+                                                         file_count, source_bytes, bundle_bytes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (project_title, session_folder, bundle_path, STATUS_BUNDLED,
+                  file_count, source_bytes, bundle_bytes, time.time()))
+            return cursor.lastrowid
+
+    def get_archived_folders(self) -> List[str]:
+        """Get the session folders that already have a bundle (any status)."""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT session_folder FROM session_archives')
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_uploaded_folders(self) -> List[str]:
+        """Get the session folders whose bundle has been uploaded."""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT session_folder FROM session_archives WHERE status = ?', (STATUS_UPLOADED,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_archives_by_status(self, status: str, limit: int = 100) -> List[SessionArchive]:
+        """Get archive records with a given status, oldest first."""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, project_title, session_folder, bundle_path, status, file_count,
+                       source_bytes, bundle_bytes, created_at, uploaded_at, remote_path
+                FROM session_archives
+                WHERE status = ?
+                ORDER BY created_at ASC, id ASC
+                LIMIT ?
+            ''', (status, limit))
+            return [self._row_to_archive(row) for row in cursor.fetchall()]
+
+    def mark_uploaded(self, bundle_path: str, remote_path: Optional[str] = None) -> bool:
+        """Mark the bundle at a local path as uploaded."""
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE session_archives
+                SET status = ?, uploaded_at = ?, remote_path = ?
+                WHERE bundle_path = ? AND status != ?
+            ''', (STATUS_UPLOADED, time.time(), remote_path, bundle_path, STATUS_UPLOADED))
+            return cursor.rowcount > 0
+
+    def delete_archive(self, session_folder: str) -> bool:
+        """Forget the bundle of a session (e.g. the bundle file was lost before upload)."""
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM session_archives WHERE session_folder = ?', (session_folder,))
+            return cursor.rowcount > 0
+
+    def get_archive_stats(self) -> dict:
+        """Get the number and size of bundles per status."""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT status, COUNT(*), SUM(source_bytes), SUM(bundle_bytes)
+                FROM session_archives
+                GROUP BY status
+            ''')
+            return {
+                status: {'count': count, 'source_bytes': source_bytes or 0, 'bundle_bytes': bundle_bytes or 0}
+                for status, count, source_bytes, bundle_bytes in cursor.fetchall()
+            }
+
+
+# Global instance
+session_archive_provider = SessionArchiveSQLiteProvider()
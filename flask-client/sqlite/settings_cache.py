@@ -0,0 +1,140 @@
+"""
+Versioned in-process cache for settings read through the SQLite providers.
+
+Read methods of a provider are wrapped with @cached(namespace); write methods
+with @invalidates(namespace). Every namespace has a version number that is
+bumped on each write, which drops all cached reads of that namespace and
+notifies the subscribers, e.g. running camera threads that reload their settings.
+
+Cached values are shared between callers and must be treated as read-only.
+Writes made by another process are not seen until the next local write to the
+namespace or invalidate().
+"""
+
+import functools
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+from infrastructure.logging.logging_provider import get_logger
+
+# Initialize logger
+logger = get_logger()
+
+# Namespaces used by the providers
+PROJECT_SETTINGS = 'project_settings'
+DETECTION_MODEL_SETTINGS = 'detection_model_settings'
+MODEL_STATUS = 'model_status'
+ML_MODELS = 'ml_models'
+SFTP_SERVERS = 'sftp_servers'
+
+
+class SettingsCache:
+    """Thread-safe cache of provider reads, grouped into versioned namespaces."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[Tuple[str, Any], Tuple[int, Any]] = {}  # (namespace, key) -> (version, value)
+        self._subscribers: Dict[str, List[Callable[[str, int], None]]] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get_version(self, namespace: str) -> int:
+        """Get the current version of a namespace (0 until its first write)."""
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def get(self, namespace: str, key: Any, loader: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, loading it on a miss.
+
+        Args:
+            namespace: Namespace the value belongs to
+            key: Hashable key within the namespace
+            loader: Reads the value from the database (called without the lock held)
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        with self._lock:
+            version = self._versions.get(namespace, 0)
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] == version:
+                self._stats['hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+
+        value = loader()
+        with self._lock:
+            # A write during the load bumped the version - do not cache the possibly stale value
+            if self._versions.get(namespace, 0) == version:
+                self._entries[(namespace, key)] = (version, value)
+        return value
+
+    def invalidate(self, namespace: str):
+        """Drop all cached values of a namespace and notify its subscribers."""
+        with self._lock:
+            version = self._versions.get(namespace, 0) + 1
+            self._versions[namespace] = version
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == namespace]:
+                del self._entries[entry_key]
+            self._stats['invalidations'] += 1
+            subscribers = list(self._subscribers.get(namespace, []))
+
+        for callback in subscribers:
+            try:
+                callback(namespace, version)
+            except Exception as e:
+                logger.error(f"[SettingsCache] Subscriber of {namespace} failed: {e}")
+
+    def subscribe(self, namespace: str, callback: Callable[[str, int], None]):
+        """
+        Register a callback for changes of a namespace.
+
+        The callback runs in the thread that made the change, with (namespace, new version),
+        and should only record that a reload is due.
+        """
+        with self._lock:
+            self._subscribers.setdefault(namespace, []).append(callback)
+
+    def unsubscribe(self, namespace: str, callback: Callable[[str, int], None]):
+        """Remove a callback registered with subscribe()."""
+        with self._lock:
+            callbacks = self._subscribers.get(namespace, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counts, cached entries and the version of every namespace."""
+        with self._lock:
+            stats = self._stats.copy()
+            stats['entries'] = len(self._entries)
+            stats['versions'] = self._versions.copy()
+            stats['subscribers'] = {namespace: len(callbacks) for namespace, callbacks in self._subscribers.items()}
+            return stats
+
+
+# Global instance
+settings_cache = SettingsCache()
+
+
+def cached(namespace: str):
+    """Cache the result of a provider read method per database file and arguments."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (self.db_path, method.__name__, args, tuple(sorted(kwargs.items())))
+            return settings_cache.get(namespace, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidates(namespace: str):
+    """Invalidate a namespace after a provider write method ran (also if it failed half-way)."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                settings_cache.invalidate(namespace)
+        return wrapper
+    return decorator
@@ -1,6 +1,8 @@
 import sqlite3
 from typing import Optional, List
 from dataclasses import dataclass
+from sqlite.database import open_database
+from sqlite.settings_cache import cached, invalidates, SFTP_SERVERS
 
 
 @dataclass
@@ -9,6 +11,7 @@ class SftpServerInfos:
     server_name: str
     username: str
     password: str
+    compression: str = 'none'  # 'none', 'gzip' or 'zstd' - applied to rotated CSVs before upload
     
     def to_dict(self) -> dict:
         """Convert the SFTP server info to a dictionary."""
@@ -16,97 +19,111 @@ class SftpServerInfos:
             'id': self.id,
             'server_name': self.server_name,
             'username': self.username,
-            'password': self.password
+            'password': self.password,
+            'compression': self.compression
         }
 
 
 class SftpSQLiteProvider:
     def __init__(self, db_path: str = 'sftp_servers.db'):
         self.db_path = db_path
-        self._init_db()
+        self.db = open_database(db_path, [self._create_tables])
 
-    def _init_db(self):
-        """Initialize the database and create tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS sftp_servers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    server_name TEXT NOT NULL,
-                    username TEXT NOT NULL,
-                    password TEXT NOT NULL
-                )
-            ''')
-            conn.commit()
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Schema version 1: create the tables if they don't exist."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sftp_servers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                server_name TEXT NOT NULL,
+                username TEXT NOT NULL,
+                password TEXT NOT NULL,
+                compression TEXT NOT NULL DEFAULT 'none'
+            )
+        ''')
+        
+        # Add new columns to existing table if they don't exist (migration)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(sftp_servers)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'compression' not in columns:
+            conn.execute("ALTER TABLE sftp_servers ADD COLUMN compression TEXT NOT NULL DEFAULT 'none'")
 
-    def insert_server(self, server_name: str, username: str, password: str) -> Optional[int]:
+    @invalidates(SFTP_SERVERS)
+    def insert_server(self, server_name: str, username: str, password: str,
+                      compression: str = 'none') -> Optional[int]:
         """Insert a new SFTP server configuration."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    INSERT INTO sftp_servers (server_name, username, password)
-                    VALUES (?, ?, ?)
-                ''', (server_name, username, password))
-                conn.commit()
+                    INSERT INTO sftp_servers (server_name, username, password, compression)
+                    VALUES (?, ?, ?, ?)
+                ''', (server_name, username, password, compression))
                 return cursor.lastrowid
         except sqlite3.IntegrityError:
             return None
 
+    @cached(SFTP_SERVERS)
     def get_server_by_id(self, server_id: int) -> Optional[SftpServerInfos]:
         """Get SFTP server configuration by ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, server_name, username, password
+                SELECT id, server_name, username, password, compression
                 FROM sftp_servers
                 WHERE id = ?
             ''', (server_id,))
             row = cursor.fetchone()
             if row:
-                return SftpServerInfos(id=row[0], server_name=row[1], username=row[2], password=row[3])
+                return SftpServerInfos(id=row[0], server_name=row[1], username=row[2], password=row[3],
+                                       compression=row[4] or 'none')
             return None
 
+    @cached(SFTP_SERVERS)
     def get_all_servers(self) -> List[SftpServerInfos]:
         """Get all SFTP server configurations."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, server_name, username, password
+                SELECT id, server_name, username, password, compression
                 FROM sftp_servers
                 ORDER BY id ASC
             ''')
             rows = cursor.fetchall()
-            return [SftpServerInfos(id=row[0], server_name=row[1], username=row[2], password=row[3]) for row in rows]
+            return [SftpServerInfos(id=row[0], server_name=row[1], username=row[2], password=row[3],
+                                    compression=row[4] or 'none') for row in rows]
 
-    def update_server(self, server_id: int, server_name: str, username: str, password: str) -> bool:
+    @invalidates(SFTP_SERVERS)
+    def update_server(self, server_id: int, server_name: str, username: str, password: str,
+                      compression: str = 'none') -> bool:
         """Update an existing SFTP server configuration."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE sftp_servers
-                    SET server_name = ?, username = ?, password = ?
+                    SET server_name = ?, username = ?, password = ?, compression = ?
                     WHERE id = ?
-                ''', (server_name, username, password, server_id))
-                conn.commit()
+                ''', (server_name, username, password, compression, server_id))
                 return cursor.rowcount > 0
         except sqlite3.IntegrityError:
             return False
 
+    @invalidates(SFTP_SERVERS)
     def delete_server(self, server_id: int) -> bool:
         """Delete an SFTP server configuration."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM sftp_servers WHERE id = ?', (server_id,))
-            conn.commit()
             return cursor.rowcount > 0
 
+    @invalidates(SFTP_SERVERS)
     def delete_all_servers(self) -> int:
         """Delete all SFTP server configurations."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM sftp_servers')
-            conn.commit()
             return cursor.rowcount
 
 
@@ -0,0 +1,180 @@
+import sqlite3
+import time
+from typing import Optional, List
+from dataclasses import dataclass
+from sqlite.database import open_database
+
+
+@dataclass
+class SpooledUpload:
+    id: int
+    server_id: int
+    file_path: str
+    folder_type: str
+    remote_directory: str
+    original_size: Optional[int]
+    remove_after_upload: bool
+    attempts: int
+    next_attempt_at: float
+    created_at: float
+    last_error: Optional[str]
+
+    def to_dict(self) -> dict:
+        """Convert the spooled upload to a dictionary."""
+        return {
+            'id': self.id,
+            'server_id': self.server_id,
+            'file_path': self.file_path,
+            'folder_type': self.folder_type,
+            'remote_directory': self.remote_directory,
+            'original_size': self.original_size,
+            'remove_after_upload': self.remove_after_upload,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at,
+            'created_at': self.created_at,
+            'last_error': self.last_error
+        }
+
+
+class UploadSpoolSQLiteProvider:
+    """Durable spool of every SFTP upload that has not been delivered yet."""
+
+    def __init__(self, db_path: str = 'upload_spool.db'):
+        self.db_path = db_path
+        self.db = open_database(db_path, [self._create_tables])
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Schema version 1: create the tables if they don't exist."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS upload_spool (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                server_id INTEGER NOT NULL,
+                file_path TEXT NOT NULL,
+                folder_type TEXT NOT NULL,
+                remote_directory TEXT NOT NULL,
+                original_size INTEGER,
+                remove_after_upload INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_error TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_upload_spool_next_attempt
+            ON upload_spool (next_attempt_at)
+        ''')
+
+    def _row_to_item(self, row) -> SpooledUpload:
+        return SpooledUpload(
+            id=row[0], server_id=row[1], file_path=row[2], folder_type=row[3],
+            remote_directory=row[4], original_size=row[5], remove_after_upload=bool(row[6]),
+            attempts=row[7], next_attempt_at=row[8], created_at=row[9], last_error=row[10]
+        )
+
+    def insert_item(self, server_id: int, file_path: str, folder_type: str, remote_directory: str,
+                    original_size: Optional[int] = None, remove_after_upload: bool = False,
+                    attempts: int = 0, next_attempt_at: Optional[float] = None,
+                    last_error: Optional[str] = None) -> Optional[int]:
+        """Add an upload to the spool."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO upload_spool (server_id, file_path, folder_type, remote_directory, original_size,
+                                          remove_after_upload, attempts, next_attempt_at, created_at, last_error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (server_id, file_path, folder_type, remote_directory, original_size,
+                  int(remove_after_upload), attempts,
+                  next_attempt_at if next_attempt_at is not None else now, now, last_error))
+            return cursor.lastrowid
+
+    def get_due_items(self, limit: int = 20, exclude_ids: Optional[List[int]] = None) -> List[SpooledUpload]:
+        """Get the spooled uploads whose next attempt is due, oldest first."""
+        exclude_ids = list(exclude_ids or [])
+        placeholders = ','.join('?' * len(exclude_ids))
+        exclude_clause = f'AND id NOT IN ({placeholders})' if exclude_ids else ''
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT id, server_id, file_path, folder_type, remote_directory, original_size,
+                       remove_after_upload, attempts, next_attempt_at, created_at, last_error
+                FROM upload_spool
+                WHERE next_attempt_at <= ? {exclude_clause}
+                ORDER BY next_attempt_at ASC, id ASC
+                LIMIT ?
+            ''', (time.time(), *exclude_ids, limit))
+            return [self._row_to_item(row) for row in cursor.fetchall()]
+
+    def reschedule_item(self, item_id: int, attempts: int, next_attempt_at: float, last_error: str) -> bool:
+        """Record a failed attempt and schedule the next one."""
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE upload_spool
+                SET attempts = ?, next_attempt_at = ?, last_error = ?
+                WHERE id = ?
+            ''', (attempts, next_attempt_at, last_error, item_id))
+            return cursor.rowcount > 0
+
+    def reset_server_backoff(self, server_id: int) -> int:
+        """Make every spooled upload of a server due now (e.g. after the server came back)."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE upload_spool
+                SET next_attempt_at = ?
+                WHERE server_id = ? AND next_attempt_at > ?
+            ''', (now, server_id, now))
+            return cursor.rowcount
+
+    def make_all_due(self) -> int:
+        """Make every spooled upload due now (e.g. on startup, to reload all undelivered uploads)."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE upload_spool SET next_attempt_at = ? WHERE next_attempt_at > ?', (now, now))
+            return cursor.rowcount
+
+    def count_items(self) -> int:
+        """Get the number of spooled uploads."""
+        with self.db.read() as conn:
+            return conn.execute('SELECT COUNT(*) FROM upload_spool').fetchone()[0]
+
+    def get_backed_off_server_ids(self) -> List[int]:
+        """Get the ids of servers that have spooled uploads waiting in backoff."""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT DISTINCT server_id FROM upload_spool WHERE next_attempt_at > ?', (time.time(),))
+            return [row[0] for row in cursor.fetchall()]
+
+    def delete_item(self, item_id: int) -> bool:
+        """Remove an upload from the spool."""
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM upload_spool WHERE id = ?', (item_id,))
+            return cursor.rowcount > 0
+
+    def delete_all_items(self) -> int:
+        """Remove every upload from the spool."""
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM upload_spool')
+            return cursor.rowcount
+
+    def get_spool_stats(self) -> dict:
+        """Get the number of spooled uploads and the age of the oldest one."""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*), MIN(created_at), MAX(attempts) FROM upload_spool')
+            count, oldest_created_at, max_attempts = cursor.fetchone()
+            return {
+                'spool_depth': count,
+                'spool_oldest_age': round(time.time() - oldest_created_at, 1) if oldest_created_at else 0.0,
+                'spool_max_attempts': max_attempts or 0
+            }
+
+
+# Global instance
+upload_spool_provider = UploadSpoolSQLiteProvider()
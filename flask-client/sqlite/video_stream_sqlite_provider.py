@@ -1,133 +1,314 @@
+import base64
+import binascii
+import json
 import sqlite3
+import time
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple, Iterable
+from infrastructure import config
+from sqlite.database import open_database
 from storage_data.store_data_manager import VideoSegment
 
 
 class VideoStreamSQLiteProvider:
     """
     SQLite provider for storing and retrieving video stream metadata.
+
+    Frame records are written continuously by the frame storage writer, so the
+    database uses its own VIDEO_DB_* pragmas and bulk inserts group many rows
+    into one transaction.
     """
 
     def __init__(self, db_path: str = 'video_stream.db'):
         self.db_path = db_path
-        self._init_db()
-
-    def _init_db(self):
-        """Initialize the database and create tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS video_segments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    camera_id TEXT NOT NULL,
-                    start_time DATETIME NOT NULL,
-                    file_path TEXT
-                )
-            ''')
-            conn.commit()
+        self.db = open_database(db_path, [self._create_tables], synchronous=config.VIDEO_DB_SYNCHRONOUS,
+                                cache_size_kb=config.VIDEO_DB_CACHE_SIZE_KB,
+                                busy_timeout=config.VIDEO_DB_BUSY_TIMEOUT)
+
+    def close(self):
+        """Close the connections (they are reopened on next use)."""
+        self.db.close()
+
+    def _row_to_segment(self, row) -> VideoSegment:
+        return VideoSegment(
+            id=row[0],
+            camera_id=row[1],
+            start_time=datetime.fromisoformat(row[2]) if row[2] else None,
+            file_path=row[3],
+            byte_offset=row[4],
+            byte_length=row[5],
+            frame_count=row[6],
+            frame_offsets_ms=json.loads(row[7]) if row[7] else None
+        )
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Schema version 1: create the tables if they don't exist."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS video_segments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                camera_id TEXT NOT NULL,
+                start_time DATETIME NOT NULL,
+                file_path TEXT
+            )
+        ''')
+        # Packed segment files (STORAGE_FORMAT = 'packed') store many frames per file
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(video_segments)')}
+        if 'byte_offset' not in columns:
+            conn.execute('ALTER TABLE video_segments ADD COLUMN byte_offset INTEGER')
+        if 'byte_length' not in columns:
+            conn.execute('ALTER TABLE video_segments ADD COLUMN byte_length INTEGER')
+        # Video segments (STORAGE_FORMAT = 'video') describe many frames per row
+        if 'frame_count' not in columns:
+            conn.execute('ALTER TABLE video_segments ADD COLUMN frame_count INTEGER')
+        if 'frame_index' not in columns:
+            conn.execute('ALTER TABLE video_segments ADD COLUMN frame_index TEXT')
+        # Keyset pagination orders by (start_time, id); the index serves both per-camera and range lookups
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_video_segments_camera_start
+            ON video_segments (camera_id, start_time, id)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_video_segments_start
+            ON video_segments (start_time, id)
+        ''')
 
     def insert_segment(self, camera_id: str, start_time: datetime, 
-                       file_path: Optional[str] = None) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+                       file_path: Optional[str] = None, byte_offset: Optional[int] = None,
+                       byte_length: Optional[int] = None) -> int:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO video_segments (camera_id, start_time, file_path)
-                VALUES (?, ?, ?)
+                INSERT INTO video_segments (camera_id, start_time, file_path, byte_offset, byte_length)
+                VALUES (?, ?, ?, ?, ?)
             ''', (
                 camera_id,
                 start_time.isoformat() if isinstance(start_time, datetime) else start_time,
-                file_path
+                file_path,
+                byte_offset,
+                byte_length
             ))
-            conn.commit()
             return cursor.lastrowid
 
+    def insert_segments_bulk(self, segments: Iterable[tuple],
+                             max_rows_per_transaction: Optional[int] = None,
+                             max_transaction_seconds: Optional[float] = None) -> int:
+        """
+        Insert (camera_id, start_time, file_path) rows, grouped into transactions.
+
+        Frames in packed segment files are given as
+        (camera_id, start_time, file_path, byte_offset, byte_length).
+
+        A transaction is committed once it holds max_rows_per_transaction rows or
+        has been open for max_transaction_seconds, so large imports neither pay a
+        commit per row nor hold the write lock for too long.
+        """
+        if max_rows_per_transaction is None:
+            max_rows_per_transaction = config.VIDEO_DB_MAX_ROWS_PER_TRANSACTION
+        if max_transaction_seconds is None:
+            max_transaction_seconds = config.VIDEO_DB_MAX_TRANSACTION_SECONDS
+
+        inserted = 0
+        rows = iter(segments)
+        exhausted = False
+        while not exhausted:
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                pending = 0
+                transaction_start = time.monotonic()
+                while True:
+                    segment = next(rows, None)
+                    if segment is None:
+                        exhausted = True
+                        break
+                    camera_id, start_time, file_path = segment[:3]
+                    byte_offset, byte_length = segment[3:5] if len(segment) >= 5 else (None, None)
+                    cursor.execute('''
+                        INSERT INTO video_segments (camera_id, start_time, file_path, byte_offset, byte_length)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (
+                        camera_id,
+                        start_time.isoformat() if isinstance(start_time, datetime) else start_time,
+                        file_path,
+                        byte_offset,
+                        byte_length
+                    ))
+                    pending += 1
+                    if (pending >= max_rows_per_transaction
+                            or time.monotonic() - transaction_start >= max_transaction_seconds):
+                        break
+            inserted += pending
+        return inserted
+
+    @staticmethod
+    def encode_cursor(start_time: str, segment_id: int) -> str:
+        """Encode the position after a segment as an opaque pagination cursor."""
+        return base64.urlsafe_b64encode(f"{start_time}|{segment_id}".encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """Decode a pagination cursor into (start_time, id). Raises ValueError if it is malformed."""
+        try:
+            start_time, segment_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+            return start_time, int(segment_id)
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def query_segments(self, camera_id: Optional[str] = None, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None, limit: int = 100, cursor: Optional[str] = None,
+                       descending: bool = False) -> Tuple[List[VideoSegment], Optional[str]]:
+        """
+        Get one page of segments in a time range, using keyset pagination.
+
+        Args:
+            camera_id: Only segments of this camera (None = all cameras)
+            start: Only segments starting at or after this time
+            end: Only segments starting before this time
+            limit: Maximum number of segments to return
+            cursor: next_cursor of the previous page
+            descending: Newest first instead of oldest first
+
+        Returns:
+            Tuple of (segments, next_cursor); next_cursor is None on the last page
+        """
+        conditions = []
+        params = []
+        if camera_id is not None:
+            conditions.append('camera_id = ?')
+            params.append(camera_id)
+        if start is not None:
+            conditions.append('start_time >= ?')
+            params.append(start.isoformat() if isinstance(start, datetime) else start)
+        if end is not None:
+            conditions.append('start_time < ?')
+            params.append(end.isoformat() if isinstance(end, datetime) else end)
+        if cursor:
+            conditions.append(f"(start_time, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(self.decode_cursor(cursor))
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        order = 'DESC' if descending else 'ASC'
+        with self.db.read() as conn:
+            cursor_obj = conn.cursor()
+            # Fetch one extra row to know whether another page follows
+            cursor_obj.execute(f'''
+                SELECT id, camera_id, start_time, file_path, byte_offset, byte_length, frame_count, frame_index
+                FROM video_segments
+                {where_clause}
+                ORDER BY start_time {order}, id {order}
+                LIMIT ?
+            ''', (*params, limit + 1))
+            rows = cursor_obj.fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1][2], rows[-1][0])
+
+        segments = [self._row_to_segment(row) for row in rows]
+        return segments, next_cursor
+
     def get_segment_by_id(self, segment_id: int) -> Optional[VideoSegment]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, camera_id, start_time, file_path
+                SELECT id, camera_id, start_time, file_path, byte_offset, byte_length, frame_count, frame_index
                 FROM video_segments
                 WHERE id = ?
             ''', (segment_id,))
             row = cursor.fetchone()
             if row:
-                return VideoSegment(
-                    id=row[0],
-                    camera_id=row[1],
-                    start_time=datetime.fromisoformat(row[2]) if row[2] else None,
-                    file_path=row[3]
-                )
+                return self._row_to_segment(row)
             return None
 
     def get_segments_by_camera(self, camera_id: str) -> List[VideoSegment]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, camera_id, start_time, file_path
+                SELECT id, camera_id, start_time, file_path, byte_offset, byte_length, frame_count, frame_index
                 FROM video_segments
                 WHERE camera_id = ?
                 ORDER BY start_time DESC
             ''', (camera_id,))
             rows = cursor.fetchall()
-            return [
-                VideoSegment(
-                    id=row[0],
-                    camera_id=row[1],
-                    start_time=datetime.fromisoformat(row[2]) if row[2] else None,
-                    file_path=row[3]
-                )
-                for row in rows
-            ]
+            return [self._row_to_segment(row) for row in rows]
 
     def get_all_segments(self) -> List[VideoSegment]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, camera_id, start_time, file_path
+                SELECT id, camera_id, start_time, file_path, byte_offset, byte_length, frame_count, frame_index
                 FROM video_segments
                 ORDER BY start_time DESC
             ''')
             rows = cursor.fetchall()
-            return [
-                VideoSegment(
-                    id=row[0],
-                    camera_id=row[1],
-                    start_time=datetime.fromisoformat(row[2]) if row[2] else None,
-                    file_path=row[3]
-                )
-                for row in rows
-            ]
+            return [self._row_to_segment(row) for row in rows]
 
     def delete_segment(self, segment_id: int) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM video_segments WHERE id = ?', (segment_id,))
-            conn.commit()
             return cursor.rowcount > 0
 
     def delete_segments_by_camera(self, camera_id: str) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM video_segments WHERE camera_id = ?', (camera_id,))
-            conn.commit()
             return cursor.rowcount
 
     def delete_all_segments(self) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM video_segments')
-            conn.commit()
             return cursor.rowcount
 
+    def delete_segments_in_folders(self, folders: List[Tuple[str, datetime, datetime]]) -> int:
+        """
+        Delete the segments stored in the given folders, all in one transaction.
+
+        Args:
+            folders: (folder_prefix, start_bound, end_bound) per folder; the time bounds
+                     let the start_time index narrow the scan to the folder's frames
+
+        Returns:
+            Number of deleted rows
+        """
+        if not folders:
+            return 0
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            deleted = 0
+            for folder_prefix, start_bound, end_bound in folders:
+                cursor.execute('''
+                    DELETE FROM video_segments
+                    WHERE start_time >= ? AND start_time < ? AND substr(file_path, 1, ?) = ?
+                ''', (
+                    start_bound.isoformat() if isinstance(start_bound, datetime) else start_bound,
+                    end_bound.isoformat() if isinstance(end_bound, datetime) else end_bound,
+                    len(folder_prefix),
+                    folder_prefix
+                ))
+                deleted += cursor.rowcount
+            return deleted
+
+    def update_segment_frame_index(self, segment_id: int, frame_offsets_ms: List[int]) -> bool:
+        """Store the frame count and per-frame time offsets (milliseconds from start_time) of a video segment."""
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE video_segments
+                SET frame_count = ?, frame_index = ?
+                WHERE id = ?
+            ''', (len(frame_offsets_ms), json.dumps(frame_offsets_ms, separators=(',', ':')), segment_id))
+            return cursor.rowcount > 0
+
     def update_segment_file_path(self, segment_id: int, file_path: str) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE video_segments
                 SET file_path = ?
                 WHERE id = ?
             ''', (file_path, segment_id))
-            conn.commit()
             return cursor.rowcount > 0
 
 
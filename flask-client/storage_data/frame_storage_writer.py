@@ -0,0 +1,379 @@
+"""
+Frame Storage Writer - Dedicated thread for writing stored frames to disk and SQLite.
+
+This module moves frame storage off the MJPEG ingest path. Camera threads queue
+the received JPEG payload and return immediately; a single background thread
+writes the files, rolls session folders over and records the frames in the
+video_segments table.
+
+Key Features:
+- Single writer thread shared by all camera threads, so frames of each camera are written in arrival order
+- Session end markers travel through the same queue, so they never overtake pending frames
+- Batched database inserts (one transaction per FRAME_STORAGE_DB_BATCH_SIZE rows or FRAME_STORAGE_DB_FLUSH_INTERVAL seconds);
+  rows of a failed insert are kept and retried every flush interval (up to FRAME_STORAGE_DB_MAX_PENDING_ROWS)
+- Backpressure: producers wait up to FRAME_STORAGE_QUEUE_TIMEOUT for space, then the frame is dropped and counted
+- Writes one JPEG file per frame, appends to one packed file per session or encodes
+  one video per session (STORAGE_FORMAT)
+- Graceful shutdown: pending frames are written and pending rows flushed on stop
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from infrastructure.base_queue_thread import BaseQueueThread
+from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
+from storage_data.store_data_manager import store_data_manager
+from storage_data.video_segment_writer import VideoSegmentWriter
+from sqlite.video_stream_sqlite_provider import video_stream_provider
+
+# Initialize logger
+logger = get_logger()
+
+
+class FrameWriteRequest:
+    """Represents a single frame to store."""
+    
+    def __init__(self, camera_id: str, session_key: str, project_title: str, timestamp: datetime,
+                 filename: str, encoded_image: Optional[bytes] = None, image=None):
+        """
+        Initialize a frame write request.
+        
+        Args:
+            camera_id: Full camera identifier stored in the database (project_title_thread_id)
+            session_key: Recording session key (camera thread id)
+            project_title: Project title (storage folder)
+            timestamp: Frame timestamp
+            filename: Frame filename
+            encoded_image: Original JPEG bytes (preferred, avoids holding decoded frames in the queue)
+            image: Decoded image, only needed if no encoded bytes are available
+        """
+        self.camera_id = camera_id
+        self.session_key = session_key
+        self.project_title = project_title
+        self.timestamp = timestamp
+        self.filename = filename
+        self.encoded_image = encoded_image
+        self.image = image
+
+
+class EndSessionRequest:
+    """Marks the end of a recording session after all frames queued before it."""
+    
+    def __init__(self, session_key: str):
+        self.session_key = session_key
+
+
+class FrameStorageWriter(BaseQueueThread):
+    """
+    Writes frames of all camera threads in a dedicated background thread.
+    """
+    
+    def __init__(self, thread_id: str = "frame_storage_writer"):
+        """
+        Initialize the frame storage writer thread.
+        
+        Args:
+            thread_id: Unique identifier for the thread
+        """
+        super().__init__(thread_id=thread_id, queue_maxsize=config.FRAME_STORAGE_QUEUE_SIZE)
+        
+        # Rows waiting for the next batched insert (only touched by the worker, and by _on_stop after it exited)
+        self._pending_rows: List[tuple] = []
+        self._last_flush_time = time.time()
+        # Set while inserts fail; retries then only happen every flush interval
+        self._db_failing = False
+        
+        # Open video segments (STORAGE_FORMAT = 'video'): {session_key: (VideoSegmentWriter, segment_id)}
+        self._video_segments = {}
+        # Frame count of each open segment when its index was last stored: {segment_id: frame count}
+        self._indexed_frame_counts: Dict[int, int] = {}
+        self._last_index_time = time.time()
+    
+    def _initialize_stats(self) -> Dict[str, Any]:
+        """Initialize frame storage statistics."""
+        return {
+            'total_queued': 0,
+            'total_processed': 0,
+            'total_written': 0,  # Frames written to disk
+            'total_failed': 0,
+            'total_dropped': 0,  # Frames dropped because the queue stayed full (backpressure)
+            'queue_size': 0,
+            'db_rows_inserted': 0,
+            'db_batches': 0,
+            'db_failures': 0,
+            'db_rows_dropped': 0,  # Rows discarded because inserts kept failing beyond FRAME_STORAGE_DB_MAX_PENDING_ROWS
+            'pending_db_rows': 0,
+            'bytes_received': 0,  # JPEG bytes received from the cameras
+            'bytes_written': 0,  # Bytes stored on disk (after re-encoding; video segments count once closed)
+            'video_segments_closed': 0
+        }
+    
+    def _get_queue_timeout(self) -> float:
+        """Return timeout for queue.get() calls (also bounds how late a partial batch is flushed)."""
+        return min(1.0, config.FRAME_STORAGE_DB_FLUSH_INTERVAL)
+    
+    def queue_frame(self, camera_id: str, session_key: str, project_title: str, timestamp: datetime,
+                    filename: str, encoded_image: Optional[bytes] = None, image=None) -> bool:
+        """
+        Queue a frame for storage.
+        
+        Blocks for at most FRAME_STORAGE_QUEUE_TIMEOUT seconds if the writer is behind.
+        
+        Args:
+            camera_id: Full camera identifier stored in the database
+            session_key: Recording session key (camera thread id)
+            project_title: Project title (storage folder)
+            timestamp: Frame timestamp
+            filename: Frame filename
+            encoded_image: Original JPEG bytes
+            image: Decoded image (only used if encoded_image is None)
+        
+        Returns:
+            bool: True if queued, False if dropped or the thread is not running
+        """
+        request = FrameWriteRequest(
+            camera_id=camera_id,
+            session_key=session_key,
+            project_title=project_title,
+            timestamp=timestamp,
+            filename=filename,
+            encoded_image=encoded_image,
+            image=image if encoded_image is None else None
+        )
+        
+        if self.queue_item(request, timeout=config.FRAME_STORAGE_QUEUE_TIMEOUT):
+            return True
+        
+        if self.is_running():
+            with self._lock:
+                self._stats['total_dropped'] += 1
+        return False
+    
+    def queue_end_session(self, session_key: str) -> bool:
+        """
+        End a recording session once all of its queued frames are written.
+        
+        Unlike frames, the end marker is never dropped: this blocks until there is room in the
+        queue, so the session is not ended while its frames are still waiting to be written.
+        
+        Args:
+            session_key: Recording session key (camera thread id)
+        
+        Returns:
+            bool: True if queued, False if the writer is not running (the session is ended directly)
+        """
+        request = EndSessionRequest(session_key)
+        waited = False
+        while self.is_running():
+            if self.queue_item(request, timeout=1.0, log_full=False):
+                return True
+            if not waited:
+                waited = True
+                logger.info(f"[{self.thread_id}] Writer is behind, waiting to end session {session_key}")
+        
+        # Writer not running - its queued frames were written when it stopped
+        store_data_manager.end_session(session_key)
+        return False
+    
+    def _process_item(self, request):
+        """
+        Write a single frame (or end a session).
+        
+        Args:
+            request: FrameWriteRequest or EndSessionRequest
+        """
+        if isinstance(request, EndSessionRequest):
+            self._close_video_segment(request.session_key)
+            store_data_manager.end_session(request.session_key)
+            return
+        
+        bytes_written = 0
+        if config.STORAGE_FORMAT == 'video':
+            self._write_video_frame(request)
+        elif config.STORAGE_FORMAT == 'packed':
+            packed = store_data_manager.append_frame_to_pack(
+                request.image,
+                session_key=request.session_key,
+                timestamp=request.timestamp,
+                project_title=request.project_title,
+                filename=request.filename,
+                encoded_image=request.encoded_image
+            )
+            if not packed:
+                raise IOError(f"Could not append frame {request.filename}")
+            filepath, byte_offset, byte_length = packed
+            bytes_written = byte_length
+            self._pending_rows.append((request.camera_id, request.timestamp, filepath, byte_offset, byte_length))
+        else:
+            saved = store_data_manager.save_frame(
+                request.image,
+                session_key=request.session_key,
+                project_title=request.project_title,
+                filename=request.filename,
+                encoded_image=request.encoded_image
+            )
+            if not saved:
+                raise IOError(f"Could not write frame {request.filename}")
+            filepath, bytes_written = saved
+            self._pending_rows.append((request.camera_id, request.timestamp, filepath))
+        
+        with self._lock:
+            self._stats['total_written'] += 1
+            self._stats['bytes_written'] += bytes_written
+            if request.encoded_image is not None:
+                self._stats['bytes_received'] += len(request.encoded_image)
+            self._stats['pending_db_rows'] = len(self._pending_rows)
+        
+        if len(self._pending_rows) >= config.FRAME_STORAGE_DB_BATCH_SIZE and not self._db_failing:
+            self._flush_rows()
+    
+    def _write_video_frame(self, request: FrameWriteRequest):
+        """
+        Encode a frame into the video segment of its session, starting a new segment on session rollover.
+        
+        The segment's video_segments row is inserted when the segment starts; its frame
+        count and timestamp index are stored every FRAME_STORAGE_DB_FLUSH_INTERVAL seconds
+        while it is open (see _store_video_indexes) and once more when it is closed.
+        
+        Args:
+            request: FrameWriteRequest
+        """
+        image = store_data_manager.decode_for_storage(request.image, request.encoded_image)
+        storage_path = store_data_manager.get_current_session_folder(request.session_key, request.project_title)
+        video_name = f"{request.session_key}{config.VIDEO_STORAGE_EXTENSION}".replace(os.sep, '_')
+        relative_path = storage_path / video_name
+        
+        segment = self._video_segments.get(request.session_key)
+        if segment is None or segment[0].path != str(store_data_manager.project_root / relative_path):
+            self._close_video_segment(request.session_key)
+            writer = VideoSegmentWriter(str(store_data_manager.project_root / relative_path), request.timestamp)
+            writer.write(image, request.timestamp)
+            segment_id = video_stream_provider.insert_segment(request.camera_id, request.timestamp, str(relative_path))
+            # Mark the row as a video segment right away (the index is kept up to date while it is open)
+            video_stream_provider.update_segment_frame_index(segment_id, writer.frame_offsets_ms)
+            self._video_segments[request.session_key] = (writer, segment_id)
+            self._indexed_frame_counts[segment_id] = writer.frame_count
+            return
+        
+        segment[0].write(image, request.timestamp)
+    
+    def _close_video_segment(self, session_key: str):
+        """Finish the video segment of a session and store its frame index."""
+        segment = self._video_segments.pop(session_key, None)
+        if segment is None:
+            return
+        writer, segment_id = segment
+        writer.close()
+        self._indexed_frame_counts.pop(segment_id, None)
+        try:
+            segment_bytes = os.path.getsize(writer.path)
+        except OSError:
+            segment_bytes = 0
+        with self._lock:
+            self._stats['bytes_written'] += segment_bytes
+        try:
+            video_stream_provider.update_segment_frame_index(segment_id, writer.frame_offsets_ms)
+            with self._lock:
+                self._stats['video_segments_closed'] += 1
+        except Exception as e:
+            with self._lock:
+                self._stats['db_failures'] += 1
+            logger.error(f"[{self.thread_id}] Failed to store frame index of {writer.path}: {e}")
+    
+    def _store_video_indexes(self):
+        """
+        Store the frame index of every open video segment that gained frames.
+        
+        Keeps frame_count and timestamp lookups of open segments current, and limits
+        what is lost from the index if the process dies before the segment is closed.
+        """
+        self._last_index_time = time.time()
+        for writer, segment_id in self._video_segments.values():
+            if writer.frame_count == self._indexed_frame_counts.get(segment_id):
+                continue
+            try:
+                video_stream_provider.update_segment_frame_index(segment_id, writer.frame_offsets_ms)
+                self._indexed_frame_counts[segment_id] = writer.frame_count
+            except Exception as e:
+                with self._lock:
+                    self._stats['db_failures'] += 1
+                logger.error(f"[{self.thread_id}] Failed to store frame index of {writer.path}: {e}")
+    
+    def _on_idle(self):
+        """Flush a partial batch and update open video segment indexes once older than the flush interval."""
+        now = time.time()
+        if self._pending_rows and now - self._last_flush_time >= config.FRAME_STORAGE_DB_FLUSH_INTERVAL:
+            self._flush_rows()
+        if self._video_segments and now - self._last_index_time >= config.FRAME_STORAGE_DB_FLUSH_INTERVAL:
+            self._store_video_indexes()
+    
+    def _on_item_processed(self, item, processing_time: float):
+        """Flush on time as well as on size, so a steady trickle of frames is not held back."""
+        self._on_idle()
+    
+    def _on_stop(self):
+        """Flush remaining database rows and close packed/video segment files after the worker wrote all queued frames."""
+        self._flush_rows()
+        for session_key in list(self._video_segments):
+            self._close_video_segment(session_key)
+        store_data_manager.close_packed_files()
+    
+    def _flush_rows(self):
+        """
+        Insert all pending rows, one transaction per VIDEO_DB_MAX_ROWS_PER_TRANSACTION rows.
+        
+        Rows are removed only once their transaction committed, so a failed insert keeps
+        them for the next flush without inserting any row twice; beyond
+        FRAME_STORAGE_DB_MAX_PENDING_ROWS the oldest rows are dropped.
+        """
+        self._last_flush_time = time.time()
+        rows = self._pending_rows
+        while rows:
+            chunk = rows[:config.VIDEO_DB_MAX_ROWS_PER_TRANSACTION]
+            try:
+                inserted = video_stream_provider.insert_segments_bulk(
+                    chunk, max_rows_per_transaction=len(chunk), max_transaction_seconds=float('inf')
+                )
+            except Exception as e:
+                self._db_failing = True
+                dropped = max(0, len(rows) - config.FRAME_STORAGE_DB_MAX_PENDING_ROWS)
+                del rows[:dropped]
+                with self._lock:
+                    self._stats['db_failures'] += 1
+                    self._stats['db_rows_dropped'] += dropped
+                    self._stats['pending_db_rows'] = len(rows)
+                logger.error(f"[{self.thread_id}] Failed to insert {len(chunk)} frame record(s), "
+                             f"keeping {len(rows)} for retry (dropped {dropped}): {e}")
+                return
+            
+            del rows[:len(chunk)]
+            with self._lock:
+                self._stats['db_rows_inserted'] += inserted
+                self._stats['db_batches'] += 1
+                self._stats['pending_db_rows'] = len(rows)
+        self._db_failing = False
+
+
+# Global singleton instance
+_frame_storage_writer_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_frame_storage_writer() -> FrameStorageWriter:
+    """
+    Get the global frame storage writer singleton instance.
+    
+    Returns:
+        FrameStorageWriter: The global frame storage writer instance
+    """
+    global _frame_storage_writer_instance
+    
+    if _frame_storage_writer_instance is None:
+        with _instance_lock:
+            if _frame_storage_writer_instance is None:
+                _frame_storage_writer_instance = FrameStorageWriter()
+    
+    return _frame_storage_writer_instance
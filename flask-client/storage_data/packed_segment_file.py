@@ -0,0 +1,258 @@
+"""
+Packed Segment File - Append-only container holding all frames of a recording session.
+
+Instead of one small JPEG file per frame, the packed storage format
+(STORAGE_FORMAT = 'packed') appends every frame of a session to a single
+.frames file. This keeps the inode count and directory sizes small and turns
+an open/write/close per frame into one buffered append.
+
+File layout:
+    record*  index  footer
+    
+    record: RECORD_HEADER (magic, payload length, timestamp, name length), name, payload
+    index:  one INDEX_ENTRY (payload offset, payload length, timestamp, name length) + name per record
+    footer: FOOTER (index offset, record count, magic), written when the writer is closed
+
+The payload offset and length of every frame are also stored in video_segments
+(byte_offset, byte_length), so reads normally never touch the index. Files that
+were not closed cleanly (no footer) are indexed by scanning the records.
+
+Key Features:
+- One open file per recording session, appended to by the frame storage writer
+- Self-describing: the in-file index can rebuild or verify the database rows
+- Reads through mmap, so serving a frame is a slice of the page cache
+- Reopening a closed file for appending drops the footer and continues after the last record
+"""
+
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, List, Tuple
+
+PACKED_FILE_EXTENSION = '.frames'
+
+RECORD_MAGIC = b'FRM1'
+FOOTER_MAGIC = b'IDX1'
+RECORD_HEADER = struct.Struct('<4sIdH')   # magic, payload length, timestamp, name length
+INDEX_ENTRY = struct.Struct('<QIdH')      # payload offset, payload length, timestamp, name length
+FOOTER = struct.Struct('<QI4s')           # index offset, record count, magic
+
+
+class PackedFrameEntry:
+    """Location of one frame inside a packed segment file."""
+    
+    def __init__(self, name: str, timestamp: float, offset: int, length: int):
+        self.name = name
+        self.timestamp = timestamp
+        self.offset = offset
+        self.length = length
+    
+    def to_dict(self) -> dict:
+        """Convert the entry to a dictionary."""
+        return {
+            'name': self.name,
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat(),
+            'byte_offset': self.offset,
+            'byte_length': self.length
+        }
+
+
+class PackedSegmentWriter:
+    """
+    Appends frames to a packed segment file. Not thread-safe; owned by one writer thread.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) a packed segment file for appending.
+        
+        Args:
+            path: Absolute path of the .frames file
+        """
+        self.path = path
+        self._entries: List[PackedFrameEntry] = []
+        
+        if os.path.exists(path):
+            # Continue after the last record, dropping the footer/index of a previous close
+            self._entries, end_offset = _read_entries(path)
+            self._file = open(path, 'r+b')
+            self._file.truncate(end_offset)
+            self._file.seek(end_offset)
+        else:
+            self._file = open(path, 'wb')
+    
+    @property
+    def frame_count(self) -> int:
+        return len(self._entries)
+    
+    def append(self, name: str, timestamp: datetime, data: bytes) -> Tuple[int, int]:
+        """
+        Append a frame.
+        
+        Args:
+            name: Frame filename (kept for exports and index rebuilds)
+            timestamp: Frame timestamp
+            data: Encoded frame (JPEG bytes)
+        
+        Returns:
+            Tuple of (payload offset, payload length) within the file
+        """
+        name_bytes = name.encode('utf-8')
+        epoch = timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+        record_offset = self._file.tell()
+        self._file.write(RECORD_HEADER.pack(RECORD_MAGIC, len(data), epoch, len(name_bytes)))
+        self._file.write(name_bytes)
+        self._file.write(data)
+        # Flush to the OS so mmap readers in other threads see the frame right away
+        self._file.flush()
+        
+        offset = record_offset + RECORD_HEADER.size + len(name_bytes)
+        self._entries.append(PackedFrameEntry(name, epoch, offset, len(data)))
+        return offset, len(data)
+    
+    def close(self):
+        """Write the index and footer and close the file."""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        for entry in self._entries:
+            name_bytes = entry.name.encode('utf-8')
+            self._file.write(INDEX_ENTRY.pack(entry.offset, entry.length, entry.timestamp, len(name_bytes)))
+            self._file.write(name_bytes)
+        self._file.write(FOOTER.pack(index_offset, len(self._entries), FOOTER_MAGIC))
+        self._file.close()
+
+
+def _read_entries(path: str) -> Tuple[List[PackedFrameEntry], int]:
+    """
+    Read the frame index of a packed segment file.
+    
+    Uses the footer index if present, otherwise scans the records (file not closed cleanly).
+    
+    Returns:
+        Tuple of (entries, offset just after the last complete record)
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return [], 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if size >= FOOTER.size:
+                index_offset, count, magic = FOOTER.unpack_from(data, size - FOOTER.size)
+                if magic == FOOTER_MAGIC and index_offset <= size - FOOTER.size:
+                    entries = []
+                    position = index_offset
+                    for _ in range(count):
+                        offset, length, timestamp, name_length = INDEX_ENTRY.unpack_from(data, position)
+                        position += INDEX_ENTRY.size
+                        name = data[position:position + name_length].decode('utf-8')
+                        position += name_length
+                        entries.append(PackedFrameEntry(name, timestamp, offset, length))
+                    return entries, index_offset
+            
+            entries = []
+            position = 0
+            while position + RECORD_HEADER.size <= size:
+                magic, length, timestamp, name_length = RECORD_HEADER.unpack_from(data, position)
+                payload_offset = position + RECORD_HEADER.size + name_length
+                if magic != RECORD_MAGIC or payload_offset + length > size:
+                    break  # Torn write at the end of the file
+                name = data[position + RECORD_HEADER.size:payload_offset].decode('utf-8', errors='replace')
+                entries.append(PackedFrameEntry(name, timestamp, payload_offset, length))
+                position = payload_offset + length
+            return entries, position
+
+
+def read_index(path: str) -> List[PackedFrameEntry]:
+    """
+    Get the frames stored in a packed segment file, in write order.
+    
+    Args:
+        path: Absolute path of the .frames file
+    
+    Returns:
+        List of PackedFrameEntry
+    """
+    return _read_entries(path)[0]
+
+
+class PackedSegmentReader:
+    """
+    Reads frames from packed segment files through cached read-only memory maps.
+    """
+    
+    def __init__(self, max_open_files: int = 16):
+        """
+        Initialize the reader.
+        
+        Args:
+            max_open_files: Number of memory maps kept open (least recently used are closed)
+        """
+        self.max_open_files = max_open_files
+        self._maps = OrderedDict()  # path -> (file, mmap), least recently used first
+        self._lock = threading.Lock()
+    
+    def read(self, path: str, offset: int, length: int) -> Optional[bytes]:
+        """
+        Read one frame.
+        
+        Args:
+            path: Absolute path of the .frames file
+            offset: Payload offset (video_segments.byte_offset)
+            length: Payload length (video_segments.byte_length)
+        
+        Returns:
+            Frame bytes, or None if the range is outside the file
+        """
+        with self._lock:
+            data = self._get_map(path, offset + length)
+            if data is None:
+                return None
+            return data[offset:offset + length]
+    
+    def _get_map(self, path: str, required_size: int) -> Optional[mmap.mmap]:
+        """Get a memory map covering required_size bytes, remapping files that grew since they were mapped."""
+        cached = self._maps.get(path)
+        if cached is not None and len(cached[1]) >= required_size:
+            self._maps.move_to_end(path)
+            return cached[1]
+        if cached is not None:
+            self._close(path)
+        
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            if os.fstat(f.fileno()).st_size < required_size:
+                f.close()
+                return None
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            f.close()
+            return None
+        
+        self._maps[path] = (f, data)
+        while len(self._maps) > self.max_open_files:
+            self._close(next(iter(self._maps)))
+        return data
+    
+    def _close(self, path: str):
+        f, data = self._maps.pop(path)
+        data.close()
+        f.close()
+    
+    def release(self, path: str):
+        """Close the memory map of a file (e.g. before deleting it)."""
+        with self._lock:
+            if path in self._maps:
+                self._close(path)
+    
+    def close_all(self):
+        """Close all memory maps."""
+        with self._lock:
+            for path in list(self._maps):
+                self._close(path)
@@ -0,0 +1,395 @@
+"""
+Retention Manager - Background thread that enforces age and size limits on raw_data_store.
+
+StoreDataManager rolls every camera session over into a new
+raw_data_store/<project>/export/session_<timestamp> folder every 15 minutes and
+nothing ever deletes them. The retention manager periodically sweeps all
+projects and deletes whole session folders, oldest first, until the project is
+within its limits.
+
+Key Features:
+- Maximum session age (RETENTION_MAX_AGE_DAYS) and maximum total size per project
+  (RETENTION_MAX_PROJECT_BYTES, overridable per project)
+- Sessions still being recorded are never deleted
+- With ARCHIVE_ENABLED, only sessions whose archive bundle has been uploaded are deleted
+- Works for both storage formats (one file per frame and packed session files)
+- Frame records of all deleted sessions are removed in one database transaction,
+  before the files, so the database never points at deleted frames
+- File stat/delete operations are throttled with a token bucket so sweeps do not
+  compete with frame ingest for disk I/O
+- Sizes of closed sessions are cached per folder, so a sweep only walks active and
+  new session folders
+- Every sweep reports size and reclaimable space per project; dry runs only report
+"""
+
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+from infrastructure.base_queue_thread import BaseQueueThread
+from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
+from iris_communication.bandwidth_limiter import TokenBucket
+from storage_data.store_data_manager import store_data_manager
+from storage_data.packed_segment_file import PACKED_FILE_EXTENSION
+from sqlite.video_stream_sqlite_provider import video_stream_provider
+from sqlite.session_archive_sqlite_provider import session_archive_provider
+
+# Initialize logger
+logger = get_logger()
+
+SESSION_FOLDER_PREFIX = 'session_'
+SESSION_FOLDER_TIME_FORMAT = '%Y%m%d_%H%M%S'
+
+
+class RetentionSweepRequest:
+    """Requests an immediate retention sweep."""
+    
+    def __init__(self, dry_run: bool = False):
+        """
+        Initialize a sweep request.
+        
+        Args:
+            dry_run: Only report what would be deleted
+        """
+        self.dry_run = dry_run
+
+
+class SessionFolder:
+    """A session folder found on disk."""
+    
+    def __init__(self, project_title: str, path: Path, start_time: datetime):
+        self.project_title = project_title
+        self.path = path
+        self.start_time = start_time
+        self.size_bytes = 0
+        self.file_count = 0
+
+
+class RetentionManager(BaseQueueThread):
+    """
+    Periodically deletes the oldest session folders of each project.
+    """
+    
+    def __init__(self, thread_id: str = "retention_manager"):
+        """
+        Initialize the retention manager thread.
+        
+        Args:
+            thread_id: Unique identifier for the thread
+        """
+        super().__init__(thread_id=thread_id, queue_maxsize=10)
+        
+        self._io_limiter = TokenBucket(config.RETENTION_MAX_FILE_OPS_PER_SECOND)
+        self._last_sweep_time = 0.0
+        self._last_report: Dict[str, Any] = {}
+        # Sizes of closed session folders: {folder path: (folder mtime_ns, size_bytes, file_count)}
+        # (only touched by the worker thread)
+        self._size_cache: Dict[str, Tuple[int, int, int]] = {}
+    
+    def _initialize_stats(self) -> Dict[str, Any]:
+        """Initialize retention statistics."""
+        return {
+            'total_queued': 0,
+            'total_processed': 0,
+            'total_failed': 0,
+            'queue_size': 0,
+            'total_sweeps': 0,
+            'sessions_deleted': 0,
+            'files_deleted': 0,
+            'bytes_reclaimed': 0,
+            'db_rows_deleted': 0,
+            'last_sweep_at': None,
+            'last_sweep_duration': 0.0,
+            'cached_session_sizes': 0
+        }
+    
+    def _get_queue_timeout(self) -> float:
+        """Return timeout for queue.get() calls."""
+        return 5.0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get retention statistics including the report of the last sweep.
+        
+        Returns:
+            dict: Statistics and per-project size / reclaimable space
+        """
+        stats = super().get_stats()
+        with self._lock:
+            stats['last_report'] = self._last_report
+        stats['enabled'] = config.RETENTION_ENABLED
+        return stats
+    
+    def request_sweep(self, dry_run: bool = False) -> bool:
+        """
+        Queue an immediate sweep.
+        
+        Args:
+            dry_run: Only report sizes and reclaimable space, delete nothing
+        
+        Returns:
+            bool: True if queued
+        """
+        return self.queue_item(RetentionSweepRequest(dry_run))
+    
+    def _on_idle(self):
+        """Run the periodic sweep."""
+        if not config.RETENTION_ENABLED:
+            return
+        if time.time() - self._last_sweep_time >= config.RETENTION_CHECK_INTERVAL:
+            self._sweep(dry_run=False)
+    
+    def _process_item(self, request: RetentionSweepRequest):
+        """
+        Run a requested sweep.
+        
+        Args:
+            request: RetentionSweepRequest
+        """
+        self._sweep(dry_run=request.dry_run)
+    
+    def _sweep(self, dry_run: bool):
+        """Check every project and delete what exceeds its limits."""
+        start_time = time.time()
+        if not dry_run:
+            self._last_sweep_time = start_time
+        
+        report = {}
+        victims: List[SessionFolder] = []
+        for project_dir in self._list_project_dirs():
+            sessions = self._scan_sessions(project_dir)
+            if self._stop_event.is_set():
+                return
+            project_victims = self._select_victims(project_dir.name, sessions)
+            victims.extend(project_victims)
+            report[project_dir.name] = {
+                'session_count': len(sessions),
+                'total_bytes': sum(session.size_bytes for session in sessions),
+                'reclaimable_sessions': len(project_victims),
+                'reclaimable_bytes': sum(session.size_bytes for session in project_victims),
+                'oldest_session': sessions[0].start_time.isoformat() if sessions else None
+            }
+        
+        if not dry_run and victims:
+            self._delete_sessions(victims)
+        
+        duration = time.time() - start_time
+        with self._lock:
+            self._last_report = {
+                'generated_at': datetime.now().isoformat(),
+                'dry_run': dry_run,
+                'projects': report
+            }
+            if not dry_run:
+                self._stats['total_sweeps'] += 1
+                self._stats['last_sweep_at'] = datetime.now().isoformat()
+                self._stats['last_sweep_duration'] = round(duration, 3)
+        
+        if victims:
+            logger.info(
+                f"[{self.thread_id}] {'Dry run: would delete' if dry_run else 'Deleted'} {len(victims)} session(s), "
+                f"{sum(session.size_bytes for session in victims) / 1024 / 1024:.1f} MB in {duration:.1f}s"
+            )
+    
+    def _list_project_dirs(self) -> List[Path]:
+        """List the project directories that have an export folder."""
+        raw_data_store = store_data_manager.raw_data_store
+        if not raw_data_store.is_dir():
+            return []
+        return sorted(
+            project_dir for project_dir in raw_data_store.iterdir()
+            if (project_dir / 'export').is_dir()
+        )
+    
+    def _scan_sessions(self, project_dir: Path) -> List[SessionFolder]:
+        """
+        Find the session folders of a project and measure their size, oldest first.
+        
+        Closed sessions (not recorded and older than twice the session duration) no longer
+        change, so their size is cached by folder and only re-measured if the folder's
+        mtime changed; active and new sessions are walked file by file.
+        
+        Args:
+            project_dir: raw_data_store/<project> directory
+        
+        Returns:
+            List of SessionFolder sorted by start time
+        """
+        sessions = []
+        folder_mtimes = {}
+        for entry in os.scandir(project_dir / 'export'):
+            if not entry.is_dir() or not entry.name.startswith(SESSION_FOLDER_PREFIX):
+                continue
+            try:
+                folder_start = datetime.strptime(entry.name[len(SESSION_FOLDER_PREFIX):], SESSION_FOLDER_TIME_FORMAT)
+                folder_mtimes[entry.path] = entry.stat().st_mtime_ns
+            except ValueError:
+                continue  # Not created by StoreDataManager
+            except OSError:
+                continue  # Deleted meanwhile
+            sessions.append(SessionFolder(project_dir.name, Path(entry.path), folder_start))
+        
+        # Forget cached sizes of this project's folders that are gone
+        export_prefix = os.path.join(str(project_dir / 'export'), '')
+        for path in [path for path in self._size_cache if path.startswith(export_prefix) and path not in folder_mtimes]:
+            del self._size_cache[path]
+        
+        active_folders = self._get_active_folders()
+        closed_cutoff = datetime.now() - timedelta(minutes=store_data_manager.session_duration_minutes * 2)
+        sessions.sort(key=lambda session: session.start_time)
+        for session in sessions:
+            if self._stop_event.is_set():
+                break
+            key = str(session.path)
+            cached = self._size_cache.get(key)
+            if cached is not None and cached[0] == folder_mtimes[key]:
+                _, session.size_bytes, session.file_count = cached
+                continue
+            
+            for root, _, files in os.walk(session.path):
+                for name in files:
+                    self._io_limiter.consume(1)
+                    try:
+                        session.size_bytes += os.stat(os.path.join(root, name)).st_size
+                        session.file_count += 1
+                    except OSError:
+                        continue
+            
+            if session.start_time < closed_cutoff and session.path.resolve() not in active_folders:
+                self._size_cache[key] = (folder_mtimes[key], session.size_bytes, session.file_count)
+        
+        with self._lock:
+            self._stats['cached_session_sizes'] = len(self._size_cache)
+        return sessions
+    
+    def _select_victims(self, project_title: str, sessions: List[SessionFolder]) -> List[SessionFolder]:
+        """
+        Pick the sessions to delete: expired ones, then the oldest until the project fits its size limit.
+        
+        Args:
+            project_title: Project title
+            sessions: Sessions of the project, oldest first
+        
+        Returns:
+            List of SessionFolder to delete
+        """
+        active_folders = self._get_active_folders()
+        candidates = [session for session in sessions if session.path.resolve() not in active_folders]
+        if config.ARCHIVE_ENABLED:
+            # Keep sessions until their archive bundle has reached the SFTP server
+            uploaded = set(session_archive_provider.get_uploaded_folders())
+            candidates = [
+                session for session in candidates
+                if str(session.path.relative_to(store_data_manager.project_root)) in uploaded
+            ]
+        
+        victims = []
+        if config.RETENTION_MAX_AGE_DAYS is not None:
+            cutoff = datetime.now() - timedelta(days=config.RETENTION_MAX_AGE_DAYS)
+            victims = [session for session in candidates if session.start_time < cutoff]
+        
+        max_bytes = config.RETENTION_PROJECT_MAX_BYTES.get(project_title, config.RETENTION_MAX_PROJECT_BYTES)
+        if max_bytes is not None:
+            remaining_bytes = sum(session.size_bytes for session in sessions)
+            remaining_bytes -= sum(session.size_bytes for session in victims)
+            for session in candidates[len(victims):]:
+                if remaining_bytes <= max_bytes:
+                    break
+                victims.append(session)
+                remaining_bytes -= session.size_bytes
+        
+        return victims
+    
+    def _get_active_folders(self) -> set:
+        """Get the absolute paths of the session folders currently being recorded."""
+        return {
+            (store_data_manager.project_root / folder).resolve()
+            for folder in store_data_manager.get_active_session_folders()
+        }
+    
+    def _delete_sessions(self, victims: List[SessionFolder]):
+        """
+        Delete session folders: database rows first (one transaction), then the files.
+        
+        Args:
+            victims: Sessions to delete
+        """
+        # Frames of a session are timestamped between folder creation and its rollover
+        margin = timedelta(minutes=store_data_manager.session_duration_minutes * 2)
+        folders = []
+        for session in victims:
+            relative_folder = session.path.relative_to(store_data_manager.project_root)
+            folders.append((f"{relative_folder}{os.sep}", session.start_time - margin, session.start_time + margin))
+        
+        try:
+            db_rows_deleted = video_stream_provider.delete_segments_in_folders(folders)
+        except Exception as e:
+            logger.error(f"[{self.thread_id}] Failed to delete frame records, keeping session files: {e}")
+            return
+        
+        with self._lock:
+            self._stats['db_rows_deleted'] += db_rows_deleted
+        
+        for session in victims:
+            if self._stop_event.is_set():
+                break
+            files_deleted = self._delete_folder(session.path)
+            self._size_cache.pop(str(session.path), None)
+            with self._lock:
+                self._stats['sessions_deleted'] += 1
+                self._stats['files_deleted'] += files_deleted
+                self._stats['bytes_reclaimed'] += session.size_bytes
+    
+    def _delete_folder(self, folder: Path) -> int:
+        """
+        Delete a folder file by file at the throttled rate.
+        
+        Args:
+            folder: Folder to delete
+        
+        Returns:
+            int: Number of deleted files
+        """
+        files_deleted = 0
+        for root, _, files in os.walk(folder, topdown=False):
+            for name in files:
+                if self._stop_event.is_set():
+                    return files_deleted
+                self._io_limiter.consume(1)
+                path = os.path.join(root, name)
+                if name.endswith(PACKED_FILE_EXTENSION):
+                    # Packed segment files may still be memory-mapped by readers
+                    store_data_manager.packed_reader.release(path)
+                try:
+                    os.remove(path)
+                    files_deleted += 1
+                except OSError as e:
+                    logger.warning(f"[{self.thread_id}] Could not delete {name}: {e}")
+        shutil.rmtree(folder, ignore_errors=True)
+        return files_deleted
+
+
+# Global singleton instance
+_retention_manager_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_retention_manager() -> RetentionManager:
+    """
+    Get the global retention manager singleton instance.
+    
+    Returns:
+        RetentionManager: The global retention manager instance
+    """
+    global _retention_manager_instance
+    
+    if _retention_manager_instance is None:
+        with _instance_lock:
+            if _retention_manager_instance is None:
+                _retention_manager_instance = RetentionManager()
+    
+    return _retention_manager_instance
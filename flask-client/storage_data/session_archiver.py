@@ -0,0 +1,373 @@
+"""
+Session Archiver - Background thread that bundles closed recording sessions and uploads them over SFTP.
+
+Only the CSVs reach the SFTP server on their own; the stored frames that their
+image column refers to stay in raw_data_store. With ARCHIVE_ENABLED the archiver
+packs every closed session folder into one .tar.gz bundle and hands it to the SFTP
+uploader, so a single large transfer replaces thousands of small-file round trips.
+
+Key Features:
+- A session is closed once it is no longer recorded and older than twice the session duration
+- Bundles are built at a throttled disk read rate (ARCHIVE_BUILD_MAX_BYTES_PER_SECOND)
+  and written atomically (temporary file + rename)
+- Uploads are low priority: they only start while no CSV uploads are pending, and are
+  capped by ARCHIVE_UPLOAD_BANDWIDTH_LIMIT_BPS on top of the shared SFTP cap
+- Bundle state is kept in session_archives.db; a session becomes eligible for local
+  retention once its bundle is marked as uploaded
+- Failed uploads are queued again on the next check; bundles survive restarts
+"""
+
+import os
+import tarfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from infrastructure.base_queue_thread import BaseQueueThread
+from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
+from iris_communication.bandwidth_limiter import TokenBucket
+from storage_data.store_data_manager import store_data_manager
+from storage_data.retention_manager import SESSION_FOLDER_PREFIX, SESSION_FOLDER_TIME_FORMAT
+from sqlite.session_archive_sqlite_provider import session_archive_provider, SessionArchive, STATUS_BUNDLED
+
+# Initialize logger
+logger = get_logger()
+
+ARCHIVE_FOLDER_TYPE = 'archive'
+BUNDLE_EXTENSION = '.tar.gz'
+
+# Read size while copying session files into a bundle
+_CHUNK_SIZE = 1024 * 1024
+
+
+class ArchiveRunRequest:
+    """Requests an immediate archive run."""
+
+
+class _ThrottledReader:
+    """File wrapper that charges every read to a token bucket (used by tarfile.addfile)."""
+    
+    def __init__(self, f, limiter: TokenBucket):
+        self._file = f
+        self._limiter = limiter
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._limiter.consume(len(data))
+        return data
+
+
+class SessionArchiver(BaseQueueThread):
+    """
+    Periodically bundles closed session folders and queues the bundles for SFTP upload.
+    """
+    
+    def __init__(self, thread_id: str = "session_archiver"):
+        """
+        Initialize the session archiver thread.
+        
+        Args:
+            thread_id: Unique identifier for the thread
+        """
+        super().__init__(thread_id=thread_id, queue_maxsize=10)
+        
+        self._read_limiter = TokenBucket(config.ARCHIVE_BUILD_MAX_BYTES_PER_SECOND, _CHUNK_SIZE)
+        rate = config.ARCHIVE_UPLOAD_BANDWIDTH_LIMIT_BPS
+        self._upload_limiter = TokenBucket(rate) if rate and rate > 0 else None
+        # Bundles handed to the uploader and not finished yet (guarded by self._lock)
+        self._queued_bundles = set()
+        self._last_check_time = 0.0
+    
+    def _initialize_stats(self) -> Dict[str, Any]:
+        """Initialize archiver statistics."""
+        return {
+            'total_queued': 0,
+            'total_processed': 0,
+            'total_failed': 0,
+            'queue_size': 0,
+            'bundles_built': 0,
+            'files_bundled': 0,
+            'source_bytes_bundled': 0,
+            'bundle_bytes_built': 0,
+            'bundle_failures': 0,
+            'uploads_queued': 0,
+            'uploads_completed': 0,
+            'upload_failures': 0,
+            'uploads_in_flight': 0,
+            'last_check_at': None
+        }
+    
+    def _get_queue_timeout(self) -> float:
+        """Return timeout for queue.get() calls."""
+        return 5.0
+    
+    def _on_start(self):
+        """Register the bundle upload hooks with the SFTP uploader."""
+        from iris_communication.sftp_uploader_thread import get_sftp_uploader
+        get_sftp_uploader().register_folder_type(
+            ARCHIVE_FOLDER_TYPE,
+            on_uploaded=self._on_bundle_uploaded,
+            on_failed=self._on_bundle_failed,
+            bandwidth_limiter=self._upload_limiter
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get archiver statistics including the bundle counts per status.
+        
+        Returns:
+            dict: Statistics and per-status bundle counts and sizes
+        """
+        try:
+            archive_stats = session_archive_provider.get_archive_stats()
+        except Exception as e:
+            logger.warning(f"[{self.thread_id}] Could not read session archive stats: {e}")
+            archive_stats = {}
+        
+        stats = super().get_stats()
+        stats['archives'] = archive_stats
+        stats['enabled'] = config.ARCHIVE_ENABLED
+        return stats
+    
+    def request_run(self) -> bool:
+        """
+        Queue an immediate archive run (bundle closed sessions, queue pending uploads).
+        
+        Returns:
+            bool: True if queued
+        """
+        return self.queue_item(ArchiveRunRequest())
+    
+    def _on_idle(self):
+        """Run the periodic archive check."""
+        if not config.ARCHIVE_ENABLED:
+            return
+        if time.time() - self._last_check_time >= config.ARCHIVE_CHECK_INTERVAL:
+            self._run()
+    
+    def _process_item(self, request: ArchiveRunRequest):
+        """
+        Run a requested archive check.
+        
+        Args:
+            request: ArchiveRunRequest
+        """
+        self._run()
+    
+    def _run(self):
+        """Bundle newly closed sessions, then queue every bundle that still has to be uploaded."""
+        self._last_check_time = time.time()
+        with self._lock:
+            self._stats['last_check_at'] = datetime.now().isoformat()
+        
+        self._bundle_closed_sessions()
+        if not self._stop_event.is_set():
+            self._queue_pending_uploads()
+    
+    def _find_closed_sessions(self) -> List[Tuple[str, Path]]:
+        """
+        Find session folders that are no longer recorded and have no bundle yet, oldest first.
+        
+        Returns:
+            List of (project_title, session folder path)
+        """
+        raw_data_store = store_data_manager.raw_data_store
+        if not raw_data_store.is_dir():
+            return []
+        
+        archived = set(session_archive_provider.get_archived_folders())
+        active = {
+            (store_data_manager.project_root / folder).resolve()
+            for folder in store_data_manager.get_active_session_folders()
+        }
+        cutoff = datetime.now() - timedelta(minutes=store_data_manager.session_duration_minutes * 2)
+        
+        sessions = []
+        for project_dir in sorted(raw_data_store.iterdir()):
+            export_dir = project_dir / 'export'
+            if not export_dir.is_dir():
+                continue
+            for entry in os.scandir(export_dir):
+                if not entry.is_dir() or not entry.name.startswith(SESSION_FOLDER_PREFIX):
+                    continue
+                try:
+                    folder_start = datetime.strptime(entry.name[len(SESSION_FOLDER_PREFIX):], SESSION_FOLDER_TIME_FORMAT)
+                except ValueError:
+                    continue  # Not created by StoreDataManager
+                path = Path(entry.path)
+                if folder_start >= cutoff or path.resolve() in active:
+                    continue
+                if str(path.relative_to(store_data_manager.project_root)) in archived:
+                    continue
+                sessions.append((folder_start, project_dir.name, path))
+        
+        sessions.sort()
+        return [(project_title, path) for _, project_title, path in sessions]
+    
+    def _bundle_closed_sessions(self):
+        """Build bundles for up to ARCHIVE_MAX_BUNDLES_PER_CHECK closed sessions."""
+        try:
+            sessions = self._find_closed_sessions()
+        except Exception as e:
+            logger.error(f"[{self.thread_id}] Failed to look for closed sessions: {e}")
+            return
+        
+        for project_title, session_path in sessions[:config.ARCHIVE_MAX_BUNDLES_PER_CHECK]:
+            if self._stop_event.is_set():
+                return
+            try:
+                self._build_bundle(project_title, session_path)
+            except Exception as e:
+                with self._lock:
+                    self._stats['bundle_failures'] += 1
+                logger.error(f"[{self.thread_id}] Failed to bundle {session_path}: {e}", exc_info=True)
+    
+    def _build_bundle(self, project_title: str, session_path: Path) -> Optional[str]:
+        """
+        Pack a session folder into <project>/archive/<project>_<session>.tar.gz and record it.
+        
+        Args:
+            project_title: Project the session belongs to
+            session_path: Absolute path of the session folder
+        
+        Returns:
+            Bundle path, or None if the session has no files
+        """
+        archive_dir = session_path.parent.parent / 'archive'
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        bundle_path = archive_dir / f"{project_title}_{session_path.name}{BUNDLE_EXTENSION}"
+        temp_path = Path(f"{bundle_path}.tmp")
+        
+        start_time = time.time()
+        file_count = 0
+        source_bytes = 0
+        try:
+            with tarfile.open(temp_path, 'w:gz', compresslevel=config.ARCHIVE_COMPRESSION_LEVEL) as bundle:
+                for root, _, files in os.walk(session_path):
+                    for name in sorted(files):
+                        if self._stop_event.is_set():
+                            break
+                        path = os.path.join(root, name)
+                        try:
+                            f = open(path, 'rb')
+                        except OSError:
+                            continue  # Deleted meanwhile
+                        with f:
+                            # Members are named <session folder>/<file>, matching the CSV image references
+                            info = bundle.gettarinfo(arcname=f"{session_path.name}/{os.path.relpath(path, session_path)}",
+                                                     fileobj=f)
+                            bundle.addfile(info, _ThrottledReader(f, self._read_limiter))
+                        file_count += 1
+                        source_bytes += info.size
+            
+            if self._stop_event.is_set() or file_count == 0:
+                # Interrupted by shutdown, or nothing to archive yet - try again on the next check
+                return None
+            os.replace(temp_path, bundle_path)
+        finally:
+            # Remove a partial bundle left by an interrupted or failed build
+            temp_path.unlink(missing_ok=True)
+        
+        bundle_bytes = bundle_path.stat().st_size
+        session_archive_provider.insert_archive(
+            project_title=project_title,
+            session_folder=str(session_path.relative_to(store_data_manager.project_root)),
+            bundle_path=str(bundle_path),
+            file_count=file_count,
+            source_bytes=source_bytes,
+            bundle_bytes=bundle_bytes
+        )
+        
+        with self._lock:
+            self._stats['bundles_built'] += 1
+            self._stats['files_bundled'] += file_count
+            self._stats['source_bytes_bundled'] += source_bytes
+            self._stats['bundle_bytes_built'] += bundle_bytes
+        logger.info(f"[{self.thread_id}] Bundled {file_count} file(s) of {session_path.name} "
+                    f"({source_bytes / 1024 / 1024:.1f} MB -> {bundle_bytes / 1024 / 1024:.1f} MB) "
+                    f"in {time.time() - start_time:.1f}s")
+        return str(bundle_path)
+    
+    def _queue_pending_uploads(self):
+        """Hand every bundle that is not uploaded and not already queued to the SFTP uploader."""
+        from iris_communication.sftp_uploader_thread import get_sftp_uploader
+        from sqlite.project_settings_sqlite_provider import project_settings_provider
+        from sqlite.sftp_sqlite_provider import sftp_provider
+        
+        pending = session_archive_provider.get_archives_by_status(STATUS_BUNDLED, limit=config.SFTP_LOW_PRIORITY_QUEUE_SIZE)
+        if not pending:
+            return
+        
+        project_settings = project_settings_provider.get_project_settings()
+        servers = sftp_provider.get_all_servers()
+        if not project_settings or not servers:
+            logger.debug(f"[{self.thread_id}] {len(pending)} bundle(s) waiting: no SFTP server or project settings")
+            return
+        
+        uploader = get_sftp_uploader()
+        for archive in pending:
+            with self._lock:
+                if archive.bundle_path in self._queued_bundles:
+                    continue
+            if not os.path.isfile(archive.bundle_path):
+                self._forget_lost_bundle(archive)
+                continue
+            if not uploader.queue_upload(
+                sftp_server_info=servers[0],
+                file_path=archive.bundle_path,
+                project_settings=project_settings,
+                folder_type=ARCHIVE_FOLDER_TYPE,
+                remove_after_upload=True,
+                low_priority=True
+            ):
+                break  # Uploader stopped or its low-priority queue is full - retry on the next check
+            with self._lock:
+                self._queued_bundles.add(archive.bundle_path)
+                self._stats['uploads_queued'] += 1
+                self._stats['uploads_in_flight'] = len(self._queued_bundles)
+    
+    def _forget_lost_bundle(self, archive: SessionArchive):
+        """Drop the record of a bundle whose file is gone, so the session is bundled again."""
+        logger.warning(f"[{self.thread_id}] Bundle {archive.bundle_path} is missing, rebuilding it")
+        session_archive_provider.delete_archive(archive.session_folder)
+    
+    def _on_bundle_uploaded(self, request, result: dict):
+        """Mark a bundle as uploaded (called by the SFTP uploader, before it removes the local bundle)."""
+        session_archive_provider.mark_uploaded(request.file_path, result.get('remote_path'))
+        with self._lock:
+            self._queued_bundles.discard(request.file_path)
+            self._stats['uploads_completed'] += 1
+            self._stats['uploads_in_flight'] = len(self._queued_bundles)
+    
+    def _on_bundle_failed(self, request, result: dict):
+        """Forget a failed bundle upload so the next check queues it again."""
+        with self._lock:
+            self._queued_bundles.discard(request.file_path)
+            self._stats['upload_failures'] += 1
+            self._stats['uploads_in_flight'] = len(self._queued_bundles)
+        logger.warning(f"[{self.thread_id}] Upload of {os.path.basename(request.file_path)} failed: "
+                       f"{result.get('error', 'Unknown error')}")
+
+
+# Global singleton instance
+_session_archiver_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_session_archiver() -> SessionArchiver:
+    """
+    Get the global session archiver singleton instance.
+    
+    Returns:
+        SessionArchiver: The global session archiver instance
+    """
+    global _session_archiver_instance
+    
+    if _session_archiver_instance is None:
+        with _instance_lock:
+            if _session_archiver_instance is None:
+                _session_archiver_instance = SessionArchiver()
+    
+    return _session_archiver_instance
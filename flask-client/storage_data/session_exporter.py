@@ -0,0 +1,256 @@
+"""
+Session Exporter - Streams stored frames of a camera and time range as a tar or zip archive.
+
+The export is a generator of archive chunks that Flask streams straight to the
+client. Frames are looked up page by page through the video_segments index and
+read in EXPORT_CHUNK_SIZE pieces, so neither a temporary file nor the archive
+is ever held on the box; memory use stays at about one chunk.
+
+Key Features:
+- tar (ustar/pax headers written per member) or zip (stored, zip64, data descriptors)
+- Works for all storage formats: single frame files, packed session files and video segments
+- Optional model/classifier CSVs of the current project that overlap the time range
+- Frames are stored uncompressed: JPEG and video do not compress further, so
+  throughput is limited by disk and network rather than CPU
+- Files deleted before they are reached are skipped; files that shrink while being
+  sent cannot be skipped any more (their header is out) and are zero-padded, logged
+  and counted as truncated in the export summary
+"""
+
+import os
+import tarfile
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Callable, Dict
+from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
+from sqlite.video_stream_sqlite_provider import video_stream_provider
+from storage_data.store_data_manager import store_data_manager, VideoSegment
+
+# Initialize logger
+logger = get_logger()
+
+EXPORT_FORMATS = {
+    'tar': 'application/x-tar',
+    'zip': 'application/zip'
+}
+
+TAR_BLOCK_SIZE = tarfile.BLOCKSIZE
+
+
+class _ChunkSink:
+    """Write-only file object collecting the bytes zipfile produces until they are yielded."""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class _ExportMember:
+    """One file in the archive: either a file on disk or bytes loaded on demand."""
+    
+    def __init__(self, name: str, mtime: float, path: Optional[Path] = None,
+                 load_bytes: Optional[Callable[[], Optional[bytes]]] = None):
+        self.name = name
+        self.mtime = mtime
+        self.path = path
+        self.load_bytes = load_bytes
+    
+    def open(self, stats: Dict[str, int]) -> Optional[Tuple[int, Iterator[bytes]]]:
+        """
+        Return (size, chunk iterator), or None if the source is gone (e.g. deleted by retention).
+        
+        Args:
+            stats: Export statistics, updated with skipped and truncated members
+        """
+        if self.path is not None:
+            try:
+                f = open(self.path, 'rb')
+            except OSError:
+                stats['skipped'] += 1
+                return None
+            size = os.fstat(f.fileno()).st_size
+            return size, _read_chunks(f, size, self.name, stats)
+        
+        data = self.load_bytes()
+        if data is None:
+            stats['skipped'] += 1
+            return None
+        return len(data), iter([data])
+
+
+def _read_chunks(f, size: int, name: str, stats: Dict[str, int]) -> Iterator[bytes]:
+    """
+    Read exactly size bytes in chunks, then close the file.
+    
+    The member's size is already in the archive header, so a file that shrank meanwhile
+    is zero-padded to keep the archive valid; the member is logged and counted as truncated.
+    """
+    try:
+        remaining = size
+        while remaining > 0:
+            chunk = f.read(min(config.EXPORT_CHUNK_SIZE, remaining))
+            if not chunk:
+                logger.warning(f"Export member {name} shrank while being exported, "
+                               f"zero-padding the missing {remaining} of {size} bytes")
+                stats['truncated'] += 1
+                while remaining > 0:
+                    chunk = b'\0' * min(config.EXPORT_CHUNK_SIZE, remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _segment_members(segment: VideoSegment) -> Iterator[_ExportMember]:
+    """Archive member for a video_segments row, named <camera_id>/<session folder>/<frame or video>."""
+    relative_path = Path(segment.file_path)
+    session_folder = relative_path.parent.name
+    mtime = segment.start_time.timestamp() if segment.start_time else time.time()
+    
+    if segment.byte_offset is not None and segment.byte_length is not None:
+        # Frame inside a packed session file
+        name = f"{segment.camera_id}/{session_folder}/frame_{segment.start_time.strftime('%Y%m%d_%H%M%S_%f')}.jpg"
+        yield _ExportMember(name, mtime, load_bytes=lambda: store_data_manager.read_frame(
+            segment.file_path, segment.byte_offset, segment.byte_length))
+    else:
+        # Single frame file or video segment
+        name = f"{segment.camera_id}/{session_folder}/{relative_path.name}"
+        yield _ExportMember(name, mtime, path=store_data_manager.project_root / relative_path)
+
+
+def _csv_members(start: Optional[datetime], end: Optional[datetime]) -> Iterator[_ExportMember]:
+    """Model/classifier CSVs of the current project that overlap [start, end)."""
+    from sqlite.project_settings_sqlite_provider import project_settings_provider
+    settings = project_settings_provider.get_current_settings()
+    if not settings or not settings.iris_main_folder:
+        return
+    
+    for subfolder in {settings.iris_model_subfolder, settings.iris_classifier_subfolder}:
+        if not subfolder:
+            continue
+        csv_dir = store_data_manager.project_root / settings.iris_main_folder / subfolder
+        if not csv_dir.is_dir():
+            continue
+        for entry in sorted(os.scandir(csv_dir), key=lambda e: e.name):
+            if not entry.is_file() or not entry.name.endswith('.csv'):
+                continue
+            # CSVs are named <subfolder>[_summary]_<start time>.csv and appended to until they rotate
+            try:
+                created = datetime.strptime('_'.join(entry.name[:-4].split('_')[-3:]), '%Y%m%d_%H%M%S_%f')
+            except ValueError:
+                continue
+            modified = entry.stat().st_mtime
+            if end is not None and created >= end:
+                continue
+            if start is not None and modified < start.timestamp():
+                continue
+            yield _ExportMember(f"csv/{subfolder}/{entry.name}", modified, path=Path(entry.path))
+
+
+def _iter_members(camera_id: Optional[str], start: Optional[datetime], end: Optional[datetime],
+                  include_csv: bool) -> Iterator[_ExportMember]:
+    cursor = None
+    while True:
+        segments, cursor = video_stream_provider.query_segments(
+            camera_id=camera_id, start=start, end=end, limit=config.EXPORT_PAGE_SIZE, cursor=cursor
+        )
+        for segment in segments:
+            if segment.file_path:
+                yield from _segment_members(segment)
+        if not cursor:
+            break
+    
+    if include_csv:
+        yield from _csv_members(start, end)
+
+
+def _stream_tar(members: Iterator[_ExportMember], stats: Dict[str, int]) -> Iterator[bytes]:
+    for member in members:
+        opened = member.open(stats)
+        if opened is None:
+            continue
+        stats['members'] += 1
+        size, chunks = opened
+        info = tarfile.TarInfo(member.name)
+        info.size = size
+        info.mtime = int(member.mtime)
+        info.mode = 0o644
+        yield info.tobuf(format=tarfile.PAX_FORMAT)
+        yield from chunks
+        remainder = size % TAR_BLOCK_SIZE
+        if remainder:
+            yield b'\0' * (TAR_BLOCK_SIZE - remainder)
+    # End of archive: two zero blocks
+    yield b'\0' * (TAR_BLOCK_SIZE * 2)
+
+
+def _stream_zip(members: Iterator[_ExportMember], stats: Dict[str, int]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for member in members:
+            opened = member.open(stats)
+            if opened is None:
+                continue
+            stats['members'] += 1
+            size, chunks = opened
+            info = zipfile.ZipInfo(member.name, date_time=time.localtime(member.mtime)[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            info.file_size = size
+            with archive.open(info, mode='w', force_zip64=size >= zipfile.ZIP64_LIMIT) as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    # Central directory
+    yield sink.drain()
+
+
+def stream_export(archive_format: str, camera_id: Optional[str] = None, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None, include_csv: bool = False) -> Iterator[bytes]:
+    """
+    Stream the stored frames of a camera and time range as an archive.
+    
+    Args:
+        archive_format: 'tar' or 'zip'
+        camera_id: Full camera identifier (None = all cameras)
+        start: Frames starting at or after this time
+        end: Frames starting before this time
+        include_csv: Also include the project's model/classifier CSVs overlapping the range
+    
+    Returns:
+        Iterator of archive chunks
+    """
+    if archive_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {archive_format}")
+    
+    members = _iter_members(camera_id, start, end, include_csv)
+    stats = {'members': 0, 'skipped': 0, 'truncated': 0}
+    stream = _stream_tar(members, stats) if archive_format == 'tar' else _stream_zip(members, stats)
+    total_bytes = 0
+    start_time = time.time()
+    for chunk in stream:
+        if chunk:
+            total_bytes += len(chunk)
+            yield chunk
+    
+    duration = time.time() - start_time
+    logger.info(f"Exported {total_bytes / 1024 / 1024:.1f} MB as {archive_format} in {duration:.1f}s "
+                f"(camera={camera_id or 'all'}, from={start}, to={end}, files={stats['members']}, "
+                f"skipped={stats['skipped']}, truncated={stats['truncated']})")
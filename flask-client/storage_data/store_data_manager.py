@@ -1,9 +1,15 @@
 import cv2
+import os
+import threading
+import numpy as np
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple, List
 from dataclasses import dataclass
 from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
+from storage_data.packed_segment_file import PackedSegmentWriter, PackedSegmentReader, PACKED_FILE_EXTENSION
+from storage_data.video_segment_writer import find_frame_number, extract_still
 
 # Initialize logger
 logger = get_logger()
@@ -18,6 +24,10 @@ class VideoSegment:
     camera_id: str
     start_time: datetime
     file_path: Optional[str] = None
+    byte_offset: Optional[int] = None  # Set for frames stored in a packed segment file
+    byte_length: Optional[int] = None
+    frame_count: Optional[int] = None  # Set for video segments (STORAGE_FORMAT = 'video')
+    frame_offsets_ms: Optional[List[int]] = None  # Per-frame capture time offsets of a video segment
     
     def to_dict(self) -> dict:
         """Convert the video segment to a dictionary."""
@@ -25,7 +35,10 @@ class VideoSegment:
             'id': self.id,
             'camera_id': self.camera_id,
             'start_time': self.start_time.isoformat() if self.start_time else None,
-            'file_path': self.file_path
+            'file_path': self.file_path,
+            'byte_offset': self.byte_offset,
+            'byte_length': self.byte_length,
+            'frame_count': self.frame_count
         }
 
 
@@ -39,26 +52,33 @@ class StoreDataManager:
         self.active_sessions = {}
         self.session_duration_minutes = 15
         self.max_sessions = 100  # Limit to prevent unbounded growth
+        # Sessions are used by the frame storage writer and by API endpoints
+        self._sessions_lock = threading.RLock()
+        
+        # Open packed segment files (STORAGE_FORMAT = 'packed'): {session_key: PackedSegmentWriter}
+        self._packed_writers = {}
+        self.packed_reader = PackedSegmentReader()
     
     def cleanup_old_sessions(self):
         """Remove sessions that are older than the duration limit."""
         current_time = datetime.now()
         to_remove = []
         
-        for session_key, session_info in self.active_sessions.items():
-            elapsed_minutes = (current_time - session_info['folder_start_time']).total_seconds() / 60
-            if elapsed_minutes > self.session_duration_minutes * 2:  # Keep for 2x duration before cleanup
-                to_remove.append(session_key)
-        
-        for key in to_remove:
-            del self.active_sessions[key]
-            logger.debug(f"Cleaned up old session: {key}")
+        with self._sessions_lock:
+            for session_key, session_info in self.active_sessions.items():
+                elapsed_minutes = (current_time - session_info['folder_start_time']).total_seconds() / 60
+                if elapsed_minutes > self.session_duration_minutes * 2:  # Keep for 2x duration before cleanup
+                    to_remove.append(session_key)
+            
+            for key in to_remove:
+                del self.active_sessions[key]
+                self._close_packed_writer(key)
+                logger.debug(f"Cleaned up old session: {key}")
     
     def get_project_title(self) -> str:
-        """Get the current project title from database."""
-        from sqlite.project_settings_sqlite_provider import ProjectSettingsSQLiteProvider
-        provider = ProjectSettingsSQLiteProvider()
-        settings = provider.get_current_settings()
+        """Get the current project title (cached, see sqlite.settings_cache)."""
+        from sqlite.project_settings_sqlite_provider import project_settings_provider
+        settings = project_settings_provider.get_current_settings()
         if settings:
             return settings.title
         return 'default_project'
@@ -82,7 +102,7 @@ class StoreDataManager:
         Args:
             session_key: Unique identifier for the recording session (e.g., thread_id)
             project_title: Optional project title
-            
+        
         Returns:
             Relative path to the current session folder
         """
@@ -93,6 +113,11 @@ class StoreDataManager:
         if project_title is None:
             project_title = self.get_project_title()
         
+        with self._sessions_lock:
+            return self._get_or_create_session_folder(session_key, project_title)
+    
+    def _get_or_create_session_folder(self, session_key: str, project_title: str) -> Path:
+        """Return the active session folder or roll over to a new one (called with the sessions lock held)."""
         current_time = datetime.now()
         
         # Check if we have an active session and if it's still valid (< 15 minutes old)
@@ -131,21 +156,84 @@ class StoreDataManager:
         Args:
             session_key: Unique identifier for the recording session
         """
-        if session_key in self.active_sessions:
-            del self.active_sessions[session_key]
+        with self._sessions_lock:
+            self.active_sessions.pop(session_key, None)
+            self._close_packed_writer(session_key)
+    
+    def _close_packed_writer(self, session_key: str):
+        """Close the packed segment file of a session, writing its index (called with the sessions lock held)."""
+        writer = self._packed_writers.pop(session_key, None)
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception as e:
+                logger.error(f"Error closing packed segment file {writer.path}: {e}")
+    
+    def close_packed_files(self):
+        """Close all open packed segment files (on shutdown)."""
+        with self._sessions_lock:
+            for session_key in list(self._packed_writers):
+                self._close_packed_writer(session_key)
+    
+    def get_active_session_folders(self) -> list:
+        """
+        Get the folders of all sessions currently being recorded.
+        
+        Returns:
+            List of relative session folder paths
+        """
+        with self._sessions_lock:
+            return [session_info['current_folder'] for session_info in self.active_sessions.values()]
+    
+    def _needs_reencode(self, image) -> bool:
+        """
+        Check if the storage policy requires re-encoding a frame.
+        
+        Args:
+            image: Decoded OpenCV image (used for the resolution check)
+        
+        Returns:
+            True if the frame must be re-encoded instead of stored as received
+        """
+        if config.STORAGE_JPEG_QUALITY is not None:
+            return True
+        if image is None or (config.STORAGE_MAX_WIDTH is None and config.STORAGE_MAX_HEIGHT is None):
+            return False
+        height, width = image.shape[:2]
+        return ((config.STORAGE_MAX_WIDTH is not None and width > config.STORAGE_MAX_WIDTH) or
+                (config.STORAGE_MAX_HEIGHT is not None and height > config.STORAGE_MAX_HEIGHT))
     
-    def save_frame(self, image, session_key: str, project_title: Optional[str] = None, filename: Optional[str] = None) -> bool:
+    def _apply_resolution_policy(self, image):
+        """Downscale an image to fit STORAGE_MAX_WIDTH x STORAGE_MAX_HEIGHT, keeping the aspect ratio."""
+        height, width = image.shape[:2]
+        scale = 1.0
+        if config.STORAGE_MAX_WIDTH is not None and width > config.STORAGE_MAX_WIDTH:
+            scale = min(scale, config.STORAGE_MAX_WIDTH / width)
+        if config.STORAGE_MAX_HEIGHT is not None and height > config.STORAGE_MAX_HEIGHT:
+            scale = min(scale, config.STORAGE_MAX_HEIGHT / height)
+        if scale >= 1.0:
+            return image
+        return cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                          interpolation=cv2.INTER_AREA)
+    
+    def save_frame(self, image, session_key: str, project_title: Optional[str] = None, filename: Optional[str] = None,
+                   encoded_image: Optional[bytes] = None) -> Optional[Tuple[str, int]]:
         """
         Save a frame to the storage directory within a timestamped session folder.
         
+        If the original encoded JPEG is given, it is written as-is (no re-encode, no
+        generational quality loss) unless the storage quality/resolution policy in
+        config requires re-encoding.
+        
         Args:
-            image: OpenCV image to save
+            image: OpenCV image to save (may be None if encoded_image is given)
             session_key: Unique identifier for the recording session (e.g., thread_id)
             project_title: Optional project title
             filename: Optional filename
-            
+            encoded_image: Original JPEG bytes as received from the camera server
+        
         Returns:
-            True if successful, False otherwise
+            Tuple of (relative file path, bytes written), or None on failure
         """
         try:
             # Get current session folder (creates new one if needed after 15min)
@@ -157,13 +245,138 @@ class StoreDataManager:
             
             # Convert to absolute path for saving
             absolute_filepath = self.project_root / storage_path / filename
-            cv2.imwrite(str(absolute_filepath), image)
+            
+            data = self._encode_for_storage(image, encoded_image)
+            with open(absolute_filepath, 'wb') as f:
+                f.write(data)
             
             # Return relative filepath
-            return str(storage_path / filename)
+            return str(storage_path / filename), len(data)
         except Exception as e:
             logger.error(f"Error saving frame: {e}")
-            return False
+            return None
+    
+    def decode_for_storage(self, image, encoded_image: Optional[bytes]):
+        """
+        Get the decoded frame to store, downscaled by the storage resolution policy.
+        
+        Args:
+            image: Decoded OpenCV image, or None
+            encoded_image: Original JPEG bytes (decoded if image is None)
+        
+        Returns:
+            Decoded OpenCV image
+        """
+        if image is None:
+            image = cv2.imdecode(np.frombuffer(encoded_image, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError("Could not decode frame")
+        return self._apply_resolution_policy(image)
+    
+    def _encode_for_storage(self, image, encoded_image: Optional[bytes]) -> bytes:
+        """Return the bytes to store for a frame, re-encoding only if the storage policy requires it."""
+        # A resolution policy can only be checked on the decoded image
+        if image is None and encoded_image is not None and (
+                config.STORAGE_MAX_WIDTH is not None or config.STORAGE_MAX_HEIGHT is not None):
+            image = cv2.imdecode(np.frombuffer(encoded_image, np.uint8), cv2.IMREAD_COLOR)
+        
+        if encoded_image is not None and not self._needs_reencode(image):
+            return encoded_image
+        
+        if image is None:
+            image = cv2.imdecode(np.frombuffer(encoded_image, np.uint8), cv2.IMREAD_COLOR)
+        image = self._apply_resolution_policy(image)
+        params = []
+        if config.STORAGE_JPEG_QUALITY is not None:
+            params = [cv2.IMWRITE_JPEG_QUALITY, int(config.STORAGE_JPEG_QUALITY)]
+        success, buffer = cv2.imencode('.jpg', image, params)
+        if not success:
+            raise ValueError("Could not encode frame")
+        return buffer.tobytes()
+    
+    def append_frame_to_pack(self, image, session_key: str, timestamp: datetime, project_title: Optional[str] = None,
+                             filename: Optional[str] = None,
+                             encoded_image: Optional[bytes] = None) -> Optional[Tuple[str, int, int]]:
+        """
+        Append a frame to the packed segment file of the current session folder.
+        
+        Used instead of save_frame when STORAGE_FORMAT is 'packed'. The file is
+        closed (and its index written) when the session rolls over or ends.
+        
+        Args:
+            image: OpenCV image to save (may be None if encoded_image is given)
+            session_key: Unique identifier for the recording session (e.g., thread_id)
+            timestamp: Frame timestamp
+            project_title: Optional project title
+            filename: Optional frame name stored in the record
+            encoded_image: Original JPEG bytes as received from the camera server
+        
+        Returns:
+            Tuple of (relative packed file path, byte offset, byte length), or None on failure
+        """
+        try:
+            data = self._encode_for_storage(image, encoded_image)
+            if filename is None:
+                filename = f"frame_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}.jpg"
+            
+            with self._sessions_lock:
+                storage_path = self.get_current_session_folder(session_key, project_title)
+                pack_name = f"{session_key}{PACKED_FILE_EXTENSION}".replace(os.sep, '_')
+                relative_pack_path = storage_path / pack_name
+                
+                writer = self._packed_writers.get(session_key)
+                if writer is None or writer.path != str(self.project_root / relative_pack_path):
+                    # New session or rolled over to a new folder
+                    self._close_packed_writer(session_key)
+                    writer = PackedSegmentWriter(str(self.project_root / relative_pack_path))
+                    self._packed_writers[session_key] = writer
+                
+                offset, length = writer.append(filename, timestamp, data)
+            
+            return str(relative_pack_path), offset, length
+        except Exception as e:
+            logger.error(f"Error appending frame to packed segment file: {e}")
+            return None
+    
+    def read_frame(self, file_path: str, byte_offset: Optional[int] = None,
+                   byte_length: Optional[int] = None) -> Optional[bytes]:
+        """
+        Read a stored frame in either storage format.
+        
+        Args:
+            file_path: Relative file path from video_segments
+            byte_offset: Offset within a packed segment file (None for single frame files)
+            byte_length: Length within a packed segment file
+        
+        Returns:
+            Encoded frame bytes, or None if the frame is missing
+        """
+        absolute_path = self.project_root / file_path
+        if byte_offset is not None and byte_length is not None:
+            return self.packed_reader.read(str(absolute_path), byte_offset, byte_length)
+        try:
+            with open(absolute_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def read_segment_frame(self, segment: VideoSegment, timestamp: Optional[datetime] = None) -> Optional[bytes]:
+        """
+        Read the JPEG of a stored frame in any storage format.
+        
+        Args:
+            segment: video_segments row
+            timestamp: For video segments, the time of the still to extract (default: first frame)
+        
+        Returns:
+            JPEG bytes, or None if the frame is missing
+        """
+        if segment.frame_count is not None:
+            frame_number = 0
+            if timestamp is not None and segment.frame_offsets_ms:
+                frame_number = find_frame_number(segment.frame_offsets_ms, segment.start_time, timestamp)
+            return extract_still(str(self.project_root / segment.file_path), frame_number)
+        return self.read_frame(segment.file_path, segment.byte_offset, segment.byte_length)
     
     def get_storage_path(self, project_title: Optional[str] = None) -> Path:
         if project_title is None:
@@ -0,0 +1,215 @@
+"""
+Thumbnail Cache - On-demand frame thumbnails in a size-capped LRU disk cache.
+
+Operators reviewing stored frames scrub through hours of images; sending the
+full-resolution JPEG for every step is slow and wasteful. Thumbnails are
+generated on first request, written to disk and served from there afterwards.
+
+Key Features:
+- Decodes with OpenCV's reduced-size JPEG decoding, so large frames are never fully decoded
+- Atomic writes (temporary file + rename); concurrent requests never see partial files
+- LRU eviction by last access once the cache exceeds THUMBNAIL_CACHE_MAX_BYTES
+- The in-memory LRU index is rebuilt from the cache directory on startup
+"""
+
+import cv2
+import hashlib
+import numpy as np
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Dict, Any
+from infrastructure.logging.logging_provider import get_logger
+from infrastructure import config
+
+# Initialize logger
+logger = get_logger()
+
+
+class ThumbnailCache:
+    """
+    Thread-safe LRU cache of JPEG thumbnails on disk.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        Initialize the cache and index the thumbnails already on disk.
+        
+        Args:
+            cache_dir: Directory holding the cached thumbnails
+            max_bytes: Maximum total size of the cached thumbnails
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path -> size, least recently used first
+        self._total_bytes = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'generation_failures': 0
+        }
+        self._load_index()
+    
+    def _load_index(self):
+        """Index existing thumbnails, oldest access first."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.endswith('.tmp'):
+                    # Left over from an interrupted write
+                    os.remove(path)
+                    continue
+                stat_result = os.stat(path)
+                files.append((stat_result.st_mtime, path, stat_result.st_size))
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self._total_bytes += size
+    
+    def _path_for(self, key: str, width: int) -> str:
+        digest = hashlib.sha1(f"{key}:{width}".encode('utf-8')).hexdigest()
+        return str(self.cache_dir / digest[:2] / f"{digest}.jpg")
+    
+    def get_or_create(self, key: str, width: int, load_source: Callable[[], Optional[bytes]]) -> Optional[str]:
+        """
+        Get the path of a cached thumbnail, generating it on a miss.
+        
+        Args:
+            key: Unique, stable identifier of the source frame
+            width: Thumbnail width in pixels (height keeps the aspect ratio)
+            load_source: Returns the source JPEG bytes (only called on a miss)
+        
+        Returns:
+            Absolute path of the thumbnail, or None if the source is missing or cannot be decoded
+        """
+        path = self._path_for(key, width)
+        with self._lock:
+            hit = path in self._entries and os.path.exists(path)
+            if hit:
+                self._entries.move_to_end(path)
+                self._stats['hits'] += 1
+            else:
+                self._stats['misses'] += 1
+        if hit:
+            try:
+                # Keep the access order across restarts (the index is rebuilt by mtime)
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+        
+        # Generate outside the lock; concurrent misses for the same key just write the same file twice
+        source = load_source()
+        thumbnail = self._make_thumbnail(source, width) if source else None
+        if thumbnail is None:
+            with self._lock:
+                self._stats['generation_failures'] += 1
+            logger.warning(f"Could not create thumbnail for {key}")
+            return None
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(thumbnail)
+        os.replace(temp_path, path)
+        
+        with self._lock:
+            self._total_bytes -= self._entries.pop(path, 0)
+            self._entries[path] = len(thumbnail)
+            self._total_bytes += len(thumbnail)
+            self._evict()
+        return path
+    
+    def _make_thumbnail(self, source: bytes, width: int) -> Optional[bytes]:
+        """Decode at reduced size and encode a thumbnail of the given width."""
+        # Let the JPEG decoder skip detail the thumbnail would throw away anyway
+        flag = cv2.IMREAD_COLOR
+        source_width = _jpeg_width(source)
+        if source_width:
+            for factor, reduced_flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                         (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                if source_width // factor >= width:
+                    flag = reduced_flag
+                    break
+        
+        image = cv2.imdecode(np.frombuffer(source, np.uint8), flag)
+        if image is None:
+            return None
+        
+        height, decoded_width = image.shape[:2]
+        if decoded_width > width:
+            image = cv2.resize(image, (width, max(1, int(height * width / decoded_width))),
+                               interpolation=cv2.INTER_AREA)
+        success, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(config.THUMBNAIL_JPEG_QUALITY)])
+        return encoded.tobytes() if success else None
+    
+    def _evict(self):
+        """Remove least recently used thumbnails until the cache fits its size cap (called with the lock held)."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._stats['evictions'] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            dict: Hits, misses, evictions, entry count and size
+        """
+        with self._lock:
+            stats = self._stats.copy()
+            stats['entries'] = len(self._entries)
+            stats['total_bytes'] = self._total_bytes
+            stats['max_bytes'] = self.max_bytes
+            return stats
+
+
+def _jpeg_width(data: bytes) -> Optional[int]:
+    """Read the image width from the SOF marker of a JPEG without decoding it."""
+    position = 2
+    while position + 9 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        segment_length = int.from_bytes(data[position + 2:position + 4], 'big')
+        # SOF0-SOF15, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return int.from_bytes(data[position + 7:position + 9], 'big')
+        position += 2 + segment_length
+    return None
+
+
+# Global singleton instance
+_thumbnail_cache_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """
+    Get the global thumbnail cache singleton instance.
+    
+    Returns:
+        ThumbnailCache: The global thumbnail cache instance
+    """
+    global _thumbnail_cache_instance
+    
+    if _thumbnail_cache_instance is None:
+        with _instance_lock:
+            if _thumbnail_cache_instance is None:
+                from storage_data.store_data_manager import store_data_manager
+                cache_dir = config.THUMBNAIL_CACHE_DIR or store_data_manager.project_root / 'thumbnail_cache'
+                _thumbnail_cache_instance = ThumbnailCache(cache_dir, config.THUMBNAIL_CACHE_MAX_BYTES)
+    
+    return _thumbnail_cache_instance
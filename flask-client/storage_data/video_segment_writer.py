@@ -0,0 +1,127 @@
+"""
+Video Segment Writer - Encodes the frames of a recording session into one video file.
+
+With STORAGE_FORMAT = 'video' every session folder holds one video per camera
+(<session_key><VIDEO_STORAGE_EXTENSION>) instead of individual JPEGs, and the
+video_segments row describes the whole segment: start time, frame count and a
+per-frame timestamp index. Inter-frame compression of a mostly static belt
+scene makes this several times smaller than storing JPEGs.
+
+Frames arrive at a variable rate, so the video's nominal frame rate
+(VIDEO_STORAGE_FPS) is only used for playback. The timestamp index maps each
+frame number to its capture time, which is what still extraction uses.
+
+Key Features:
+- Lazily opens cv2.VideoWriter with the size of the first frame
+- Frames of a different size are resized to the segment's frame size
+- Frame timestamps are kept as millisecond offsets from the segment start
+- Stills can be extracted by timestamp (nearest frame at or before it)
+- The default MJPG/AVI segment stays readable while it is being written and after a
+  crash; the frame storage writer stores the timestamp index regularly, not only on close
+"""
+
+import bisect
+import cv2
+from datetime import datetime
+from typing import Optional, List
+from infrastructure import config
+
+
+class VideoSegmentWriter:
+    """
+    Writes one video segment. Not thread-safe; owned by the frame storage writer thread.
+    """
+    
+    def __init__(self, path: str, start_time: datetime):
+        """
+        Initialize the segment writer (the file is created with the first frame).
+        
+        Args:
+            path: Absolute path of the video file
+            start_time: Segment start time (timestamp of the first frame)
+        """
+        self.path = path
+        self.start_time = start_time
+        self.frame_offsets_ms: List[int] = []
+        self.frame_size = None
+        self._writer = None
+    
+    @property
+    def frame_count(self) -> int:
+        return len(self.frame_offsets_ms)
+    
+    def write(self, image, timestamp: datetime):
+        """
+        Encode one frame.
+        
+        Args:
+            image: Decoded BGR image
+            timestamp: Frame timestamp
+        """
+        if self._writer is None:
+            height, width = image.shape[:2]
+            self.frame_size = (width, height)
+            self._writer = cv2.VideoWriter(
+                self.path,
+                cv2.VideoWriter_fourcc(*config.VIDEO_STORAGE_FOURCC),
+                config.VIDEO_STORAGE_FPS,
+                self.frame_size
+            )
+            if not self._writer.isOpened():
+                self._writer = None
+                raise IOError(f"Could not open video writer for {self.path} ({config.VIDEO_STORAGE_FOURCC})")
+        
+        if (image.shape[1], image.shape[0]) != self.frame_size:
+            image = cv2.resize(image, self.frame_size, interpolation=cv2.INTER_AREA)
+        
+        self._writer.write(image)
+        self.frame_offsets_ms.append(max(0, int((timestamp - self.start_time).total_seconds() * 1000)))
+    
+    def close(self):
+        """Finish the video file."""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+
+def find_frame_number(frame_offsets_ms: List[int], start_time: datetime, timestamp: datetime) -> int:
+    """
+    Find the frame captured at or just before a timestamp.
+    
+    Args:
+        frame_offsets_ms: Per-frame millisecond offsets from the segment start
+        start_time: Segment start time
+        timestamp: Requested time
+    
+    Returns:
+        int: Frame number (0 if the timestamp precedes the segment)
+    """
+    target_ms = int((timestamp - start_time).total_seconds() * 1000)
+    return max(0, bisect.bisect_right(frame_offsets_ms, target_ms) - 1)
+
+
+def extract_still(path: str, frame_number: int, jpeg_quality: Optional[int] = None) -> Optional[bytes]:
+    """
+    Decode one frame of a video file and encode it as JPEG.
+    
+    Args:
+        path: Absolute path of the video file
+        frame_number: Frame to extract
+        jpeg_quality: JPEG quality (default: OpenCV default)
+    
+    Returns:
+        JPEG bytes, or None if the frame cannot be read
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            return None
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        success, image = capture.read()
+        if not success:
+            return None
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)] if jpeg_quality is not None else []
+        success, buffer = cv2.imencode('.jpg', image, params)
+        return buffer.tobytes() if success else None
+    finally:
+        capture.release()